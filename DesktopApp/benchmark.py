@@ -0,0 +1,356 @@
+"""
+Micro-benchmark for the desktop data access layer, no display needed.
+
+Seeds a synthetic Spotlight.db at the scale given on the command line
+and times each data operation behind the app's pages, the same functions
+main.py runs on its database worker, so it works without an X display.
+Then times each user action the old way (a fresh sqlite3.connect per
+call, like main.py used to do) against the shared Repository connection,
+Find a Vaquero matching over a large event and login at a few scrypt
+cost settings.
+
+    python benchmark.py --users 20000 --events 50000 --comments 200000 --rsvps 100000 --json run.json
+    python benchmark.py --iterations 500 --match-rsvps 10000 --scrypt-n 8192 16384 32768
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import date, timedelta
+
+import credentials
+import matching
+import search
+from event_cache import EventCache
+from repository import Repository
+
+WORDS = ["Vaquero", "Career", "Coding", "Chess", "Robotics", "Study", "Art", "Film", "Soccer", "Dance",
+         "Volunteer", "Research", "Music", "Garden", "Startup", "Poetry", "Gaming", "Cooking", "Yoga", "Math"]
+FIRST_DAY = date(2025, 1, 1)
+
+
+def seed(repo, users=200, events=100, comments=2000, rsvps=0, opt_in=0.3, rng=None):
+    """Fills an empty database with synthetic students, events, comments and RSVPs.
+    student{i}@utrgv.edu are the students, event ids run from 1 to events."""
+    rng = rng or random.Random(0)
+    repo.setup_database()
+    with repo.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO studentuser (first_name, last_name, student_id, email, major, password) VALUES (?, ?, ?, ?, ?, ?)",
+            [(f"First{i}", f"Last{i}", f"{i:08d}", f"student{i}@utrgv.edu", f"Major{i % 12}", "password") for i in range(users)]
+        )
+        conn.executemany(
+            "INSERT INTO events (name, date, location, description, organization_email) VALUES (?, ?, ?, ?, ?)",
+            [(f"{rng.choice(WORDS)} Event {i}", (FIRST_DAY + timedelta(days=rng.randrange(365))).isoformat(), "Student Union",
+              " ".join(rng.choices(WORDS, k=12)).lower(), f"org{i % 50}@utrgv.edu") for i in range(events)]
+        )
+        if not users or not events:
+            return
+        conn.executemany(
+            "INSERT INTO comments (event_id, user_email, comment_text) VALUES (?, ?, ?)",
+            [(rng.randrange(events) + 1, f"student{rng.randrange(users)}@utrgv.edu", f"Comment {c}") for c in range(comments)]
+        )
+        pairs = set()  # rsvps are unique per (event, student)
+        while len(pairs) < min(rsvps, users * events):
+            pairs.add((rng.randrange(events) + 1, f"student{rng.randrange(users)}@utrgv.edu"))
+        conn.executemany("INSERT INTO rsvps (event_id, user_email, find_vaquero) VALUES (?, ?, ?)",
+                         [(event_id, email, rng.random() < opt_in) for event_id, email in sorted(pairs)])
+
+
+def fresh_connection_actions(path, users, events):
+    """The same queries the repository runs, opening a new connection every time."""
+
+    def get_user_details(i):
+        with sqlite3.connect(path) as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM studentuser WHERE email=?", (f"student{i % users}@utrgv.edu",)).fetchone()
+            return dict(row) if row else None
+
+    def load_events(i):
+        with sqlite3.connect(path) as conn:
+            return conn.execute("SELECT id, name, date, location, description, organization_email FROM events ORDER BY date").fetchall()
+
+    def load_comments(i):
+        with sqlite3.connect(path) as conn:
+            return conn.execute("""
+                SELECT id, user_email, comment_text, strftime('%Y-%m-%d %H:%M', timestamp)
+                FROM comments WHERE event_id=? ORDER BY timestamp DESC
+            """, (i % events + 1,)).fetchall()
+
+    def post_comment(i):
+        with sqlite3.connect(path) as conn:
+            conn.execute("INSERT INTO comments (event_id, user_email, comment_text) VALUES (?, ?, ?)", (i % events + 1, "student1@utrgv.edu", "bench"))
+            conn.commit()
+
+    return {"get_user_details": get_user_details, "load_events": load_events,
+            "load_comments": load_comments, "post_comment": post_comment}
+
+
+def repository_actions(repo, users, events):
+    return {
+        "get_user_details": lambda i: repo.get_user_details(f"student{i % users}@utrgv.edu"),
+        "load_events": lambda i: repo.load_events(),
+        "load_comments": lambda i: repo.load_comments(i % events + 1),
+        "post_comment": lambda i: repo.post_comment(i % events + 1, "student1@utrgv.edu", "bench"),
+    }
+
+
+def data_path_actions(repo, users, events, rng):
+    """What each page of the app asks the database for, as (action, heavy) by name.
+    Heavy actions read every event and run fewer times."""
+    cache = EventCache(repo)
+    cache.sync()
+
+    def pick_event():
+        return rng.randrange(events) + 1
+
+    def open_event(i):
+        # selecting an event: count its comments, then the first page of the feed
+        event_id = pick_event()
+        repo.count_comments(event_id)
+        return repo.comments_page(event_id, 0, 20)
+
+    def rsvp_and_match(i):
+        # a student who isn't seeded, so the RSVP is always new
+        event_id = pick_event()
+        repo.create_rsvp(event_id, f"bench{i}@utrgv.edu", True)
+        return matching.match_new_rsvp(repo, event_id, f"bench{i}@utrgv.edu", f"Major{i % 12}")
+
+    def edit_and_sync(i):
+        repo.execute("UPDATE events SET location = ? WHERE id = ?", (f"Room {i}", pick_event()))
+        return cache.sync()
+
+    def calendar_month(i):
+        day = FIRST_DAY + timedelta(days=rng.randrange(365))
+        return cache.month(day.year, day.month)
+
+    return {
+        "get_user_details": (lambda i: repo.get_user_details(f"student{rng.randrange(users)}@utrgv.edu"), False),
+        "load_events": (lambda i: repo.load_events(), True),
+        "event_cache cold sync": (lambda i: EventCache(repo).sync(), True),
+        "event_cache sync": (lambda i: cache.sync(), False),
+        "edit event + sync": (edit_and_sync, False),
+        "calendar month": (calendar_month, False),
+        "open event comments": (open_event, False),
+        "post_comment": (lambda i: repo.post_comment(pick_event(), "student1@utrgv.edu", "bench"), False),
+        "search": (lambda i: search.search(repo, rng.choice(WORDS)[:rng.randint(3, 6)]), False),
+        "rsvp + find a vaquero": (rsvp_and_match, False),
+        "event_rsvps": (lambda i: repo.event_rsvps(pick_event()), False),
+    }
+
+
+def data_path_benchmark(repo, args):
+    """Latency of each data operation at the seeded scale, returns {action: stats in ms}."""
+    results = {}
+    heavy_iterations = max(1, args.iterations // 20)
+    print(f"\nData paths over {args.users} students, {args.events} events, {args.comments} comments, {args.rsvps} RSVPs")
+    print(f"{'action':<24}{'runs':>6}{'mean (ms)':>11}{'p50 (ms)':>10}{'p95 (ms)':>10}{'max (ms)':>10}")
+    for name, (action, heavy) in data_path_actions(repo, args.users, args.events, random.Random(args.seed)).items():
+        samples = sorted(time_samples(action, heavy_iterations if heavy else args.iterations))
+        stats = {
+            "runs": len(samples),
+            "mean_ms": round(sum(samples) / len(samples), 3),
+            "p50_ms": round(samples[len(samples) // 2], 3),
+            "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+            "max_ms": round(samples[-1], 3),
+        }
+        results[name] = stats
+        print(f"{name:<24}{stats['runs']:>6}{stats['mean_ms']:>11.3f}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}{stats['max_ms']:>10.3f}")
+    return results
+
+
+def seed_vaquero_students(repo, students, majors=12):
+    """An event and `students` students who are about to RSVP for it."""
+    repo.setup_database()
+    event_id = repo.create_event("Mixer", "2025-09-01", "Ballroom", "Synthetic event", "org@utrgv.edu")
+    with repo.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO studentuser (first_name, last_name, student_id, email, major, password) VALUES (?, ?, ?, ?, ?, ?)",
+            [(f"First{i}", f"Last{i}", f"{i:08d}", f"vaquero{i}@utrgv.edu", f"Major{i % majors}", "password") for i in range(students)]
+        )
+    return event_id, [(f"vaquero{i}@utrgv.edu", f"Major{i % majors}") for i in range(students)]
+
+
+def legacy_match(repo, event_id, user_email, major):
+    """The matching main.py used to do: NOT IN subqueries, a random pick, then a separate insert."""
+    candidates = repo.query("""
+        SELECT r.user_email, u.major
+        FROM rsvps r
+        JOIN studentuser u ON r.user_email = u.email
+        WHERE r.event_id = ?
+          AND r.find_vaquero = 1
+          AND r.user_email != ?
+          AND r.user_email NOT IN (SELECT user1_email FROM vaquero_matches WHERE event_id = ?)
+          AND r.user_email NOT IN (SELECT user2_email FROM vaquero_matches WHERE event_id = ?)
+    """, (event_id, user_email, event_id, event_id))
+    if not candidates:
+        return None
+    same_major = [c for c in candidates if c["major"] == major]
+    match = random.choice(same_major or candidates)
+    repo.execute("INSERT INTO vaquero_matches (event_id, user1_email, user2_email) VALUES (?, ?, ?)",
+                 (event_id, user_email, match["user_email"]))
+    return match
+
+
+def match_stats(repo, event_id):
+    """(matches, same-major matches, students in more than one match)."""
+    row = repo.query_one("""
+        SELECT COUNT(*), SUM(a.major = b.major)
+        FROM vaquero_matches m
+        JOIN studentuser a ON a.email = m.user1_email
+        JOIN studentuser b ON b.email = m.user2_email
+        WHERE m.event_id = ?
+    """, (event_id,))
+    double_booked = repo.query_one("""
+        SELECT COUNT(*) FROM (
+            SELECT email FROM (
+                SELECT user1_email AS email FROM vaquero_matches WHERE event_id = ?
+                UNION ALL
+                SELECT user2_email FROM vaquero_matches WHERE event_id = ?
+            ) GROUP BY email HAVING COUNT(*) > 1
+        )
+    """, (event_id, event_id))[0]
+    return row[0], row[1] or 0, double_booked
+
+
+def matching_benchmark(tmp, rsvps):
+    """Students opt in one after another and get matched on the spot (legacy vs incremental),
+    or all opt in first and are matched in one batch run. Only the matching is timed."""
+
+    def one_by_one(match):
+        def run(repo, event_id, students):
+            elapsed = 0
+            for email, major in students:
+                repo.create_rsvp(event_id, email, True)
+                start = time.perf_counter()
+                match(repo, event_id, email, major)
+                elapsed += time.perf_counter() - start
+            return elapsed
+        return run
+
+    def batch(repo, event_id, students):
+        for email, major in students:
+            repo.create_rsvp(event_id, email, True)
+        start = time.perf_counter()
+        matching.match_event(repo, event_id)
+        return time.perf_counter() - start
+
+    runs = {
+        "legacy, per RSVP": one_by_one(legacy_match),
+        "incremental": one_by_one(matching.match_new_rsvp),
+        "batch": batch,
+    }
+    print(f"\nFind a Vaquero over {rsvps} opted-in RSVPs")
+    print(f"{'mode':<20}{'seconds':>10}{'matches':>10}{'same major':>12}{'double-booked':>15}")
+    for name, run in runs.items():
+        repo = Repository(os.path.join(tmp, f"match-{name.split(',')[0]}.db"))
+        event_id, students = seed_vaquero_students(repo, rsvps)
+        elapsed = run(repo, event_id, students)
+        matches, same_major, double_booked = match_stats(repo, event_id)
+        print(f"{name:<20}{elapsed:>10.2f}{matches:>10}{same_major:>12}{double_booked:>15}")
+        repo.close()
+
+
+def login_benchmark(tmp, costs, r, p, logins=20):
+    """Login latency (credentials.authenticate) for each scrypt n, plus the one-off plaintext upgrade."""
+    print(f"\nLogin latency, scrypt r={r} p={p}")
+    print(f"{'n':>8}{'memory (MB)':>13}{'upgrade (ms)':>14}{'mean (ms)':>11}{'p95 (ms)':>10}{'wrong pw (ms)':>15}{'no user (ms)':>14}")
+    for n in costs:
+        credentials.SCRYPT_N, credentials.SCRYPT_R, credentials.SCRYPT_P = n, r, p
+        credentials._dummy_hash = None
+        repo = Repository(os.path.join(tmp, f"login-{n}.db"))
+        repo.setup_database()
+        repo.create_user("Test", "User", "00000001", "login@utrgv.edu", "CS", "hunter2")  # legacy plaintext row
+
+        def timed(email, password):
+            start = time.perf_counter()
+            details = credentials.authenticate(repo, email, password)
+            return (time.perf_counter() - start) * 1000, details
+
+        upgrade, details = timed("login@utrgv.edu", "hunter2")
+        assert details and credentials.is_hashed(repo.get_password("login@utrgv.edu"))
+        samples = sorted(timed("login@utrgv.edu", "hunter2")[0] for _ in range(logins))
+        wrong = timed("login@utrgv.edu", "wrong")[0]
+        timed("nobody@utrgv.edu", "x")  # builds the dummy hash once
+        missing = timed("nobody@utrgv.edu", "x")[0]
+        mean = sum(samples) / len(samples)
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        print(f"{n:>8}{128 * n * r * p / 2 ** 20:>13.0f}{upgrade:>14.1f}{mean:>11.1f}{p95:>10.1f}{wrong:>15.1f}{missing:>14.1f}")
+        repo.close()
+
+
+def time_samples(action, iterations):
+    """Latency of each run of the action in milliseconds."""
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        action(i)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def time_action(action, iterations):
+    """Mean latency of the action in microseconds."""
+    start = time.perf_counter()
+    for i in range(iterations):
+        action(i)
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--users", type=int, default=200, help="seeded students")
+    parser.add_argument("--events", type=int, default=100, help="seeded events")
+    parser.add_argument("--comments", type=int, default=2000, help="seeded comments, spread over the events")
+    parser.add_argument("--rsvps", type=int, default=1000, help="seeded RSVPs, about 30%% opted in to Find a Vaquero")
+    parser.add_argument("--seed", type=int, default=0, help="random seed, the same seed gives the same database")
+    parser.add_argument("--db", help="keep the seeded database at this path instead of a temporary one")
+    parser.add_argument("--json", dest="json_path", help="also write the data path timings to this file")
+    parser.add_argument("--match-rsvps", type=int, default=10000, help="opted-in RSVPs for the matching benchmark, 0 to skip")
+    parser.add_argument("--scrypt-n", type=int, nargs="*", default=[2 ** 13, 2 ** 14, 2 ** 15], help="scrypt cost values for the login benchmark")
+    parser.add_argument("--scrypt-r", type=int, default=8)
+    parser.add_argument("--scrypt-p", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.users < 1 or args.events < 1:
+        parser.error("--users and --events must be at least 1")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db or os.path.join(tmp, "Spotlight.db")
+        if os.path.exists(path):
+            parser.error(f"{path} already exists, the benchmark seeds a new database")
+        repo = Repository(path)
+        start = time.perf_counter()
+        seed(repo, args.users, args.events, args.comments, args.rsvps, rng=random.Random(args.seed))
+        print(f"Seeded {path} in {time.perf_counter() - start:.1f}s")
+
+        results = data_path_benchmark(repo, args)
+        if args.json_path:
+            with open(args.json_path, "w") as f:
+                json.dump({"scale": {key: getattr(args, key) for key in ("users", "events", "comments", "rsvps", "seed")},
+                           "iterations": args.iterations, "data_paths": results}, f, indent=2)
+
+        before = fresh_connection_actions(path, args.users, args.events)
+        after = repository_actions(repo, args.users, args.events)
+
+        print()
+
+        print(f"{'action':<20}{'fresh connect (us)':>20}{'repository (us)':>18}{'speedup':>10}")
+        for name in before:
+            old = time_action(before[name], args.iterations)
+            new = time_action(after[name], args.iterations)
+            print(f"{name:<20}{old:>20.1f}{new:>18.1f}{old / new:>9.1f}x")
+        repo.close()
+
+        if args.match_rsvps:
+            matching_benchmark(tmp, args.match_rsvps)
+        if args.scrypt_n:
+            login_benchmark(tmp, args.scrypt_n, args.scrypt_r, args.scrypt_p)
+
+
+if __name__ == "__main__":
+    main()
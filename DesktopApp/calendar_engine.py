@@ -0,0 +1,67 @@
+import calendar
+import tkinter as tk
+from tkinter import font
+
+# --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
+# CALENDAR ENGINE
+# Month layout math plus a fixed 6x7 grid of day buttons. Changing the
+# month only reconfigures the existing buttons, nothing is destroyed or
+# created, and the event days come from the event cache's date index.
+# --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
+
+WEEKS = 6
+DAY_NAMES = ["Sun", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat"]
+
+# weeks start on Sunday to match the DAY_NAMES header
+_calendar = calendar.Calendar(firstweekday=calendar.SUNDAY)
+
+
+def month_cells(year, month):
+    """The 42 day numbers of a 6-week grid, 0 for the cells outside the month."""
+    cells = [day for week in _calendar.monthdayscalendar(year, month) for day in week]
+    return cells + [0] * (WEEKS * 7 - len(cells))
+
+
+def shift_month(year, month, delta):
+    """(year, month) delta months away."""
+    index = year * 12 + (month - 1) + delta
+    return index // 12, index % 12 + 1
+
+
+class CalendarGrid(tk.Frame):
+    """The day buttons of one month, restyled in place by show()."""
+
+    def __init__(self, parent, on_day, header_font, highlight_color, bg="white"):
+        super().__init__(parent, bg=bg)
+        self.on_day = on_day
+        self.bg = bg
+        self.highlight_color = highlight_color
+        # allocated once, the old calendar made a new bold Font for every event day
+        self.day_font = font.Font(family="Helvetica", size=11)
+        self.event_day_font = font.Font(family="Helvetica", size=11, weight="bold")
+        self.cell_days = [0] * (WEEKS * 7)
+
+        for col, name in enumerate(DAY_NAMES):
+            tk.Label(self, text=name, font=header_font, bg=bg).grid(row=0, column=col, padx=5, pady=5)
+
+        self.buttons = []
+        for cell in range(WEEKS * 7):
+            btn = tk.Button(self, width=4, height=2, font=self.day_font,
+                            command=lambda c=cell: self._click(c))
+            btn.grid(row=cell // 7 + 1, column=cell % 7, padx=2, pady=2)
+            self.buttons.append(btn)
+
+    def show(self, year, month, event_days):
+        """Lays out the month, event_days is the set of day numbers to highlight."""
+        self.cell_days = month_cells(year, month)
+        for btn, day in zip(self.buttons, self.cell_days):
+            if day == 0:
+                btn.config(text="", state=tk.DISABLED, relief="flat", bg=self.bg, font=self.day_font)
+            elif day in event_days:
+                btn.config(text=str(day), state=tk.NORMAL, relief="raised", bg=self.highlight_color, fg="white", font=self.event_day_font)
+            else:
+                btn.config(text=str(day), state=tk.NORMAL, relief="raised", bg="white", fg="black", font=self.day_font)
+
+    def _click(self, cell):
+        if self.cell_days[cell]:
+            self.on_day(self.cell_days[cell])
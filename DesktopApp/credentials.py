@@ -0,0 +1,92 @@
+import base64
+import hashlib
+import hmac
+import os
+
+# --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
+# PASSWORD HASHING
+# Passwords are stored as salted scrypt hashes:
+#     scrypt$<n>$<r>$<p>$<salt>$<hash>
+# scrypt is slow and memory hungry on purpose, so hashing and checking
+# run on the database worker, never on the Tk thread. Accounts that
+# still have a plaintext password are upgraded the next time they log in.
+# --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
+
+# cost settings, n is the CPU/memory cost (a power of 2), r the block size, p parallelism.
+# n=2**14, r=8 uses 16 MB and takes roughly 50 ms on a laptop
+SCRYPT_N = int(os.environ.get("SPOTLIGHT_SCRYPT_N", 2 ** 14))
+SCRYPT_R = int(os.environ.get("SPOTLIGHT_SCRYPT_R", 8))
+SCRYPT_P = int(os.environ.get("SPOTLIGHT_SCRYPT_P", 1))
+
+PREFIX = "scrypt"
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+
+def _b64(raw):
+    return base64.b64encode(raw).decode("ascii")
+
+
+def _scrypt(password, salt, n, r, p):
+    # scrypt needs about 128 * n * r * p bytes, leave headroom over OpenSSL's 32 MB default
+    return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r * p, dklen=HASH_BYTES)
+
+
+def hash_password(password, n=None, r=None, p=None):
+    """A new salted hash for storing in studentuser.password."""
+    n, r, p = n or SCRYPT_N, r or SCRYPT_R, p or SCRYPT_P
+    salt = os.urandom(SALT_BYTES)
+    return f"{PREFIX}${n}${r}${p}${_b64(salt)}${_b64(_scrypt(password, salt, n, r, p))}"
+
+
+def is_hashed(stored):
+    return bool(stored) and stored.startswith(PREFIX + "$")
+
+
+def verify_password(password, stored):
+    """(matches, needs_rehash). needs_rehash means the stored value is plaintext or uses old cost settings."""
+    if not stored:
+        return False, False
+    if not is_hashed(stored):
+        # legacy plaintext row
+        return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8")), True
+    try:
+        _, n, r, p, salt, expected = stored.split("$")
+        n, r, p = int(n), int(r), int(p)
+        computed = _scrypt(password, base64.b64decode(salt), n, r, p)
+    except ValueError:
+        return False, False  # corrupt value, nothing will match it
+    matches = hmac.compare_digest(computed, base64.b64decode(expected))
+    return matches, (n, r, p) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+
+
+_dummy_hash = None
+
+
+def _spend_hash_time(password):
+    """Checks against a throwaway hash so unknown emails take as long as wrong passwords."""
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = hash_password("not a real password")
+    verify_password(password, _dummy_hash)
+
+
+def authenticate(repo, email, password):
+    """The user's details if the password is right, else None. Runs on the database worker."""
+    stored = repo.get_password(email)
+    if stored is None:
+        _spend_hash_time(password)
+        return None
+    matches, needs_rehash = verify_password(password, stored)
+    if not matches:
+        return None
+    if needs_rehash:
+        repo.set_password(email, hash_password(password))
+    return repo.get_user_details(email)
+
+
+def create_account(repo, first_name, last_name, student_id, email, major, password):
+    """Registers a student with a hashed password. Runs on the database worker,
+    raises sqlite3.IntegrityError if the email is taken."""
+    repo.create_user(first_name, last_name, student_id, email, major, hash_password(password))
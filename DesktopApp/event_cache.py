@@ -0,0 +1,124 @@
+import calendar
+import threading
+from datetime import date
+
+# --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
+# SHARED EVENT CACHE
+# One in-memory copy of the events table for every page of the app.
+# Triggers on `events` append to the event_changes table, so a sync only
+# re-reads the rows whose ids show up after the last change it saw.
+# --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
+
+def parse_day(date_str):
+    """'YYYY-MM-DD' to a date, or None for dates typed in some other format."""
+    try:
+        return date.fromisoformat(date_str)  # much faster than strptime
+    except (TypeError, ValueError):
+        return None
+
+
+class EventCache:
+    """All events keyed by id. sync() runs on the database worker, the readers run on the Tk thread."""
+
+    def __init__(self, repo):
+        self.repo = repo
+        self._events = {}
+        self._by_day = {}  # date -> events on that day, sorted by id
+        self._ordered = None  # events sorted by (date, id), rebuilt after a sync changes something
+        self._last_seq = None  # newest event_changes row already applied, None until the first load
+        self._lock = threading.Lock()
+
+    def sync(self):
+        """Brings the cache up to date and returns the set of event ids that changed."""
+        if self._last_seq is None:
+            # read the change counter first, anything committed after it gets re-applied next sync
+            last_seq = self.repo.last_event_change()
+            events = {e["id"]: self._prepare(e) for e in self.repo.load_events()}
+            with self._lock:
+                self._events = {}
+                self._by_day = {}
+                for event in events.values():
+                    self._add(event)
+                self._ordered = None
+                self._last_seq = last_seq
+            return set(events)
+
+        last_seq, changed_ids = self.repo.event_changes_since(self._last_seq)
+        if not changed_ids:
+            return set()
+
+        fresh = {e["id"]: self._prepare(e) for e in self.repo.events_by_ids(changed_ids)}
+        with self._lock:
+            for event_id in changed_ids:
+                self._remove(event_id)
+                if event_id in fresh:  # otherwise it was deleted
+                    self._add(fresh[event_id])
+            self._ordered = None
+            self._last_seq = last_seq
+        return set(changed_ids)
+
+    def invalidate(self):
+        """Forget everything, the next sync reloads the whole table."""
+        with self._lock:
+            self._events = {}
+            self._by_day = {}
+            self._ordered = None
+            self._last_seq = None
+
+    def _add(self, event):
+        self._events[event["id"]] = event
+        if event["day"] is not None:
+            day_events = self._by_day.setdefault(event["day"], [])
+            day_events.append(event)
+            # rows arrive in id order on a full load, only resort for an out of order update
+            if len(day_events) > 1 and day_events[-2]["id"] > event["id"]:
+                day_events.sort(key=lambda e: e["id"])
+
+    def _remove(self, event_id):
+        event = self._events.pop(event_id, None)
+        if event is None or event["day"] is None:
+            return
+        day_events = [e for e in self._by_day.get(event["day"], []) if e["id"] != event_id]
+        if day_events:
+            self._by_day[event["day"]] = day_events
+        else:
+            self._by_day.pop(event["day"], None)
+
+    def _prepare(self, event):
+        # parse the date once per change instead of on every calendar refresh
+        event["day"] = parse_day(event["date"])
+        return event
+
+    # --- Readers ---
+
+    def __len__(self):
+        return len(self._events)
+
+    def get(self, event_id):
+        return self._events.get(event_id)
+
+    def ordered(self):
+        """All events sorted by date, like load_events()."""
+        with self._lock:
+            if self._ordered is None:
+                self._ordered = sorted(self._events.values(), key=lambda e: (e["date"], e["id"]))
+            return self._ordered
+
+    def page(self, offset, limit):
+        return self.ordered()[offset:offset + limit]
+
+    def on_date(self, day):
+        """Events on a date, straight from the date index."""
+        with self._lock:
+            return list(self._by_day.get(day, ()))
+
+    def month(self, year, month):
+        """{day number: events} for the days of the month that have events."""
+        days_in_month = calendar.monthrange(year, month)[1]
+        with self._lock:
+            found = {}
+            for day_num in range(1, days_in_month + 1):
+                day_events = self._by_day.get(date(year, month, day_num))
+                if day_events:
+                    found[day_num] = list(day_events)
+            return found
@@ -0,0 +1,164 @@
+import csv
+from collections import namedtuple
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from event_cache import parse_day
+
+# --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
+# BULK EVENT IMPORT
+# Reads a CSV or iCalendar file one row at a time and inserts the events
+# with executemany, one transaction per chunk, so a whole semester (or
+# 100k rows) loads in seconds without holding the file in memory.
+# Bad rows are skipped and reported with their line number.
+# The readers mirror the ones in WebApp/blog/importer.py (this app ships
+# on its own and can't import Django code); a fix to one belongs in both.
+# --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
+
+CSV_COLUMNS = ["name", "date", "location", "description"]
+BATCH_SIZE = 2000
+MAX_ERRORS = 1000
+
+RowError = namedtuple("RowError", ["line", "message"])
+
+
+class ImportReport:
+    """How many events were created and which rows were skipped."""
+
+    def __init__(self):
+        self.created = 0
+        self.failed = 0
+        self.errors = []  # the first MAX_ERRORS, failed counts all of them
+
+    def add_error(self, line, message):
+        self.failed += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append(RowError(line, message))
+
+    def summary(self, shown=10):
+        text = f"{self.created} event(s) imported, {self.failed} row(s) skipped."
+        for error in self.errors[:shown]:
+            text += f"\nLine {error.line}: {error.message}"
+        if self.failed > shown:
+            text += f"\n... and {self.failed - shown} more"
+        return text
+
+
+# --- Readers, yield (line number, {column: text}) ---
+
+def read_csv(lines):
+    """Rows of a CSV file whose header names the CSV_COLUMNS."""
+    reader = csv.DictReader(lines)
+    missing = [c for c in CSV_COLUMNS if c not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV header is missing: {', '.join(missing)}")
+    for row in reader:
+        yield reader.line_num, row
+
+
+def _unescape(value):
+    return (value.replace("\\n", "\n").replace("\\N", "\n")
+                 .replace("\\,", ",").replace("\\;", ";").replace("\\\\", "\\"))
+
+
+def _unfold(lines):
+    """(line number, logical line), joining the folded continuation lines of an .ics file."""
+    current, start = None, 0
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield start, current
+        current, start = line, number
+    if current is not None:
+        yield start, current
+
+
+def _start(params, value, tz):
+    """(date, time) text of a DTSTART, moved into tz when it is in UTC (...Z) or has a TZID."""
+    day = f"{value[0:4]}-{value[4:6]}-{value[6:8]}"
+    if "T" not in value:
+        return day, "00:00"
+    clock = f"{value[9:11]}:{value[11:13]}"
+    source = None
+    if value.endswith("Z"):
+        source = timezone.utc
+    elif params.get("TZID"):
+        try:
+            source = ZoneInfo(params["TZID"])
+        except (ZoneInfoNotFoundError, ValueError):
+            pass  # not an IANA name (Outlook writes "Central Standard Time"), kept as written
+    if source is None:
+        return day, clock  # floating time, already local
+    try:
+        start = datetime.strptime(value[:15], "%Y%m%dT%H%M%S").replace(tzinfo=source).astimezone(tz)
+    except ValueError:
+        return day, clock  # build_row reports what is wrong with it
+    return start.strftime("%Y-%m-%d"), start.strftime("%H:%M")
+
+
+def read_ics(lines, tz=None):
+    """One row per VEVENT, from its SUMMARY, DTSTART (in tz, this computer's zone by default), LOCATION and DESCRIPTION."""
+    event, event_line = None, 0
+    for number, line in _unfold(lines):
+        name, _, value = line.partition(":")
+        name, *params = name.split(";")
+        name = name.upper()
+        params = {key.upper(): param.strip('"') for key, _, param in (p.partition("=") for p in params)}
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            event, event_line = {}, number
+        elif name == "END" and value.upper() == "VEVENT" and event is not None:
+            yield event_line, event
+            event = None
+        elif event is not None:
+            if name == "SUMMARY":
+                event["name"] = _unescape(value)
+            elif name == "DTSTART":
+                event["date"] = _start(params, value, tz)[0]  # events here have a day, no time
+            elif name == "LOCATION":
+                event["location"] = _unescape(value)
+            elif name == "DESCRIPTION":
+                event["description"] = _unescape(value)
+
+
+def reader_for(path):
+    return read_ics if path.lower().endswith((".ics", ".ical")) else read_csv
+
+
+# --- Import ---
+
+def build_row(row, organization_email):
+    """(name, date, location, description, organization_email), ValueError if the row is bad."""
+    name = (row.get("name") or "").strip()
+    date = (row.get("date") or "").strip()
+    if not name:
+        raise ValueError("name is required")
+    if parse_day(date) is None:
+        raise ValueError(f"date {date!r} is not YYYY-MM-DD")
+    return (name, date, (row.get("location") or "").strip(), (row.get("description") or "").strip(), organization_email)
+
+
+def import_events(repo, rows, organization_email, batch_size=BATCH_SIZE):
+    """Inserts events from (line number, row) pairs and returns an ImportReport."""
+    report = ImportReport()
+    chunk = []
+    for line, row in rows:
+        try:
+            chunk.append(build_row(row, organization_email))
+        except ValueError as e:
+            report.add_error(line, str(e))
+            continue
+        if len(chunk) >= batch_size:
+            report.created += repo.create_events(chunk)
+            chunk = []
+    if chunk:
+        report.created += repo.create_events(chunk)
+    return report
+
+
+def import_file(repo, path, organization_email, batch_size=BATCH_SIZE):
+    """Imports a .csv or .ics file. Runs on the database worker."""
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        return import_events(repo, reader_for(path)(f), organization_email, batch_size)
@@ -1,153 +1,23 @@
 import tkinter as tk
-from tkinter import messagebox, font, simpledialog
+from tkinter import messagebox, font, simpledialog, filedialog
 import sqlite3
 import calendar
 from datetime import datetime
-import random 
-
-# --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
-# DATABASE SETUP
-# --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
-
-def setup_database():
-    """Initializes the database and creates tables if they don't exist."""
-    with sqlite3.connect('Spotlight.db') as conn:
-        cursor = conn.cursor()
-
-        # --- studentuser Table ---
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS studentuser(
-                first_name TEXT,
-                last_name TEXT,
-                student_id TEXT,
-                email TEXT PRIMARY KEY,
-                major TEXT,
-                password TEXT,
-                role TEXT DEFAULT 'student',
-                organization TEXT
-            )
-        """)
-
-        # --- org_requests Table ---
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS org_requests(
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT,
-                email TEXT,
-                organization TEXT,
-                status TEXT DEFAULT 'pending'
-            )
-        """)
-        
-        # --- events Table ---
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS events(
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                date TEXT NOT NULL,
-                location TEXT,
-                description TEXT,
-                organization_email TEXT 
-            )
-        """)
-
-        # --- comments Table ---
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS comments(
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                event_id INTEGER,
-                user_email TEXT,
-                comment_text TEXT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (event_id) REFERENCES events(id)
-            )
-        """)
-        
-        # --- rsvps Table ---
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS rsvps(
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                event_id INTEGER,
-                user_email TEXT,
-                find_vaquero BOOLEAN,
-                FOREIGN KEY (event_id) REFERENCES events(id),
-                UNIQUE(event_id, user_email)
-            )
-        """)
-
-        # --- vaquero_matches Table ---
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS vaquero_matches(
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                event_id INTEGER,
-                user1_email TEXT,
-                user2_email TEXT,
-                FOREIGN KEY (event_id) REFERENCES events(id)
-            )
-        """)
-
-        # --- Ensure dean user exists ---
-        cursor.execute("SELECT * FROM studentuser WHERE email=?", ("dean@utrgv.edu",))
-        if not cursor.fetchone():
-            cursor.execute(
-                "INSERT INTO studentuser (first_name, last_name, student_id, email, major, password, role) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                ("dean", "pelton", "00000000", "dean@utrgv.edu", "Administration", "dalmatians", "dean")
-            )
-        
-        conn.commit()
-
-# Run database setup on start
-setup_database()
-
-
-# --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
-# DATA LOADING FUNCTIONS
-# --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
-
-def load_users():
-    """Loads user emails and passwords from the database into a dictionary."""
-    users = {}
-    with sqlite3.connect('Spotlight.db') as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT email, password FROM studentuser")
-        for email, password in cursor.fetchall():
-            users[email] = password
-    return users
-
-def get_user_details(email):
-    """Fetches all details for a specific user from the database."""
-    if not email:
-        return None
-    with sqlite3.connect('Spotlight.db') as conn:
-        conn.row_factory = sqlite3.Row # Allows accessing columns by name
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM studentuser WHERE email=?", (email,))
-        user_data = cursor.fetchone()
-        if user_data:
-            return dict(user_data)
-    return None
-
-
-def load_events_from_db():
-    """Loads all events from the database."""
-    with sqlite3.connect('Spotlight.db') as conn:
-        cursor = conn.cursor()
-        # --- MODIFIED: Added organization_email to the query ---
-        cursor.execute("SELECT id, name, date, location, description, organization_email FROM events ORDER BY date")
-        events_data = []
-        for row in cursor.fetchall():
-            events_data.append({
-                "id": row[0],
-                "name": row[1],
-                "date": row[2],
-                "location": row[3],
-                "description": row[4],
-                "organization_email": row[5]
-            })
-    return events_data
+from repository import db
+import matching
+import credentials
+import importer
+import search
+from worker import DBWorker
+from widgets import EventList, CommentFeed
+from event_cache import EventCache
+from calendar_engine import CalendarGrid, shift_month
 
 # --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
 # MAIN APPLICATION CLASS
+# Only the Tk pages live here. The data operations they run are in
+# repository.py, matching.py, search.py and event_cache.py, so importing
+# this module touches no database and benchmark.py runs them without Tk.
 # --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
 
 class VSpotlightApp(tk.Tk):
@@ -159,6 +29,9 @@ class VSpotlightApp(tk.Tk):
         self.title("Vaquero Spotlight - UTRGV Event Hub")
         self.geometry("900x700")
         self.configure(bg="#f0f0f0")
+
+        # --- Database setup, brings Spotlight.db up to date (see migrations.py) ---
+        db.setup_database()
         
         # --- User state ---
         self.current_user_email = None
@@ -177,6 +50,11 @@ class VSpotlightApp(tk.Tk):
         container.grid_rowconfigure(0, weight=1)
         container.grid_columnconfigure(0, weight=1)
 
+        # --- Background database worker, keeps the UI responsive ---
+        self.worker = DBWorker(self)
+        # --- One copy of the events, shared by MainPage and CalendarPage ---
+        self.event_cache = EventCache(db)
+
         self.frames = {}
         for F in (LoginPage, MainPage, RegisterPage, CalendarPage):
             page_name = F.__name__
@@ -193,10 +71,10 @@ class VSpotlightApp(tk.Tk):
             frame.refresh_data() 
         frame.tkraise()
         
-    def login_user(self, email):
+    def login_user(self, email, details=None):
         """Sets the current user's state after a successful login."""
         self.current_user_email = email
-        self.current_user_details = get_user_details(email)
+        self.current_user_details = details or db.get_user_details(email)
         self.show_frame("MainPage")
 
     def logout_user(self):
@@ -231,8 +109,8 @@ class LoginPage(tk.Frame):
         self.password_entry = tk.Entry(login_frame, show="*", font=controller.body_font, width=30)
         self.password_entry.pack(pady=5)
 
-        login_button = tk.Button(login_frame, text="Login", font=controller.header_font, bg=controller.utrgv_orange, fg="white", command=self.login)
-        login_button.pack(pady=20, fill="x")
+        self.login_button = tk.Button(login_frame, text="Login", font=controller.header_font, bg=controller.utrgv_orange, fg="white", command=self.login)
+        self.login_button.pack(pady=20, fill="x")
 
         register_button = tk.Button(login_frame, text="Register New User", font=controller.header_font, bg=controller.utrgv_gray, fg="white", command=lambda: controller.show_frame("RegisterPage"))
         register_button.pack(pady=(0, 10), fill="x")
@@ -244,15 +122,23 @@ class LoginPage(tk.Frame):
         self.username_entry.delete(0, tk.END)
         self.password_entry.delete(0, tk.END)
 
-        with sqlite3.connect('Spotlight.db') as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT password FROM studentuser WHERE email=?", (username,))
-            row = cursor.fetchone()
-            if row and row[0] == password:
-                messagebox.showinfo("Login Success", f"Welcome, {username}!")
-                self.controller.login_user(username)
-            else:
-                messagebox.showerror("Login Failed", "Invalid username or password.")
+        # the password hash is slow on purpose, check it on the worker so the window stays responsive
+        self.login_button.config(state=tk.DISABLED, text="Signing in...")
+        self.controller.worker.submit(credentials.authenticate, db, username, password,
+                                      on_done=lambda details: self.finish_login(username, details),
+                                      on_error=self.login_failed)
+
+    def finish_login(self, username, details):
+        self.login_button.config(state=tk.NORMAL, text="Login")
+        if details:
+            messagebox.showinfo("Login Success", f"Welcome, {username}!")
+            self.controller.login_user(username, details)
+        else:
+            messagebox.showerror("Login Failed", "Invalid username or password.")
+
+    def login_failed(self, error):
+        self.login_button.config(state=tk.NORMAL, text="Login")
+        messagebox.showerror("Database Error", f"An error occurred: {error}")
 
 # --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
 # REGISTRATION PAGE
@@ -283,8 +169,8 @@ class RegisterPage(tk.Frame):
         button_frame = tk.Frame(reg_frame, bg="white")
         button_frame.pack(pady=20, fill="x")
 
-        submit_button = tk.Button(button_frame, text="Submit", font=controller.header_font, bg=controller.utrgv_orange, fg="white", command=self.register_user)
-        submit_button.pack(side="left", expand=True, padx=(0, 5))
+        self.submit_button = tk.Button(button_frame, text="Submit", font=controller.header_font, bg=controller.utrgv_orange, fg="white", command=self.register_user)
+        self.submit_button.pack(side="left", expand=True, padx=(0, 5))
 
         back_button = tk.Button(button_frame, text="Back to Login", font=controller.header_font, bg=controller.utrgv_gray, fg="white", command=lambda: controller.show_frame("LoginPage"))
         back_button.pack(side="right", expand=True, padx=(5, 0))
@@ -310,23 +196,27 @@ class RegisterPage(tk.Frame):
             messagebox.showerror("Invalid Email", "Please use a valid @utrgv.edu university email to register.")
             return
 
-        with sqlite3.connect('Spotlight.db') as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT email FROM studentuser WHERE email=?", (email,))
-            if cursor.fetchone():
+        def create(taken):
+            if taken:
+                self.submit_button.config(state=tk.NORMAL)
                 messagebox.showerror("Error", "An account with this email already exists.")
                 return
+            # hashing the password takes a moment, do it on the worker
+            self.controller.worker.submit(credentials.create_account, db, first_name, last_name, student_id, email, major, password,
+                                          on_done=self.finish_register, on_error=self.register_failed)
 
-            try:
-                cursor.execute(
-                    "INSERT INTO studentuser (first_name, last_name, student_id, email, major, password) VALUES (?, ?, ?, ?, ?, ?)",
-                    (first_name, last_name, student_id, email, major, password)
-                )
-                conn.commit()
-            except Exception as e:
-                messagebox.showerror("Database Error", f"An error occurred: {e}")
-                return
+        self.submit_button.config(state=tk.DISABLED)
+        self.controller.worker.submit(db.email_exists, email, on_done=create, on_error=self.register_failed)
 
+    def register_failed(self, error):
+        self.submit_button.config(state=tk.NORMAL)
+        if isinstance(error, sqlite3.IntegrityError):
+            messagebox.showerror("Error", "An account with this email already exists.")
+        else:
+            messagebox.showerror("Database Error", f"An error occurred: {error}")
+
+    def finish_register(self, _):
+        self.submit_button.config(state=tk.NORMAL)
         messagebox.showinfo("Success", "Account created successfully! Please log in.")
         for entry in self.entries.values():
             entry.delete(0, tk.END)
@@ -342,7 +232,8 @@ class MainPage(tk.Frame):
         super().__init__(parent, bg="#f0f0f0")
         self.controller = controller
         self.selected_event_id = None
-        self.events = []
+        self.search_results = None  # [{id, label}] while the search box has text, None shows every event
+        self._search_after = None
 
         self.columnconfigure(0, weight=1, minsize=300)
         self.columnconfigure(1, weight=2)
@@ -363,14 +254,22 @@ class MainPage(tk.Frame):
         # --- Left Panel: Events List ---
         left_panel = tk.Frame(self, bg="white", padx=10, pady=10)
         left_panel.grid(row=1, column=0, sticky="nsew", padx=(10, 5), pady=10)
-        left_panel.rowconfigure(1, weight=1)
+        left_panel.rowconfigure(2, weight=1)
         
         events_label = tk.Label(left_panel, text="Upcoming Events", font=controller.header_font, bg="white", fg=controller.utrgv_gray)
         events_label.grid(row=0, column=0, sticky="w", pady=(0, 10))
 
-        self.events_listbox = tk.Listbox(left_panel, font=controller.body_font, selectbackground=controller.utrgv_orange, relief="flat")
-        self.events_listbox.grid(row=1, column=0, sticky="nsew")
-        self.events_listbox.bind("<<ListboxSelect>>", self.on_event_select)
+        # --- Search box, searches as you type ---
+        self.search_entry = tk.Entry(left_panel, font=controller.body_font)
+        self.search_entry.grid(row=1, column=0, sticky="ew", pady=(0, 5))
+        self.search_entry.bind("<KeyRelease>", self.on_search_typed)
+
+        # only the visible rows are widgets, events are paged in from the database as you scroll
+        left_panel.columnconfigure(0, weight=1)
+        self.events_list = EventList(left_panel, load_page=self.load_events_page, on_select=self.on_event_select,
+                                     body_font=controller.body_font, select_color=controller.utrgv_orange,
+                                     empty_text="No events yet.")
+        self.events_list.grid(row=2, column=0, sticky="nsew")
 
         # --- Right Panel: Event Details ---
         right_panel = tk.Frame(self, bg="white", padx=20, pady=20)
@@ -397,6 +296,9 @@ class MainPage(tk.Frame):
         self.view_rsvps_button = tk.Button(button_container, text="View RSVPs", font=controller.header_font, bg="#CC4709", fg="white", command=self.open_rsvp_list_window)
         # This button is hidden by default and shown in on_event_select
 
+        # --- Batch Find a Vaquero for the event owner ---
+        self.match_all_button = tk.Button(button_container, text="Match Vaqueros", font=controller.header_font, bg="#CC4709", fg="white", command=self.match_all_vaqueros)
+
         # --- Comments Section ---
         comments_frame = tk.Frame(right_panel, bg="white")
         comments_frame.pack(fill="both", expand=True, pady=(10,0))
@@ -406,17 +308,10 @@ class MainPage(tk.Frame):
         comments_label = tk.Label(comments_frame, text="Comments", font=controller.header_font, bg="white", fg=controller.utrgv_gray)
         comments_label.grid(row=0, column=0, sticky="w")
         
-        # --- MODIFIED: Scrollable frame for comments ---
-        self.comments_canvas = tk.Canvas(comments_frame, bg="#fafafa", highlightthickness=0)
-        self.comments_scrollbar = tk.Scrollbar(comments_frame, orient="vertical", command=self.comments_canvas.yview)
-        self.scrollable_comments_frame = tk.Frame(self.comments_canvas, bg="#fafafa")
-
-        self.scrollable_comments_frame.bind("<Configure>", lambda e: self.comments_canvas.configure(scrollregion=self.comments_canvas.bbox("all")))
-        self.comments_canvas.create_window((0, 0), window=self.scrollable_comments_frame, anchor="nw")
-        self.comments_canvas.configure(yscrollcommand=self.comments_scrollbar.set)
-
-        self.comments_canvas.grid(row=1, column=0, columnspan=2, sticky="nsew", pady=5)
-        self.comments_scrollbar.grid(row=1, column=2, sticky="ns")
+        # --- Comment feed: a fixed set of recycled comment widgets ---
+        self.comment_feed = CommentFeed(comments_frame, load_page=self.load_comments_page,
+                                        can_delete=self.can_delete_comment, on_delete=self.delete_comment)
+        self.comment_feed.grid(row=1, column=0, columnspan=2, sticky="nsew", pady=5)
 
         self.comment_entry = tk.Entry(comments_frame, font=controller.body_font, width=50)
         self.comment_entry.grid(row=2, column=0, sticky="ew", pady=5)
@@ -442,6 +337,8 @@ class MainPage(tk.Frame):
         elif role == 'organization':
             create_event_button = tk.Button(self.header_frame, text="Create Event", font=self.controller.header_font, bg="#CC4709", fg="white", command=self.open_create_event_window)
             create_event_button.pack(side="right", padx=10)
+            import_button = tk.Button(self.header_frame, text="Import Events", font=self.controller.header_font, bg="#CC4709", fg="white", command=self.import_events)
+            import_button.pack(side="right", padx=10)
         
         elif role == 'student':
             apply_org_button = tk.Button(self.header_frame, text="Apply as Organization", font=self.controller.header_font, bg="#CC4709", fg="white", command=self.open_org_application)
@@ -449,23 +346,59 @@ class MainPage(tk.Frame):
 
 
     def refresh_data(self):
-        """Populates the event listbox with event names from the database."""
+        """Syncs the shared event cache in the background, only changed events are read."""
         self.setup_header_buttons()
-        self.events = load_events_from_db()
-        self.events_listbox.delete(0, tk.END)
-        for event in self.events:
-            self.events_listbox.insert(tk.END, event["name"])
         self.clear_details()
+        if not len(self.controller.event_cache):
+            self.events_list.reset(0, empty_text="Loading events...")
+        self.controller.worker.submit(self.controller.event_cache.sync, on_done=self.show_events, channel="main-events")
+
+    def show_events(self, changed_ids):
+        """Called on the Tk thread once the cache is up to date."""
+        if self.search_results is not None:
+            self.run_search()  # the changes may add or drop matches
+            return
+        self.events_list.reset(len(self.controller.event_cache), empty_text="No events yet.")
+
+    def load_events_page(self, offset, limit, deliver, fail):
+        # served from memory, delivered after the current redraw finishes
+        if self.search_results is not None:
+            cache = self.controller.event_cache
+            # an event deleted since the search ran is skipped until the next search
+            rows = [dict(e, label=r["label"]) for r in self.search_results[offset:offset + limit] if (e := cache.get(r["id"])) is not None]
+        else:
+            rows = self.controller.event_cache.page(offset, limit)
+        self.after_idle(lambda: deliver(rows))
+
+    # --- Search ---
+
+    def on_search_typed(self, event):
+        # wait for a pause in the typing instead of querying on every key
+        if self._search_after is not None:
+            self.after_cancel(self._search_after)
+        self._search_after = self.after(200, self.run_search)
+
+    def run_search(self):
+        self._search_after = None
+        text = self.search_entry.get()
+        if search.match_query(text) is None:
+            self.controller.worker.cancel("event-search")
+            self.search_results = None
+            self.show_events(None)
+            return
+        self.controller.worker.submit(search.search, db, text, on_done=self.show_search_results, channel="event-search")
+
+    def show_search_results(self, results):
+        cache = self.controller.event_cache
+        # matches the cache hasn't synced yet show up after the next refresh
+        self.search_results = [r for r in results if cache.get(r["id"]) is not None]
+        self.events_list.reset(len(self.search_results), empty_text="No events match your search.")
 
-    def on_event_select(self, event):
+    def on_event_select(self, event_data):
         # --- MODIFIED: Hide RSVP view button initially ---
         self.view_rsvps_button.pack_forget()
+        self.match_all_button.pack_forget()
 
-        selection_indices = self.events_listbox.curselection()
-        if not selection_indices: return
-        
-        selected_index = selection_indices[0]
-        event_data = self.events[selected_index]
         self.selected_event_id = event_data["id"]
         
         self.event_title.config(text=event_data["name"])
@@ -478,52 +411,46 @@ class MainPage(tk.Frame):
         user_details = self.controller.current_user_details
         if user_details and user_details.get('role') == 'organization' and user_details.get('email') == event_data.get('organization_email'):
             self.view_rsvps_button.pack(side="left", padx=(10, 0))
+            self.match_all_button.pack(side="left", padx=(10, 0))
 
         self.load_comments()
 
     def load_comments(self):
-        """Loads and displays comments for the selected event."""
-        # --- MODIFIED: Rebuilt for dynamic widgets ---
-        for widget in self.scrollable_comments_frame.winfo_children():
-            widget.destroy()
+        """Counts the comments for the selected event in the background, pages are loaded as they scroll into view."""
+        if self.selected_event_id is None:
+            self.controller.worker.cancel("comments")
+            self.comment_feed.reset(0, empty_text="")
+            return
 
-        if self.selected_event_id is None: return
+        self.comment_feed.reset(0, empty_text="Loading comments...")
+        event_id = self.selected_event_id
+        # a newer request on the "comments" channel (another event selected) drops this result
+        self.controller.worker.submit(db.count_comments, event_id, channel="comments",
+                                      on_done=lambda total: self.show_comments(event_id, total))
 
-        with sqlite3.connect('Spotlight.db') as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, user_email, comment_text, strftime('%Y-%m-%d %H:%M', timestamp) 
-                FROM comments WHERE event_id=? ORDER BY timestamp DESC
-            """, (self.selected_event_id,))
-            comments = cursor.fetchall()
-        
-        if comments:
-            for comment_id, email, comment, ts in comments:
-                comment_frame = tk.Frame(self.scrollable_comments_frame, bg="#fafafa")
-                comment_frame.pack(fill="x", pady=5, padx=5)
-                
-                header = f"{email.split('@')[0]} ({ts}):"
-                tk.Label(comment_frame, text=header, font=font.Font(family="Helvetica", size=10, weight="bold"), bg="#fafafa", justify="left").pack(anchor="w")
-                tk.Label(comment_frame, text=comment, wraplength=450, bg="#fafafa", justify="left").pack(anchor="w")
-
-                # --- NEW: Add delete button if user is author or dean ---
-                current_user = self.controller.current_user_details
-                if current_user and (current_user['email'] == email or current_user['role'] == 'dean'):
-                    delete_btn = tk.Button(comment_frame, text="Delete", font=("Helvetica", 8), bg="#dc3545", fg="white", 
-                                           command=lambda c_id=comment_id: self.delete_comment(c_id))
-                    delete_btn.pack(anchor="e")
-        else:
-            tk.Label(self.scrollable_comments_frame, text="No comments yet. Be the first to comment!", bg="#fafafa").pack()
+    def show_comments(self, event_id, total):
+        """Sizes the comment feed once the comments are counted."""
+        if event_id != self.selected_event_id: return
+        self.comment_feed.reset(total, empty_text="No comments yet. Be the first to comment!")
+
+    def load_comments_page(self, offset, limit, deliver, fail):
+        def failed(error):
+            fail()  # so the page is asked for again instead of staying on "Loading..."
+            messagebox.showerror("Database Error", f"Couldn't load the comments: {error}")
+
+        self.controller.worker.submit(db.comments_page, self.selected_event_id, offset, limit,
+                                      on_done=deliver, on_error=failed)
+
+    def can_delete_comment(self, comment):
+        """Authors can delete their own comments, the dean can delete any."""
+        current_user = self.controller.current_user_details
+        return bool(current_user) and (current_user['email'] == comment['user_email'] or current_user['role'] == 'dean')
 
     def delete_comment(self, comment_id):
         """Deletes a specific comment from the database."""
         # --- NEW: Function to delete comments ---
         if messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this comment?"):
-            with sqlite3.connect('Spotlight.db') as conn:
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM comments WHERE id=?", (comment_id,))
-                conn.commit()
-            self.load_comments() # Refresh the comment list
+            self.controller.worker.submit(db.delete_comment, comment_id, on_done=lambda _: self.load_comments()) # Refresh the comment list
 
     def post_comment(self):
         """Saves a new comment to the database."""
@@ -535,16 +462,14 @@ class MainPage(tk.Frame):
             messagebox.showwarning("No Event", "Please select an event to comment on.")
             return
 
-        with sqlite3.connect('Spotlight.db') as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO comments (event_id, user_email, comment_text) VALUES (?, ?, ?)",
-                (self.selected_event_id, self.controller.current_user_email, comment_text)
-            )
-            conn.commit()
-        
-        self.comment_entry.delete(0, tk.END)
-        self.load_comments()
+        event_id = self.selected_event_id
+
+        def posted(_):
+            self.comment_entry.delete(0, tk.END)
+            if event_id == self.selected_event_id:
+                self.load_comments()
+
+        self.controller.worker.submit(db.post_comment, event_id, self.controller.current_user_email, comment_text, on_done=posted)
 
     def clear_details(self):
         self.selected_event_id = None
@@ -553,8 +478,9 @@ class MainPage(tk.Frame):
         self.event_description.config(text="")
         self.rsvp_button.config(state=tk.DISABLED)
         self.view_rsvps_button.pack_forget()
-        for widget in self.scrollable_comments_frame.winfo_children():
-            widget.destroy()
+        self.match_all_button.pack_forget()
+        self.controller.worker.cancel("comments")
+        self.comment_feed.reset(0, empty_text="")
 
     def open_rsvp_window(self):
         """Opens a window to RSVP and opt-in to Find a Vaquero."""
@@ -570,78 +496,45 @@ class MainPage(tk.Frame):
         find_vaquero_var = tk.BooleanVar()
         tk.Checkbutton(rsvp_win, text="Find a Vaquero: Match with another student!", variable=find_vaquero_var, font=self.controller.body_font).pack(pady=10)
 
+        event_id = self.selected_event_id
+
+        def rsvp_saved(find_vaquero):
+            if rsvp_win.winfo_exists(): rsvp_win.destroy()
+            messagebox.showinfo("RSVP Confirmed", "Your RSVP has been recorded.")
+            if find_vaquero:
+                self.find_vaquero_match(event_id, self.controller.current_user_email)
+
+        def rsvp_failed(error):
+            if rsvp_win.winfo_exists(): rsvp_win.destroy()
+            if isinstance(error, sqlite3.IntegrityError):
+                messagebox.showwarning("Already RSVP'd", "You have already RSVP'd for this event.")
+            else:
+                messagebox.showerror("Database Error", f"An error occurred: {error}")
+
         def submit_rsvp():
             find_vaquero = find_vaquero_var.get()
-            user_email = self.controller.current_user_email
-            
-            with sqlite3.connect('Spotlight.db') as conn:
-                cursor = conn.cursor()
-                try:
-                    cursor.execute(
-                        "INSERT INTO rsvps (event_id, user_email, find_vaquero) VALUES (?, ?, ?)",
-                        (self.selected_event_id, user_email, find_vaquero)
-                    )
-                    conn.commit()
-                    messagebox.showinfo("RSVP Confirmed", "Your RSVP has been recorded.", parent=rsvp_win)
-                    
-                    if find_vaquero:
-                        self.find_vaquero_match(self.selected_event_id, user_email)
-
-                except sqlite3.IntegrityError:
-                    messagebox.showwarning("Already RSVP'd", "You have already RSVP'd for this event.", parent=rsvp_win)
-            
-            rsvp_win.destroy()
+            confirm_button.config(state=tk.DISABLED)
+            self.controller.worker.submit(db.create_rsvp, event_id, self.controller.current_user_email, find_vaquero,
+                                          on_done=lambda _: rsvp_saved(find_vaquero), on_error=rsvp_failed)
 
-        tk.Button(rsvp_win, text="Confirm RSVP", command=submit_rsvp, bg=self.controller.utrgv_orange, fg="white", font=self.controller.header_font).pack(pady=20)
+        confirm_button = tk.Button(rsvp_win, text="Confirm RSVP", command=submit_rsvp, bg=self.controller.utrgv_orange, fg="white", font=self.controller.header_font)
+        confirm_button.pack(pady=20)
 
     def find_vaquero_match(self, event_id, current_user_email):
         """Logic to find a match for the 'Find a Vaquero' feature."""
         current_user_details = self.controller.current_user_details
-        
-        with sqlite3.connect('Spotlight.db') as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                SELECT r.user_email, u.major 
-                FROM rsvps r
-                JOIN studentuser u ON r.user_email = u.email
-                WHERE r.event_id = ? 
-                  AND r.find_vaquero = 1 
-                  AND r.user_email != ?
-                  AND r.user_email NOT IN (SELECT user1_email FROM vaquero_matches WHERE event_id = ?)
-                  AND r.user_email NOT IN (SELECT user2_email FROM vaquero_matches WHERE event_id = ?)
-            """, (event_id, current_user_email, event_id, event_id))
-            
-            potential_matches = [dict(row) for row in cursor.fetchall()]
-
-            if not potential_matches:
-                return
+        # pairs the user with an unmatched opted-in attendee, preferring the same major
+        self.controller.worker.submit(matching.match_new_rsvp, db, event_id, current_user_email, current_user_details['major'],
+                                      on_done=self.show_vaquero_match)
 
-            same_major_matches = [p for p in potential_matches if p['major'] == current_user_details['major']]
-            
-            match_found = None
-            if same_major_matches:
-                match_found = random.choice(same_major_matches)
-            else:
-                match_found = random.choice(potential_matches)
-
-            if match_found:
-                matched_user_email = match_found['user_email']
-                
-                cursor.execute(
-                    "INSERT INTO vaquero_matches (event_id, user1_email, user2_email) VALUES (?, ?, ?)",
-                    (event_id, current_user_email, matched_user_email)
-                )
-                conn.commit()
-                
-                matched_user_details = get_user_details(matched_user_email)
-                
-                messagebox.showinfo("Vaquero Found!", 
-                                    f"You've been matched with another Vaquero!\n\n"
-                                    f"Name: {matched_user_details['first_name']} {matched_user_details['last_name']}\n"
-                                    f"Email: {matched_user_details['email']}\n\n"
-                                    f"Feel free to connect before the event!")
+    def show_vaquero_match(self, matched_user_details):
+        if not matched_user_details:
+            return
+        messagebox.showinfo("Vaquero Found!", 
+                            f"You've been matched with another Vaquero!\n\n"
+                            f"Name: {matched_user_details['first_name']} {matched_user_details['last_name']}\n"
+                            f"Email: {matched_user_details['email']}\n\n"
+                            f"Feel free to connect before the event!")
 
 
     def open_org_application(self):
@@ -672,28 +565,45 @@ class MainPage(tk.Frame):
             if not all([name, email, org]):
                 messagebox.showerror("Error", "All fields are required.", parent=app_win)
                 return
-            with sqlite3.connect('Spotlight.db') as conn:
-                cursor = conn.cursor()
-                cursor.execute("INSERT INTO org_requests (name, email, organization) VALUES (?, ?, ?)", (name, email, org))
-                conn.commit()
-            messagebox.showinfo("Submitted", "Your application has been submitted for approval.", parent=app_win)
-            app_win.destroy()
-        tk.Button(app_win, text="Submit", command=submit, bg="#f05023", fg="white").pack(pady=20)
+            submit_button.config(state=tk.DISABLED)
+            self.controller.worker.submit(db.create_org_request, name, email, org, on_done=submitted, on_error=submit_failed)
+
+        def submitted(_):
+            if app_win.winfo_exists(): app_win.destroy()
+            messagebox.showinfo("Submitted", "Your application has been submitted for approval.")
+
+        def submit_failed(error):
+            if app_win.winfo_exists(): submit_button.config(state=tk.NORMAL)
+            messagebox.showerror("Database Error", f"An error occurred: {error}")
+
+        submit_button = tk.Button(app_win, text="Submit", command=submit, bg="#f05023", fg="white")
+        submit_button.pack(pady=20)
 
     def open_approval_window(self):
         win = tk.Toplevel(self)
         win.title("Approve Organization Requests")
         win.geometry("600x400")
-        
-        with sqlite3.connect('Spotlight.db') as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT id, name, email, organization FROM org_requests WHERE status='pending'")
-            requests = cursor.fetchall()
 
+        loading_label = tk.Label(win, text="Loading requests...")
+        loading_label.pack(pady=20)
+
+        def show_requests(requests):
+            if not win.winfo_exists(): return # window was closed while loading
+            loading_label.destroy()
+            self.fill_approval_window(win, requests)
+
+        self.controller.worker.submit(db.pending_org_requests, on_done=show_requests)
+
+    def fill_approval_window(self, win, requests):
         if not requests:
             tk.Label(win, text="No pending requests.").pack(pady=20)
             return
 
+        def decided(title, message):
+            if win.winfo_exists(): win.destroy()
+            messagebox.showinfo(title, message)
+            self.open_approval_window()
+
         for req_id, name, email, org in requests:
             frame = tk.Frame(win, pady=5)
             frame.pack(fill="x", padx=10)
@@ -701,23 +611,12 @@ class MainPage(tk.Frame):
             
             # --- MODIFIED: Added Deny button and logic ---
             def deny_action(req_id=req_id, email=email):
-                with sqlite3.connect('Spotlight.db') as conn:
-                    cursor = conn.cursor()
-                    cursor.execute("UPDATE org_requests SET status='denied' WHERE id=?", (req_id,))
-                    conn.commit()
-                messagebox.showinfo("Denied", f"Request for {email} has been denied.", parent=win)
-                win.destroy()
-                self.open_approval_window()
+                self.controller.worker.submit(db.deny_org_request, req_id,
+                                              on_done=lambda _: decided("Denied", f"Request for {email} has been denied."))
 
             def approve_action(req_id=req_id, email=email, org=org):
-                with sqlite3.connect('Spotlight.db') as conn:
-                    cursor = conn.cursor()
-                    cursor.execute("UPDATE org_requests SET status='approved' WHERE id=?", (req_id,))
-                    cursor.execute("UPDATE studentuser SET role='organization', organization=? WHERE email=?", (org, email))
-                    conn.commit()
-                messagebox.showinfo("Approved", f"{email} is now an Organization user for {org}.", parent=win)
-                win.destroy()
-                self.open_approval_window()
+                self.controller.worker.submit(db.approve_org_request, req_id, email, org,
+                                              on_done=lambda _: decided("Approved", f"{email} is now an Organization user for {org}."))
             
             tk.Button(frame, text="Deny", bg="#dc3545", fg="white", command=deny_action).pack(side="right", padx=5)
             tk.Button(frame, text="Approve", bg="#228B22", fg="white", command=approve_action).pack(side="right")
@@ -755,19 +654,32 @@ class MainPage(tk.Frame):
                 messagebox.showerror("Invalid Date", "Please use YYYY-MM-DD format for the date.", parent=win)
                 return
 
-            with sqlite3.connect('Spotlight.db') as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "INSERT INTO events (name, date, location, description, organization_email) VALUES (?, ?, ?, ?, ?)",
-                    (name, date, location, description, self.controller.current_user_email)
-                )
-                conn.commit()
-            
-            messagebox.showinfo("Success", "Event created successfully!", parent=win)
-            win.destroy()
+            create_button.config(state=tk.DISABLED)
+            self.controller.worker.submit(db.create_event, name, date, location, description, self.controller.current_user_email,
+                                          on_done=created, on_error=create_failed)
+
+        def created(_):
+            if win.winfo_exists(): win.destroy()
+            messagebox.showinfo("Success", "Event created successfully!")
             self.refresh_data()
 
-        tk.Button(win, text="Create Event", command=submit_event, bg=self.controller.utrgv_orange, fg="white").pack(pady=20)
+        def create_failed(error):
+            if win.winfo_exists(): create_button.config(state=tk.NORMAL)
+            messagebox.showerror("Database Error", f"An error occurred: {error}")
+
+        create_button = tk.Button(win, text="Create Event", command=submit_event, bg=self.controller.utrgv_orange, fg="white")
+        create_button.pack(pady=20)
+
+    def import_events(self):
+        """Bulk creates events from a CSV (name, date, location, description) or .ics file."""
+        path = filedialog.askopenfilename(title="Import Events", filetypes=[("Event files", "*.csv *.ics"), ("All files", "*.*")])
+        if not path: return
+
+        def done(report):
+            messagebox.showinfo("Import Events", report.summary())
+            self.refresh_data()  # the event cache picks up the new rows from event_changes
+
+        self.controller.worker.submit(importer.import_file, db, path, self.controller.current_user_email, on_done=done)
 
     def open_rsvp_list_window(self):
         """Shows a list of users who have RSVP'd for the selected event."""
@@ -778,18 +690,24 @@ class MainPage(tk.Frame):
         win.title("RSVP List")
         win.geometry("400x500")
 
-        with sqlite3.connect('Spotlight.db') as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT u.first_name, u.last_name, u.email 
-                FROM rsvps r
-                JOIN studentuser u ON r.user_email = u.email
-                WHERE r.event_id = ?
-            """, (self.selected_event_id,))
-            rsvps = cursor.fetchall()
-        
         tk.Label(win, text=f"Attendees for: {self.event_title.cget('text')}", font=self.controller.header_font).pack(pady=10)
+        loading_label = tk.Label(win, text="Loading attendees...")
+        loading_label.pack(pady=20)
+
+        def show_rsvps(rsvps):
+            if not win.winfo_exists(): return # window was closed while loading
+            loading_label.destroy()
+            self.fill_rsvp_list(win, rsvps)
+
+        self.controller.worker.submit(db.event_rsvps, self.selected_event_id, on_done=show_rsvps)
+
+    def match_all_vaqueros(self):
+        """Pairs every student still waiting for a match on the selected event."""
+        if self.selected_event_id is None: return
+        self.controller.worker.submit(matching.match_event, db, self.selected_event_id,
+                                      on_done=lambda pairs: messagebox.showinfo("Find a Vaquero", f"{len(pairs)} new match(es) made."))
 
+    def fill_rsvp_list(self, win, rsvps):
         if not rsvps:
             tk.Label(win, text="No one has RSVP'd yet.").pack(pady=20)
             return
@@ -811,8 +729,6 @@ class CalendarPage(tk.Frame):
         self.controller = controller
         self.year = datetime.now().year
         self.month = datetime.now().month
-        self.events = []
-        self.event_dates = set()
 
         self.columnconfigure(0, weight=1)
         self.rowconfigure(1, weight=1)
@@ -836,8 +752,10 @@ class CalendarPage(tk.Frame):
         next_button = tk.Button(nav_frame, text=">", command=self.next_month, font=controller.header_font)
         next_button.pack(side="left")
 
-        self.calendar_frame = tk.Frame(calendar_panel, bg="white")
-        self.calendar_frame.pack()
+        # --- Fixed 6x7 grid, restyled in place on every month change ---
+        self.calendar_grid = CalendarGrid(calendar_panel, on_day=self.show_day_events,
+                                          header_font=controller.header_font, highlight_color=controller.utrgv_orange)
+        self.calendar_grid.pack()
 
         details_panel = tk.Frame(self, bg="white", padx=20, pady=20)
         details_panel.grid(row=1, column=1, sticky="nsew", padx=(5, 10), pady=10)
@@ -848,49 +766,17 @@ class CalendarPage(tk.Frame):
         self.details_text.config(state=tk.DISABLED)
 
     def draw_calendar(self):
-        for widget in self.calendar_frame.winfo_children():
-            widget.destroy()
-
         self.month_label.config(text=f"{calendar.month_name[self.month]} {self.year}")
-
-        days = ["Sun", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat"]
-        for i, day in enumerate(days):
-            lbl = tk.Label(self.calendar_frame, text=day, font=self.controller.header_font, bg="white")
-            lbl.grid(row=0, column=i, padx=5, pady=5)
-
-        month_days = calendar.monthcalendar(self.year, self.month)
-        for row_idx, week in enumerate(month_days, 1):
-            for col_idx, day_num in enumerate(week):
-                if day_num == 0: continue
-                
-                day_date = datetime(self.year, self.month, day_num).date()
-                btn_bg = "white"
-                btn_fg = "black"
-                btn_font = self.controller.body_font
-                
-                if day_date in self.event_dates:
-                    btn_bg = self.controller.utrgv_orange
-                    btn_fg = "white"
-                    btn_font = font.Font(family="Helvetica", size=11, weight="bold")
-
-                btn = tk.Button(self.calendar_frame, text=str(day_num), width=4, height=2,
-                                bg=btn_bg, fg=btn_fg, font=btn_font,
-                                command=lambda d=day_num: self.show_day_events(d))
-                btn.grid(row=row_idx, column=col_idx, padx=2, pady=2)
+        event_days = self.controller.event_cache.month(self.year, self.month)
+        self.calendar_grid.show(self.year, self.month, set(event_days))
 
     def prev_month(self):
-        self.month -= 1
-        if self.month == 0:
-            self.month = 12
-            self.year -= 1
+        self.year, self.month = shift_month(self.year, self.month, -1)
         self.draw_calendar()
         self.clear_details()
 
     def next_month(self):
-        self.month += 1
-        if self.month == 13:
-            self.month = 1
-            self.year += 1
+        self.year, self.month = shift_month(self.year, self.month, 1)
         self.draw_calendar()
         self.clear_details()
 
@@ -898,7 +784,7 @@ class CalendarPage(tk.Frame):
         selected_date_str = f"{self.year}-{self.month:02d}-{day:02d}"
         self.details_label.config(text=f"Events for {selected_date_str}")
         
-        day_events = [e for e in self.events if e["date"] == selected_date_str]
+        day_events = self.controller.event_cache.on_date(datetime(self.year, self.month, day).date())
         
         self.details_text.config(state=tk.NORMAL)
         self.details_text.delete("1.0", tk.END)
@@ -919,10 +805,13 @@ class CalendarPage(tk.Frame):
 
     def refresh_data(self):
         """Called when the frame is shown."""
-        self.events = load_events_from_db()
-        self.event_dates = {datetime.strptime(e["date"], "%Y-%m-%d").date() for e in self.events}
-        self.draw_calendar()
+        self.month_label.config(text="Loading...")
         self.clear_details()
+        self.controller.worker.submit(self.controller.event_cache.sync, on_done=self.show_events, channel="calendar-events")
+
+    def show_events(self, changed_ids):
+        """Called on the Tk thread once the shared event cache is up to date."""
+        self.draw_calendar()
 
 # --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
 # APPLICATION STARTUP
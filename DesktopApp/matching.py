@@ -0,0 +1,37 @@
+from collections import defaultdict
+
+# --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
+# FIND A VAQUERO MATCHING
+# Batch mode pairs every waiting student of an event at once, incremental
+# mode matches a single new RSVP. Either way the vaquero_match_members
+# table refuses to put a student in two matches for the same event.
+# --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
+
+def pair_by_major(candidates):
+    """Pairs candidates ({'user_email', 'major'} dicts, in RSVP order) as (email, email) tuples.
+
+    Students are paired inside their major first, then the one student left over
+    from each odd-sized major is paired with the other leftovers. That gives the
+    most same-major pairs possible and leaves at most one student unmatched."""
+    by_major = defaultdict(list)
+    for candidate in candidates:
+        by_major[candidate["major"]].append(candidate["user_email"])
+
+    pairs = []
+    leftovers = []
+    for emails in by_major.values():
+        if len(emails) % 2:
+            leftovers.append(emails.pop())  # the latest RSVP of the major waits
+        pairs.extend(zip(emails[0::2], emails[1::2]))
+    pairs.extend(zip(leftovers[0::2], leftovers[1::2]))
+    return pairs
+
+
+def match_event(repo, event_id):
+    """Batch mode: matches everyone still waiting for the event and returns the saved pairs."""
+    return repo.save_matches(event_id, pair_by_major(repo.unmatched_vaquero_candidates(event_id)))
+
+
+def match_new_rsvp(repo, event_id, user_email, major):
+    """Incremental mode: the partner's details for a student who just opted in, or None."""
+    return repo.match_new_vaquero(event_id, user_email, major)
@@ -0,0 +1,285 @@
+# --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
+# SCHEMA MIGRATIONS FOR Spotlight.db
+# Each migration runs once, in order, and pending ones run together in
+# one transaction. The number of migrations applied is kept in PRAGMA
+# user_version, so an up to date database costs one PRAGMA read at startup.
+# Never edit a migration that has shipped, add a new one to the end.
+# --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
+
+def _initial_schema(conn):
+    """The tables main.py used to create on every launch (IF NOT EXISTS, so old databases pass through)."""
+    # --- studentuser Table ---
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS studentuser(
+            first_name TEXT,
+            last_name TEXT,
+            student_id TEXT,
+            email TEXT PRIMARY KEY,
+            major TEXT,
+            password TEXT,
+            role TEXT DEFAULT 'student',
+            organization TEXT
+        )
+    """)
+
+    # --- org_requests Table ---
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS org_requests(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            email TEXT,
+            organization TEXT,
+            status TEXT DEFAULT 'pending'
+        )
+    """)
+
+    # --- events Table ---
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS events(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            date TEXT NOT NULL,
+            location TEXT,
+            description TEXT,
+            organization_email TEXT
+        )
+    """)
+
+    # --- comments Table ---
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS comments(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_id INTEGER,
+            user_email TEXT,
+            comment_text TEXT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (event_id) REFERENCES events(id)
+        )
+    """)
+
+    # --- rsvps Table ---
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS rsvps(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_id INTEGER,
+            user_email TEXT,
+            find_vaquero BOOLEAN,
+            FOREIGN KEY (event_id) REFERENCES events(id),
+            UNIQUE(event_id, user_email)
+        )
+    """)
+
+    # --- vaquero_matches Table ---
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS vaquero_matches(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_id INTEGER,
+            user1_email TEXT,
+            user2_email TEXT,
+            FOREIGN KEY (event_id) REFERENCES events(id)
+        )
+    """)
+
+    # --- Ensure dean user exists ---
+    conn.execute("""
+        INSERT OR IGNORE INTO studentuser (first_name, last_name, student_id, email, major, password, role)
+        VALUES ('dean', 'pelton', '00000000', 'dean@utrgv.edu', 'Administration', 'dalmatians', 'dean')
+    """)
+
+
+def _event_change_log(conn):
+    """event_changes and its triggers for the event cache, plus the date index for the calendar."""
+    # load_events reads the events in date order from this instead of sorting the table
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_date ON events(date)")
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS event_changes(
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_id INTEGER NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS events_changed_insert AFTER INSERT ON events
+        BEGIN INSERT INTO event_changes (event_id) VALUES (new.id); END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS events_changed_update AFTER UPDATE ON events
+        BEGIN
+            INSERT INTO event_changes (event_id) VALUES (new.id);
+            INSERT INTO event_changes (event_id) SELECT old.id WHERE old.id != new.id;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS events_changed_delete AFTER DELETE ON events
+        BEGIN INSERT INTO event_changes (event_id) VALUES (old.id); END
+    """)
+
+
+def _vaquero_tables(conn):
+    """Match membership (one match per student per event) and the queue of students waiting."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS vaquero_match_members(
+            event_id INTEGER NOT NULL,
+            user_email TEXT NOT NULL,
+            match_id INTEGER NOT NULL REFERENCES vaquero_matches(id),
+            PRIMARY KEY (event_id, user_email)
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_vaquero_match_members_match ON vaquero_match_members(match_id)")
+    # matches made before the table existed
+    conn.execute("""
+        INSERT OR IGNORE INTO vaquero_match_members (event_id, user_email, match_id)
+        SELECT event_id, user1_email, id FROM vaquero_matches
+        UNION ALL
+        SELECT event_id, user2_email, id FROM vaquero_matches
+    """)
+
+    # opted-in students still waiting, oldest rowid first
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS vaquero_waiting(
+            event_id INTEGER NOT NULL,
+            user_email TEXT NOT NULL,
+            major TEXT,
+            UNIQUE (event_id, user_email)
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_vaquero_waiting_major ON vaquero_waiting(event_id, major)")
+    # students who opted in before the queue existed
+    conn.execute("""
+        INSERT OR IGNORE INTO vaquero_waiting (event_id, user_email, major)
+        SELECT r.event_id, r.user_email, u.major
+        FROM rsvps r
+        JOIN studentuser u ON r.user_email = u.email
+        LEFT JOIN vaquero_match_members m ON m.event_id = r.event_id AND m.user_email = r.user_email
+        WHERE r.find_vaquero = 1 AND m.user_email IS NULL
+        ORDER BY r.id
+    """)
+
+
+def _query_indexes(conn):
+    """Indexes for the comment feed, match lookups and the dean's approval list."""
+    # comments_page: WHERE event_id = ? ORDER BY timestamp DESC, id DESC
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_comments_event_timestamp ON comments(event_id, timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_vaquero_matches_event ON vaquero_matches(event_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_org_requests_status ON org_requests(status)")
+
+
+def _event_search(conn):
+    """events_fts, the full text index the search box queries, kept in step with events by triggers."""
+    # external content table: the index stores only the terms, the text stays in events
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+            name, description, location,
+            content='events', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS events_fts_insert AFTER INSERT ON events BEGIN
+            INSERT INTO events_fts (rowid, name, description, location)
+            VALUES (new.id, new.name, new.description, new.location);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS events_fts_delete AFTER DELETE ON events BEGIN
+            INSERT INTO events_fts (events_fts, rowid, name, description, location)
+            VALUES ('delete', old.id, old.name, old.description, old.location);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS events_fts_update AFTER UPDATE ON events BEGIN
+            INSERT INTO events_fts (events_fts, rowid, name, description, location)
+            VALUES ('delete', old.id, old.name, old.description, old.location);
+            INSERT INTO events_fts (rowid, name, description, location)
+            VALUES (new.id, new.name, new.description, new.location);
+        END
+    """)
+    # index the events that are already there
+    conn.execute("INSERT INTO events_fts (events_fts) VALUES ('rebuild')")
+
+
+def _sync_support(conn):
+    """What the web sync (WebApp/blog/sync.py) reads and writes: when each event change happened,
+    a change log for RSVPs, the web id of each event and how far into the web's change log we are."""
+    # stamp every event change (UTC), the sync lets the newer side win a conflict
+    conn.execute("ALTER TABLE event_changes ADD COLUMN changed_at TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_event_changes_event ON event_changes(event_id)")
+    for trigger in ("events_changed_insert", "events_changed_update", "events_changed_delete"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    conn.execute("""
+        CREATE TRIGGER events_changed_insert AFTER INSERT ON events BEGIN
+            INSERT INTO event_changes (event_id, changed_at) VALUES (new.id, strftime('%Y-%m-%d %H:%M:%f', 'now'));
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER events_changed_update AFTER UPDATE ON events BEGIN
+            INSERT INTO event_changes (event_id, changed_at) VALUES (new.id, strftime('%Y-%m-%d %H:%M:%f', 'now'));
+            INSERT INTO event_changes (event_id, changed_at) SELECT old.id, strftime('%Y-%m-%d %H:%M:%f', 'now') WHERE old.id != new.id;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER events_changed_delete AFTER DELETE ON events BEGIN
+            INSERT INTO event_changes (event_id, changed_at) VALUES (old.id, strftime('%Y-%m-%d %H:%M:%f', 'now'));
+        END
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS rsvp_changes(
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_id INTEGER NOT NULL,
+            user_email TEXT NOT NULL,
+            changed_at TEXT
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_rsvp_changes_pair ON rsvp_changes(event_id, user_email)")
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS rsvps_changed_insert AFTER INSERT ON rsvps BEGIN
+            INSERT INTO rsvp_changes (event_id, user_email, changed_at) VALUES (new.event_id, new.user_email, strftime('%Y-%m-%d %H:%M:%f', 'now'));
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS rsvps_changed_delete AFTER DELETE ON rsvps BEGIN
+            INSERT INTO rsvp_changes (event_id, user_email, changed_at) VALUES (old.event_id, old.user_email, strftime('%Y-%m-%d %H:%M:%f', 'now'));
+        END
+    """)
+
+    # id of the same event in the web database, set by the sync (NULLs don't clash in a unique index)
+    conn.execute("ALTER TABLE events ADD COLUMN web_id INTEGER")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_events_web_id ON events(web_id)")
+    # last web change applied here, kept next to the rows it covers
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sync_state(
+            peer TEXT PRIMARY KEY,
+            change_seq INTEGER NOT NULL
+        )
+    """)
+
+
+# user_version N means MIGRATIONS[:N] have been applied
+MIGRATIONS = [
+    _initial_schema,
+    _event_change_log,
+    _vaquero_tables,
+    _query_indexes,
+    _event_search,
+    _sync_support,
+]
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(repo):
+    """Applies the migrations the database hasn't seen yet, returns how many ran."""
+    with repo.transaction() as conn:
+        current = schema_version(conn)
+        if current >= len(MIGRATIONS):
+            return 0
+        # hold the write lock for the whole upgrade so two copies of the app can't both run it
+        conn.execute("BEGIN IMMEDIATE")
+        current = schema_version(conn)
+        for version, migration in enumerate(MIGRATIONS[current:], current + 1):
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+        return len(MIGRATIONS) - current
@@ -0,0 +1,321 @@
+import sqlite3
+import threading
+
+import migrations
+
+# --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
+# DATA ACCESS LAYER
+# One long-lived connection to Spotlight.db shared by the whole app,
+# instead of a sqlite3.connect() (and a schema re-parse) on every click.
+# --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
+
+DB_PATH = 'Spotlight.db'
+
+# everything about a user except the password hash, which stays in the database
+USER_COLUMNS = "first_name, last_name, student_id, email, major, role, organization"
+
+
+class Repository:
+    """Owns the connection to Spotlight.db, every query in the app goes through here."""
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self._conn = None
+        # the connection is shared between the Tk thread and background workers
+        self._lock = threading.RLock()
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            # cached_statements keeps the compiled form of every query below around
+            conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=256)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def query(self, sql, params=()):
+        """Runs a SELECT and returns all rows."""
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def query_one(self, sql, params=()):
+        with self._lock:
+            return self.conn.execute(sql, params).fetchone()
+
+    def execute(self, sql, params=()):
+        """Runs a single write in its own transaction, returns the cursor."""
+        with self._lock, self.conn:
+            return self.conn.execute(sql, params)
+
+    def transaction(self):
+        """Use as `with db.transaction() as conn:` to group several writes."""
+        return _Transaction(self)
+
+    # --- Schema ---
+
+    def setup_database(self):
+        """Brings the schema up to date, see migrations.py. Returns how many migrations ran."""
+        return migrations.migrate(self)
+
+    # --- Users ---
+
+    def get_user_details(self, email):
+        """Fetches all details for a specific user, or None."""
+        if not email:
+            return None
+        row = self.query_one(f"SELECT {USER_COLUMNS} FROM studentuser WHERE email=?", (email,))
+        return dict(row) if row else None
+
+    def get_password(self, email):
+        """The stored password hash (plaintext for accounts not upgraded yet), or None."""
+        row = self.query_one("SELECT password FROM studentuser WHERE email=?", (email,))
+        return row["password"] if row else None
+
+    def set_password(self, email, password_hash):
+        self.execute("UPDATE studentuser SET password=? WHERE email=?", (password_hash, email))
+
+    def email_exists(self, email):
+        return self.query_one("SELECT 1 FROM studentuser WHERE email=?", (email,)) is not None
+
+    def create_user(self, first_name, last_name, student_id, email, major, password_hash):
+        self.execute(
+            "INSERT INTO studentuser (first_name, last_name, student_id, email, major, password) VALUES (?, ?, ?, ?, ?, ?)",
+            (first_name, last_name, student_id, email, major, password_hash)
+        )
+
+    # --- Events ---
+
+    def load_events(self):
+        """Loads all events ordered by date."""
+        rows = self.query("SELECT id, name, date, location, description, organization_email FROM events ORDER BY date")
+        return [dict(row) for row in rows]
+
+    def events_by_ids(self, event_ids):
+        """The events that still exist among event_ids."""
+        event_ids = list(event_ids)
+        events = []
+        # stay well under SQLite's limit on bound parameters
+        for i in range(0, len(event_ids), 500):
+            chunk = event_ids[i:i + 500]
+            rows = self.query(
+                f"SELECT id, name, date, location, description, organization_email FROM events WHERE id IN ({','.join('?' * len(chunk))})",
+                chunk
+            )
+            events.extend(dict(row) for row in rows)
+        return events
+
+    def last_event_change(self):
+        return self.query_one("SELECT COALESCE(MAX(seq), 0) FROM event_changes")[0]
+
+    def event_changes_since(self, seq):
+        """(newest seq, ids of the events inserted, updated or deleted after seq)."""
+        rows = self.query("SELECT seq, event_id FROM event_changes WHERE seq > ? ORDER BY seq", (seq,))
+        if not rows:
+            return seq, []
+        return rows[-1]["seq"], list(dict.fromkeys(row["event_id"] for row in rows))
+
+    def create_event(self, name, date, location, description, organization_email):
+        cursor = self.execute(
+            "INSERT INTO events (name, date, location, description, organization_email) VALUES (?, ?, ?, ?, ?)",
+            (name, date, location, description, organization_email)
+        )
+        return cursor.lastrowid
+
+    def create_events(self, rows):
+        """Inserts (name, date, location, description, organization_email) rows in one transaction."""
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO events (name, date, location, description, organization_email) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    def search_events(self, match, limit):
+        """(id, name with the matched words in [brackets]) of the best `limit` matches for an FTS5 query, best first.
+        All the matches are ranked; only the rows returned get highlighted."""
+        rows = self.query("""
+            SELECT rowid AS id, highlight(events_fts, 0, '[', ']') AS label
+            FROM events_fts WHERE events_fts MATCH ?
+            ORDER BY bm25(events_fts, 10.0, 1.0, 3.0), rowid DESC LIMIT ?
+        """, (match, limit))
+        return [dict(row) for row in rows]
+
+    # --- Comments ---
+
+    def load_comments(self, event_id):
+        """Comments for an event, newest first, as (id, user_email, comment_text, timestamp) rows."""
+        return self.query("""
+            SELECT id, user_email, comment_text, strftime('%Y-%m-%d %H:%M', timestamp) AS ts
+            FROM comments WHERE event_id=? ORDER BY timestamp DESC
+        """, (event_id,))
+
+    def count_comments(self, event_id):
+        return self.query_one("SELECT COUNT(*) FROM comments WHERE event_id=?", (event_id,))[0]
+
+    def comments_page(self, event_id, offset, limit):
+        """One page of an event's comments, newest first, for the comment feed."""
+        rows = self.query("""
+            SELECT id, user_email, comment_text, strftime('%Y-%m-%d %H:%M', timestamp) AS ts
+            FROM comments WHERE event_id=? ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?
+        """, (event_id, limit, offset))
+        return [dict(row) for row in rows]
+
+    def post_comment(self, event_id, user_email, comment_text):
+        self.execute(
+            "INSERT INTO comments (event_id, user_email, comment_text) VALUES (?, ?, ?)",
+            (event_id, user_email, comment_text)
+        )
+
+    def delete_comment(self, comment_id):
+        self.execute("DELETE FROM comments WHERE id=?", (comment_id,))
+
+    # --- RSVPs & Find a Vaquero ---
+
+    def create_rsvp(self, event_id, user_email, find_vaquero):
+        """Records an RSVP, raises sqlite3.IntegrityError if the user already RSVP'd."""
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO rsvps (event_id, user_email, find_vaquero) VALUES (?, ?, ?)",
+                (event_id, user_email, find_vaquero)
+            )
+            if find_vaquero:
+                # joins the Find a Vaquero queue until someone is matched with them
+                conn.execute("""
+                    INSERT OR IGNORE INTO vaquero_waiting (event_id, user_email, major)
+                    SELECT ?, email, major FROM studentuser WHERE email = ?
+                """, (event_id, user_email))
+
+    def event_rsvps(self, event_id):
+        """(first_name, last_name, email) of everyone who RSVP'd for the event."""
+        return self.query("""
+            SELECT u.first_name, u.last_name, u.email
+            FROM rsvps r
+            JOIN studentuser u ON r.user_email = u.email
+            WHERE r.event_id = ?
+        """, (event_id,))
+
+    def unmatched_vaquero_candidates(self, event_id):
+        """Opted-in attendees of the event that aren't in a match yet, in RSVP order."""
+        rows = self.query("""
+            SELECT r.user_email, u.major
+            FROM rsvps r
+            JOIN studentuser u ON r.user_email = u.email
+            LEFT JOIN vaquero_match_members m ON m.event_id = r.event_id AND m.user_email = r.user_email
+            WHERE r.event_id = ? AND r.find_vaquero = 1 AND m.user_email IS NULL
+            ORDER BY r.id
+        """, (event_id,))
+        return [dict(row) for row in rows]
+
+    def vaquero_partner(self, event_id, user_email):
+        """Details of the student user_email is matched with for the event, or None."""
+        row = self.query_one("""
+            SELECT other.user_email
+            FROM vaquero_match_members me
+            JOIN vaquero_match_members other ON other.match_id = me.match_id AND other.user_email != me.user_email
+            WHERE me.event_id = ? AND me.user_email = ?
+        """, (event_id, user_email))
+        return self.get_user_details(row["user_email"]) if row else None
+
+    def save_matches(self, event_id, pairs):
+        """Stores the pairs in one transaction and returns the ones saved. A pair with a student
+        that is already matched for the event is skipped, vaquero_match_members won't take them twice."""
+        saved = []
+        with self.transaction() as conn:
+            # without an open transaction the first SAVEPOINT would start one and its RELEASE commit it,
+            # one commit per pair. Begun here, the savepoints nest and the block commits once
+            conn.execute("BEGIN IMMEDIATE")
+            for user1_email, user2_email in pairs:
+                conn.execute("SAVEPOINT vaquero_pair")
+                try:
+                    self._insert_match(conn, event_id, user1_email, user2_email)
+                except sqlite3.IntegrityError:
+                    conn.execute("ROLLBACK TO vaquero_pair")
+                else:
+                    saved.append((user1_email, user2_email))
+                conn.execute("RELEASE vaquero_pair")
+        return saved
+
+    def match_new_vaquero(self, event_id, user_email, major):
+        """Matches user_email with the earliest unmatched opted-in attendee, same major first.
+        Returns the partner's details, or None if nobody is available."""
+        with self.transaction() as conn:
+            # take the write lock before reading so two clients can't pick the same candidate
+            conn.execute("BEGIN IMMEDIATE")
+            partner = self.vaquero_partner(event_id, user_email)
+            if partner:
+                return partner
+            # longest waiting student of the same major, otherwise of any major
+            candidate = conn.execute("""
+                SELECT user_email FROM vaquero_waiting
+                WHERE event_id = ? AND major = ? AND user_email != ?
+                ORDER BY rowid LIMIT 1
+            """, (event_id, major, user_email)).fetchone() or conn.execute("""
+                SELECT user_email FROM vaquero_waiting
+                WHERE event_id = ? AND user_email != ?
+                ORDER BY rowid LIMIT 1
+            """, (event_id, user_email)).fetchone()
+            if candidate is None:
+                return None
+            self._insert_match(conn, event_id, user_email, candidate["user_email"])
+            return self.get_user_details(candidate["user_email"])
+
+    def _insert_match(self, conn, event_id, user1_email, user2_email):
+        match_id = conn.execute(
+            "INSERT INTO vaquero_matches (event_id, user1_email, user2_email) VALUES (?, ?, ?)",
+            (event_id, user1_email, user2_email)
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO vaquero_match_members (event_id, user_email, match_id) VALUES (?, ?, ?)",
+            [(event_id, user1_email, match_id), (event_id, user2_email, match_id)]
+        )
+        conn.execute("DELETE FROM vaquero_waiting WHERE event_id = ? AND user_email IN (?, ?)", (event_id, user1_email, user2_email))
+
+    # --- Organization requests ---
+
+    def create_org_request(self, name, email, organization):
+        self.execute("INSERT INTO org_requests (name, email, organization) VALUES (?, ?, ?)", (name, email, organization))
+
+    def pending_org_requests(self):
+        return self.query("SELECT id, name, email, organization FROM org_requests WHERE status='pending'")
+
+    def deny_org_request(self, request_id):
+        self.execute("UPDATE org_requests SET status='denied' WHERE id=?", (request_id,))
+
+    def approve_org_request(self, request_id, email, organization):
+        with self.transaction() as conn:
+            conn.execute("UPDATE org_requests SET status='approved' WHERE id=?", (request_id,))
+            conn.execute("UPDATE studentuser SET role='organization', organization=? WHERE email=?", (organization, email))
+
+
+class _Transaction:
+    """Holds the repository lock for the whole block and commits (or rolls back) at the end."""
+
+    def __init__(self, repo):
+        self.repo = repo
+
+    def __enter__(self):
+        self.repo._lock.acquire()
+        return self.repo.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.repo.conn.commit()
+            else:
+                self.repo.conn.rollback()
+        finally:
+            self.repo._lock.release()
+        return False
+
+
+# the app-wide repository
+db = Repository()
@@ -0,0 +1,34 @@
+import re
+
+# --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
+# EVENT SEARCH
+# The search box queries events_fts (see migrations.py), an SQLite FTS5
+# index over name, description and location, instead of LIKE '%...%'
+# scans of the events table. Results are ranked with bm25, a hit in the
+# name counts more than one in the location or description. Every match
+# is ranked, the list shows the best MAX_RESULTS.
+# --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
+
+MAX_RESULTS = 500
+
+_WORD = re.compile(r"\w+")
+
+
+def match_query(text):
+    """FTS5 query for what was typed: every word must appear, the last one may be unfinished.
+    Words are quoted so AND, OR, NEAR, quotes or * in the box are searched for, not parsed. None if there are no words."""
+    words = _WORD.findall(text)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    if len(words[-1]) > 1:
+        terms[-1] += "*"  # prefix match while typing: "vaq" finds "Vaqueros"
+    return " ".join(terms)
+
+
+def search(repo, text, limit=MAX_RESULTS):
+    """[{id, label}] best first, label is the event name with the matched words in [brackets]. Runs on the database worker."""
+    match = match_query(text)
+    if match is None:
+        return []
+    return repo.search_events(match, limit)
@@ -0,0 +1,14 @@
+import os
+import tempfile
+
+from repository import Repository
+
+
+def temp_repository(testcase):
+    """A Repository on a fresh, fully migrated database file that is removed after the test."""
+    directory = tempfile.TemporaryDirectory()
+    testcase.addCleanup(directory.cleanup)
+    repo = Repository(os.path.join(directory.name, "Spotlight.db"))
+    testcase.addCleanup(repo.close)
+    repo.setup_database()
+    return repo
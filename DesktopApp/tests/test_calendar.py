@@ -0,0 +1,69 @@
+import tkinter as tk
+import unittest
+
+from calendar_engine import WEEKS, CalendarGrid, month_cells, shift_month
+from event_cache import EventCache
+from tests import temp_repository
+
+
+class MonthMathTests(unittest.TestCase):
+    def test_month_starting_on_sunday(self):
+        cells = month_cells(2026, 2)
+        self.assertEqual(len(cells), WEEKS * 7)
+        self.assertEqual(cells[:28], list(range(1, 29)))
+        self.assertEqual(set(cells[28:]), {0})
+
+    def test_month_spanning_six_weeks(self):
+        cells = month_cells(2026, 8)  # starts on a Saturday
+        self.assertEqual(cells[:6], [0] * 6)
+        self.assertEqual(cells[6], 1)
+        self.assertEqual(cells[36], 31)
+        self.assertEqual(set(cells[37:]), {0})
+
+    def test_leap_february(self):
+        self.assertIn(29, month_cells(2028, 2))
+        self.assertNotIn(29, month_cells(2027, 2))
+
+    def test_shift_month_across_years(self):
+        self.assertEqual(shift_month(2026, 12, 1), (2027, 1))
+        self.assertEqual(shift_month(2026, 1, -1), (2025, 12))
+        self.assertEqual(shift_month(2026, 6, -18), (2024, 12))
+        self.assertEqual(shift_month(2026, 6, 0), (2026, 6))
+
+
+class MonthEventsTests(unittest.TestCase):
+    def test_only_days_inside_the_month(self):
+        repo = temp_repository(self)
+        for day in ("2026-02-28", "2026-03-01", "2026-03-31", "2026-04-01"):
+            repo.create_event(day, day, "", "", "org@utrgv.edu")
+        cache = EventCache(repo)
+        cache.sync()
+        self.assertEqual(sorted(cache.month(2026, 3)), [1, 31])
+        self.assertEqual(sorted(cache.month(2026, 2)), [28])
+
+
+class CalendarGridTests(unittest.TestCase):
+    def setUp(self):
+        try:
+            self.root = tk.Tk()
+        except tk.TclError:
+            self.skipTest("no display")
+        self.addCleanup(self.root.destroy)
+        self.clicked = []
+        self.grid = CalendarGrid(self.root, self.clicked.append, ("Helvetica", 11), "#f05a28")
+
+    def test_cells_outside_the_month_are_disabled(self):
+        self.grid.show(2026, 8, {1, 31})
+        texts = [btn.cget("text") for btn in self.grid.buttons]
+        self.assertEqual(texts[:6], [""] * 6)
+        self.assertEqual((texts[6], texts[36]), ("1", "31"))
+        self.assertEqual(str(self.grid.buttons[0].cget("state")), tk.DISABLED)
+        self.assertEqual(self.grid.buttons[6].cget("bg"), "#f05a28")
+
+        self.grid._click(0)
+        self.grid._click(36)
+        self.assertEqual(self.clicked, [31])
+
+
+if __name__ == "__main__":
+    unittest.main()
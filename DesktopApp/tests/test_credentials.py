@@ -0,0 +1,62 @@
+import unittest
+
+import credentials
+from tests import temp_repository
+
+# cheap cost settings for the hashes the tests make themselves
+CHEAP = {"n": 2 ** 4, "r": 1, "p": 1}
+
+
+class PasswordHashTests(unittest.TestCase):
+    def test_hash_round_trip(self):
+        stored = credentials.hash_password("hunter2", **CHEAP)
+        self.assertTrue(credentials.is_hashed(stored))
+        self.assertNotIn("hunter2", stored)
+        self.assertTrue(credentials.verify_password("hunter2", stored)[0])
+        self.assertFalse(credentials.verify_password("hunter3", stored)[0])
+
+    def test_same_password_gets_a_new_salt(self):
+        self.assertNotEqual(credentials.hash_password("hunter2", **CHEAP), credentials.hash_password("hunter2", **CHEAP))
+
+    def test_old_cost_settings_need_a_rehash(self):
+        self.assertEqual(credentials.verify_password("hunter2", credentials.hash_password("hunter2", **CHEAP)), (True, True))
+        self.assertEqual(credentials.verify_password("hunter2", credentials.hash_password("hunter2")), (True, False))
+
+    def test_plaintext_and_corrupt_values(self):
+        self.assertEqual(credentials.verify_password("dalmatians", "dalmatians"), (True, True))
+        self.assertEqual(credentials.verify_password("dalmatian", "dalmatians"), (False, True))
+        self.assertEqual(credentials.verify_password("x", "scrypt$not$a$hash"), (False, False))
+        self.assertEqual(credentials.verify_password("x", None), (False, False))
+
+
+class AuthenticateTests(unittest.TestCase):
+    def setUp(self):
+        self.repo = temp_repository(self)
+        self.repo.create_user("Ana", "Garza", "1", "ana@utrgv.edu", "Biology", "plaintext")
+
+    def test_plaintext_account_is_upgraded_on_login(self):
+        user = credentials.authenticate(self.repo, "ana@utrgv.edu", "plaintext")
+        self.assertEqual(user["email"], "ana@utrgv.edu")
+        self.assertNotIn("password", user)
+
+        stored = self.repo.get_password("ana@utrgv.edu")
+        self.assertTrue(credentials.is_hashed(stored))
+        self.assertEqual(credentials.verify_password("plaintext", stored), (True, False))
+        # and the upgraded hash still logs in
+        self.assertIsNotNone(credentials.authenticate(self.repo, "ana@utrgv.edu", "plaintext"))
+
+    def test_wrong_password_is_not_upgraded(self):
+        self.assertIsNone(credentials.authenticate(self.repo, "ana@utrgv.edu", "guess"))
+        self.assertEqual(self.repo.get_password("ana@utrgv.edu"), "plaintext")
+
+    def test_unknown_email(self):
+        self.assertIsNone(credentials.authenticate(self.repo, "nobody@utrgv.edu", "plaintext"))
+
+    def test_create_account_stores_a_hash(self):
+        credentials.create_account(self.repo, "Luis", "Pena", "2", "luis@utrgv.edu", "Art", "secret")
+        self.assertTrue(credentials.is_hashed(self.repo.get_password("luis@utrgv.edu")))
+        self.assertIsNotNone(credentials.authenticate(self.repo, "luis@utrgv.edu", "secret"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+from datetime import date
+
+from event_cache import EventCache
+from tests import temp_repository
+
+
+class EventCacheSyncTests(unittest.TestCase):
+    def setUp(self):
+        self.repo = temp_repository(self)
+        self.expo = self.repo.create_event("Expo", "2026-03-14", "Gym", "", "org@utrgv.edu")
+        self.talk = self.repo.create_event("Talk", "2026-03-14", "Library", "", "org@utrgv.edu")
+        self.fair = self.repo.create_event("Fair", "2026-04-02", "Quad", "", "org@utrgv.edu")
+        self.cache = EventCache(self.repo)
+
+    def test_first_sync_loads_everything(self):
+        self.assertEqual(self.cache.sync(), {self.expo, self.talk, self.fair})
+        self.assertEqual([e["name"] for e in self.cache.ordered()], ["Expo", "Talk", "Fair"])
+        self.assertEqual(self.cache.sync(), set())
+
+    def test_sync_applies_deletes_and_updates(self):
+        self.cache.sync()
+        self.repo.execute("DELETE FROM events WHERE id = ?", (self.expo,))
+        self.repo.execute("UPDATE events SET date = '2026-04-02' WHERE id = ?", (self.talk,))
+        new = self.repo.create_event("Mixer", "2026-03-14", "Hall", "", "org@utrgv.edu")
+
+        self.assertEqual(self.cache.sync(), {self.expo, self.talk, new})
+        self.assertIsNone(self.cache.get(self.expo))
+        self.assertEqual(len(self.cache), 3)
+        self.assertEqual([e["name"] for e in self.cache.on_date(date(2026, 3, 14))], ["Mixer"])
+        self.assertEqual([e["name"] for e in self.cache.on_date(date(2026, 4, 2))], ["Talk", "Fair"])
+        self.assertEqual([e["name"] for e in self.cache.ordered()], ["Mixer", "Talk", "Fair"])
+
+    def test_deleting_the_last_event_of_a_day_empties_it(self):
+        self.cache.sync()
+        self.repo.execute("DELETE FROM events WHERE id = ?", (self.fair,))
+        self.cache.sync()
+        self.assertEqual(self.cache.on_date(date(2026, 4, 2)), [])
+        self.assertEqual(self.cache.month(2026, 4), {})
+
+    def test_invalidate_reloads(self):
+        self.cache.sync()
+        self.cache.invalidate()
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.sync(), {self.expo, self.talk, self.fair})
+
+    def test_unparseable_dates_stay_out_of_the_calendar(self):
+        odd = self.repo.create_event("Odd", "03/14/2026", "Gym", "", "org@utrgv.edu")
+        self.cache.sync()
+        self.assertIsNone(self.cache.get(odd)["day"])
+        self.assertEqual([e["id"] for e in self.cache.on_date(date(2026, 3, 14))], [self.expo, self.talk])
+
+
+if __name__ == "__main__":
+    unittest.main()
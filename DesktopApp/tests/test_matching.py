@@ -0,0 +1,51 @@
+import unittest
+
+from matching import match_event, pair_by_major
+from tests import temp_repository
+
+
+class SaveMatchesTests(unittest.TestCase):
+    def setUp(self):
+        self.repo = temp_repository(self)
+        self.event_id = self.repo.create_event("Mixer", "2026-10-01", "Library", "", "org@utrgv.edu")
+
+    def match_rows(self):
+        return self.repo.query_one("SELECT COUNT(*) FROM vaquero_matches")[0], \
+            self.repo.query_one("SELECT COUNT(*) FROM vaquero_match_members")[0]
+
+    def test_pairs_are_saved_and_repeats_skipped(self):
+        saved = self.repo.save_matches(self.event_id, [("a@utrgv.edu", "b@utrgv.edu"), ("a@utrgv.edu", "c@utrgv.edu")])
+        self.assertEqual(saved, [("a@utrgv.edu", "b@utrgv.edu")])
+        self.assertEqual(self.match_rows(), (1, 2))
+
+    def test_an_error_mid_batch_leaves_no_pairs(self):
+        def pairs():
+            yield "a@utrgv.edu", "b@utrgv.edu"
+            yield "c@utrgv.edu", "d@utrgv.edu"
+            raise RuntimeError("matching went wrong")
+
+        with self.assertRaises(RuntimeError):
+            self.repo.save_matches(self.event_id, pairs())
+        self.assertEqual(self.match_rows(), (0, 0))
+
+    def test_match_event_pairs_within_a_major_first(self):
+        students = [("a", "Biology"), ("b", "Art"), ("c", "Biology"), ("d", "Math")]
+        for name, major in students:
+            email = f"{name}@utrgv.edu"
+            self.repo.create_user(name, name, name, email, major, "")
+            self.repo.create_rsvp(self.event_id, email, True)
+
+        self.assertEqual(match_event(self.repo, self.event_id), [("a@utrgv.edu", "c@utrgv.edu"), ("b@utrgv.edu", "d@utrgv.edu")])
+        self.assertEqual(self.repo.unmatched_vaquero_candidates(self.event_id), [])
+
+
+class PairByMajorTests(unittest.TestCase):
+    def test_at_most_one_student_is_left_over(self):
+        candidates = [{"user_email": str(i), "major": "Art" if i % 3 else "Math"} for i in range(7)]
+        matched = [email for pair in pair_by_major(candidates) for email in pair]
+        self.assertEqual(len(matched), 6)
+        self.assertEqual(len(set(matched)), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import migrations
+from repository import Repository
+
+
+class MigrateTests(unittest.TestCase):
+    """Databases made by the app before the migrations existed carry user_version 0 and only the
+    tables _initial_schema creates. setup_database() has to bring them up without losing rows."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "Spotlight.db")
+
+        conn = sqlite3.connect(self.path)
+        migrations._initial_schema(conn)
+        conn.executemany(
+            "INSERT INTO studentuser (first_name, last_name, student_id, email, major, password) VALUES (?, ?, ?, ?, ?, ?)",
+            [(name, name, name, f"{name}@utrgv.edu", "Biology", "plain") for name in ("a", "b", "c")]
+        )
+        conn.execute("INSERT INTO events (name, date, location, description) VALUES ('Robotics Expo', '2026-03-14', 'Gym', 'Demos')")
+        conn.executemany("INSERT INTO rsvps (event_id, user_email, find_vaquero) VALUES (1, ?, 1)",
+                         [("a@utrgv.edu",), ("b@utrgv.edu",), ("c@utrgv.edu",)])
+        conn.execute("INSERT INTO vaquero_matches (event_id, user1_email, user2_email) VALUES (1, 'a@utrgv.edu', 'b@utrgv.edu')")
+        conn.commit()
+        conn.close()
+
+        self.repo = Repository(self.path)
+        self.addCleanup(self.repo.close)
+
+    def test_a_baseline_database_is_brought_up_to_date(self):
+        self.assertEqual(self.repo.setup_database(), len(migrations.MIGRATIONS))
+        self.assertEqual(migrations.schema_version(self.repo.conn), len(migrations.MIGRATIONS))
+
+        # the old match and the student still waiting are carried over
+        self.assertEqual(self.repo.vaquero_partner(1, "a@utrgv.edu")["email"], "b@utrgv.edu")
+        self.assertEqual(self.repo.unmatched_vaquero_candidates(1), [{"user_email": "c@utrgv.edu", "major": "Biology"}])
+        # existing events are in the search index
+        self.assertEqual([row["id"] for row in self.repo.search_events("robotics", 10)], [1])
+        self.assertEqual(self.repo.get_password("a@utrgv.edu"), "plain")
+
+    def test_only_pending_migrations_run(self):
+        shipped = migrations.MIGRATIONS[:]
+        self.addCleanup(migrations.MIGRATIONS.__setitem__, slice(None), shipped)
+
+        # an install from when only the first three existed
+        del migrations.MIGRATIONS[3:]
+        self.assertEqual(self.repo.setup_database(), 3)
+        migrations.MIGRATIONS[:] = shipped
+        self.assertEqual(self.repo.setup_database(), len(shipped) - 3)
+        self.assertEqual(self.repo.setup_database(), 0)
+
+    def test_a_failed_migration_leaves_the_version_alone(self):
+        def broken(conn):
+            conn.execute("CREATE TABLE half_done (id INTEGER)")
+            raise sqlite3.OperationalError("disk I/O error")
+
+        shipped = migrations.MIGRATIONS[:]
+        self.addCleanup(migrations.MIGRATIONS.__setitem__, slice(None), shipped)
+        migrations.MIGRATIONS.append(broken)
+
+        with self.assertRaises(sqlite3.OperationalError):
+            self.repo.setup_database()
+        self.assertEqual(migrations.schema_version(self.repo.conn), 0)
+        self.assertIsNone(self.repo.query_one("SELECT name FROM sqlite_master WHERE name IN ('half_done', 'vaquero_waiting')"))
+
+
+if __name__ == "__main__":
+    unittest.main()
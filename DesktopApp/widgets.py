@@ -0,0 +1,251 @@
+import tkinter as tk
+from tkinter import font, messagebox
+
+# --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
+# VIRTUALIZED LIST WIDGETS
+# Only the rows that fit on screen get widgets. Scrolling re-fills the
+# same widgets with other rows, and rows are fetched from SQLite a page
+# at a time when they are first needed.
+# --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
+
+class VirtualScroller(tk.Frame):
+    """Base class: a scrollable view over `total` rows loaded in pages by load_page(offset, limit, deliver, fail).
+
+    load_page calls deliver(rows) with the page, or fail() if it couldn't be loaded; a failed page is
+    requested again the next time it is drawn (scrolling, resizing, another page arriving).
+    """
+
+    def __init__(self, parent, row_height, load_page, page_size=100, max_pages=20, bg="white", empty_text=""):
+        super().__init__(parent, bg=bg)
+        self.row_height = row_height
+        self.load_page = load_page
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.bg = bg
+        self.empty_text = empty_text
+
+        self.total = 0
+        self.first = 0  # index of the row shown at the top
+        self.pages = {}  # page number -> list of rows
+        self.pending = set()  # page numbers requested but not delivered yet
+        self.generation = 0  # bumped on reset so pages from an old data set are ignored
+        self.rows = []  # the recycled row widgets
+
+        self.body = tk.Frame(self, bg=bg)
+        self.body.pack(side="left", fill="both", expand=True)
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.empty_label = tk.Label(self.body, text="", bg=bg)
+
+        self.body.bind("<Configure>", lambda e: self._render())
+        self._bind_wheel(self.body)
+
+    # --- to be provided by subclasses ---
+
+    def make_row(self, parent):
+        raise NotImplementedError
+
+    def fill_row(self, row, index, item):
+        """Show item in row. item is None while its page is still loading."""
+        raise NotImplementedError
+
+    # --- public API ---
+
+    def reset(self, total, empty_text=None):
+        """Start over with a new data set of `total` rows."""
+        self.generation += 1
+        self.total = total
+        self.first = 0
+        self.pages.clear()
+        self.pending.clear()
+        if empty_text is not None:
+            self.empty_text = empty_text
+        self._render()
+
+    def item(self, index):
+        """The loaded row at index, or None (and a page request) if it isn't loaded yet."""
+        page, offset = divmod(index, self.page_size)
+        if page in self.pages:
+            rows = self.pages[page]
+            return rows[offset] if offset < len(rows) else None
+        self._request(page)
+        return None
+
+    def scroll_to(self, first):
+        self.first = max(0, min(first, self.total - self._visible_count()))
+        self._render()
+
+    # --- internals ---
+
+    def _visible_count(self):
+        return max(1, self.body.winfo_height() // self.row_height)
+
+    def _request(self, page):
+        if page in self.pending:
+            return
+        self.pending.add(page)
+        generation = self.generation
+        self.load_page(page * self.page_size, self.page_size,
+                       lambda rows: self._deliver(generation, page, rows), lambda: self._fail(generation, page))
+
+    def _fail(self, generation, page):
+        # no redraw here, that would ask for the page again straight away
+        if generation == self.generation:
+            self.pending.discard(page)
+
+    def _deliver(self, generation, page, rows):
+        if generation != self.generation:
+            return  # belongs to a data set we already replaced
+        self.pending.discard(page)
+        self.pages[page] = list(rows)
+        # forget the pages furthest from what's on screen
+        current = self.first // self.page_size
+        while len(self.pages) > self.max_pages:
+            del self.pages[max(self.pages, key=lambda p: abs(p - current))]
+        self._render()
+
+    def _render(self):
+        visible = self._visible_count()
+        while len(self.rows) < visible + 1:
+            row = self.make_row(self.body)
+            self._bind_wheel(row)
+            self.rows.append(row)
+
+        if self.total == 0:
+            for row in self.rows:
+                row.place_forget()
+            self.empty_label.config(text=self.empty_text)
+            self.empty_label.place(x=0, y=0, relwidth=1)
+            self.scrollbar.set(0, 1)
+            return
+        self.empty_label.place_forget()
+
+        self.first = max(0, min(self.first, self.total - visible))
+        for i, row in enumerate(self.rows):
+            index = self.first + i
+            if i < visible and index < self.total:
+                self.fill_row(row, index, self.item(index))
+                row.place(x=0, y=i * self.row_height, relwidth=1, height=self.row_height)
+            else:
+                row.place_forget()
+        self.scrollbar.set(self.first / self.total, min(1, (self.first + visible) / self.total))
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * self.total))
+        elif action == "scroll":
+            step = self._visible_count() if unit == "pages" else 1
+            self.scroll_to(self.first + int(amount) * step)
+
+    def _on_wheel(self, event):
+        if getattr(event, "num", None) == 4:
+            delta = -1
+        elif getattr(event, "num", None) == 5:
+            delta = 1
+        else:
+            delta = -1 if event.delta > 0 else 1
+        self.scroll_to(self.first + delta * 3)
+
+    def _bind_wheel(self, widget):
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            widget.bind(sequence, self._on_wheel)
+        for child in widget.winfo_children():
+            self._bind_wheel(child)
+
+
+class EventList(VirtualScroller):
+    """Replaces the events Listbox: one label per visible event, click to select."""
+
+    def __init__(self, parent, load_page, on_select, body_font, select_color, **kwargs):
+        self.body_font = body_font
+        self.select_color = select_color
+        self.on_select = on_select
+        self.selected_index = None
+        row_height = body_font.metrics("linespace") + 8
+        super().__init__(parent, row_height, load_page, **kwargs)
+
+    def reset(self, total, empty_text=None):
+        self.selected_index = None
+        super().reset(total, empty_text)
+
+    def make_row(self, parent):
+        row = tk.Label(parent, font=self.body_font, anchor="w", padx=4, bg=self.bg)
+        row.index = None
+        row.bind("<Button-1>", lambda e, r=row: self._click(r))
+        return row
+
+    def fill_row(self, row, index, item):
+        row.index = index
+        selected = index == self.selected_index
+        # search results carry a label with the matched words highlighted
+        row.config(text=(item.get("label") or item["name"]) if item else "Loading...",
+                   bg=self.select_color if selected else self.bg,
+                   fg="white" if selected else ("black" if item else "gray"))
+
+    def _click(self, row):
+        item = self.item(row.index) if row.index is not None else None
+        if item is None:
+            return
+        self.selected_index = row.index
+        self._render()
+        self.on_select(item)
+
+
+class CommentFeed(VirtualScroller):
+    """Comment panel with a fixed pool of comment widgets, long or multi-line comments are shortened to two lines, click to read them."""
+
+    MAX_CHARS = 140
+
+    def __init__(self, parent, load_page, can_delete, on_delete, **kwargs):
+        self.can_delete = can_delete
+        self.on_delete = on_delete
+        # allocated once, the old panel created a new Font for every comment
+        self.header_font = font.Font(family="Helvetica", size=10, weight="bold")
+        self.text_font = font.Font(family="Helvetica", size=10)
+        self.button_font = font.Font(family="Helvetica", size=8)
+        row_height = self.header_font.metrics("linespace") + 2 * self.text_font.metrics("linespace") + 18
+        super().__init__(parent, row_height, load_page, bg="#fafafa", **kwargs)
+
+    def make_row(self, parent):
+        row = tk.Frame(parent, bg=self.bg, padx=5, pady=3)
+        row.header = tk.Label(row, font=self.header_font, bg=self.bg, anchor="w", justify="left")
+        row.header.pack(fill="x")
+        row.text = tk.Label(row, font=self.text_font, bg=self.bg, anchor="nw", justify="left", wraplength=450)
+        row.text.pack(fill="x")
+        row.full_text = None  # (header, comment) when the comment had to be shortened
+        row.text.bind("<Button-1>", lambda e, r=row: self._show_full(r))
+        row.delete_btn = tk.Button(row, text="Delete", font=self.button_font, bg="#dc3545", fg="white")
+        return row
+
+    def fill_row(self, row, index, item):
+        if item is None:
+            row.header.config(text="Loading...")
+            row.text.config(text="", cursor="")
+            row.full_text = None
+            row.delete_btn.place_forget()
+            return
+
+        header = f"{item['user_email'].split('@')[0]} ({item['ts']}):"
+        row.header.config(text=header)
+        text = (item["comment_text"] or "").strip()
+        # line breaks would push the comment past its two lines, the row shows it on one run of text
+        flat = " ".join(text.split())
+        if len(flat) > self.MAX_CHARS:
+            row.text.config(text=flat[:self.MAX_CHARS - 1] + "… (click to read more)", cursor="hand2")
+            row.full_text = (header, text)
+        elif "\n" in text:
+            row.text.config(text=flat + " (click to read more)", cursor="hand2")
+            row.full_text = (header, text)
+        else:
+            row.text.config(text=flat, cursor="")
+            row.full_text = None
+        if self.can_delete(item):
+            row.delete_btn.config(command=lambda c_id=item["id"]: self.on_delete(c_id))
+            row.delete_btn.place(relx=1, y=0, anchor="ne")
+        else:
+            row.delete_btn.place_forget()
+
+    def _show_full(self, row):
+        if row.full_text is not None:
+            header, text = row.full_text
+            messagebox.showinfo("Comment", f"{header}\n\n{text}", parent=self)
@@ -0,0 +1,64 @@
+import itertools
+import queue
+import threading
+from tkinter import messagebox
+
+# --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
+# BACKGROUND DATABASE WORKER
+# Queries run on one worker thread so the Tk mainloop never waits on
+# SQLite; results come back to the Tk thread through after() polling,
+# since Tk widgets must only be touched from the thread that owns them.
+# --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
+
+class DBWorker:
+    """Runs database calls in the background and delivers the results on the Tk thread."""
+
+    def __init__(self, root, poll_ms=15):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._ids = itertools.count(1)
+        self._latest = {}  # channel -> id of the newest job, older results on the channel are stale
+        self._thread = threading.Thread(target=self._run, name="db-worker", daemon=True)
+        self._thread.start()
+        self.root.after(self.poll_ms, self._poll)
+
+    def submit(self, func, *args, on_done=None, on_error=None, channel=None):
+        """Queue func(*args). on_done(result) runs on the Tk thread unless a newer job took over the channel."""
+        job_id = next(self._ids)
+        if channel is not None:
+            self._latest[channel] = job_id
+        self._jobs.put((job_id, channel, func, args, on_done, on_error))
+        return job_id
+
+    def cancel(self, channel):
+        """Drop whatever result is still on its way for the channel."""
+        self._latest[channel] = next(self._ids)
+
+    def _run(self):
+        while True:
+            job_id, channel, func, args, on_done, on_error = self._jobs.get()
+            if channel is not None and self._latest.get(channel) != job_id:
+                continue  # superseded before it even started
+            try:
+                self._results.put((job_id, channel, on_done, func(*args), None, on_error))
+            except Exception as e:
+                self._results.put((job_id, channel, on_done, None, e, on_error))
+
+    def _poll(self):
+        try:
+            while True:
+                job_id, channel, on_done, result, error, on_error = self._results.get_nowait()
+                if channel is not None and self._latest.get(channel) != job_id:
+                    continue  # the user moved on, e.g. selected another event mid-load
+                if error is not None:
+                    (on_error or self._show_error)(error)
+                elif on_done is not None:
+                    on_done(result)
+        except queue.Empty:
+            pass
+        self.root.after(self.poll_ms, self._poll)
+
+    def _show_error(self, error):
+        messagebox.showerror("Database Error", f"An error occurred: {error}")
@@ -0,0 +1,44 @@
+"""Small helpers shared by the benchmark management commands"""
+import math
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers, None when there are no samples"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(latencies_ms):
+    """p50/p95/p99 and mean of a list of latencies in milliseconds"""
+    if not latencies_ms:
+        return {'count': 0, 'mean_ms': None, 'p50_ms': None, 'p95_ms': None, 'p99_ms': None}
+    return {
+        'count': len(latencies_ms),
+        'mean_ms': round(sum(latencies_ms) / len(latencies_ms), 3),
+        'p50_ms': round(percentile(latencies_ms, 50), 3),
+        'p95_ms': round(percentile(latencies_ms, 95), 3),
+        'p99_ms': round(percentile(latencies_ms, 99), 3),
+    }
+
+
+def regressions(baseline, current, tolerance):
+    """Why current is worse than baseline, both loadtest results. Latency and throughput may be up to
+    tolerance (0.2 = 20%) worse, the most queries any request of an endpoint ran may not grow at all."""
+    problems = []
+    for name, before in baseline['endpoints'].items():
+        after = current['endpoints'].get(name)
+        if after is None or not before['requests'] or not after['requests']:
+            continue
+        p95_before, p95_after = before['latency']['p95_ms'], after['latency']['p95_ms']
+        if p95_after > p95_before * (1 + tolerance):
+            problems.append(f'{name}: p95 {p95_after} ms, was {p95_before} ms')
+        if after['throughput_rps'] < before['throughput_rps'] * (1 - tolerance):
+            problems.append(f"{name}: {after['throughput_rps']} requests/s, was {before['throughput_rps']}")
+        if after['queries']['max'] > before['queries']['max']:
+            problems.append(f"{name}: up to {after['queries']['max']} queries per request, was {before['queries']['max']}")
+        if after['errors'] > before['errors']:
+            problems.append(f"{name}: {after['errors']} errors, was {before['errors']}")
+    return problems
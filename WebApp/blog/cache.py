@@ -0,0 +1,171 @@
+"""
+Page and event card caching for the blog.
+
+Anonymous feed and detail pages are cached whole, event cards as template
+fragments. Their keys carry a version per scope (the feed, each event) that
+the signals in blog/signals.py bump on every write, so nothing is deleted:
+the old entries just stop being read and expire.
+
+The invalidation only reaches the cache the writing process can see. With
+the default LocMemCache every worker has its own cache, so a write handled
+by one worker leaves the others serving their stale pages until the
+timeout. Deployments with more than one worker process need a shared
+backend (Memcached, Redis, or SPOTLIGHT_CACHE=file on a shared directory).
+"""
+import hashlib
+import threading
+import time
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from .instrumentation import record_cache
+
+PAGE_TIMEOUT = 300  # anonymous feed and detail pages
+FEED_SCOPE = 'feed'
+
+
+class CacheStats:
+    """Thread safe hit/miss counters for the page and fragment caches of this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._counts = {'page': [0, 0], 'fragment': [0, 0]}
+
+    def record(self, kind, hit):
+        with self._lock:
+            self._counts[kind][0 if hit else 1] += 1
+
+    def snapshot(self):
+        with self._lock:
+            result = {}
+            for kind, (hits, misses) in self._counts.items():
+                total = hits + misses
+                result[kind] = {'hits': hits, 'misses': misses, 'hit_rate': round(hits / total, 3) if total else None}
+            return result
+
+
+stats = CacheStats()
+
+
+def _kind(key):
+    if key.startswith('template.cache.'): # keys made by the {% cache %} template tag
+        return 'fragment'
+    if key.startswith('blog:page:'):
+        return 'page'
+    return None
+
+
+class CacheStatsMixin:
+    """Counts hits and misses on the page and fragment keys, works with any cache backend"""
+
+    def get(self, key, default=None, version=None):
+        sentinel = object()
+        value = super().get(key, sentinel, version)
+        kind = _kind(key)
+        if kind:
+            stats.record(kind, value is not sentinel)
+            record_cache(value is not sentinel)
+        return default if value is sentinel else value
+
+
+class StatsLocMemCache(CacheStatsMixin, LocMemCache):
+    pass
+
+
+class StatsFileBasedCache(CacheStatsMixin, FileBasedCache):
+    pass
+
+
+# --- versions, bumped by the signals in blog/signals.py ---
+
+def _version_key(scope):
+    return f'blog:version:{scope}'
+
+
+def _seed_version(key):
+    """The version of a key that isn't in the cache (never set, or evicted)"""
+    # a timestamp, newer than any version the pages cached before the eviction were keyed with
+    version = time.time_ns()
+    if cache.add(key, version, None):
+        return version
+    return cache.get(key, version)  # another request seeded it first
+
+
+def get_version(scope):
+    key = _version_key(scope)
+    version = cache.get(key)
+    return _seed_version(key) if version is None else version
+
+
+def bump_version(scope):
+    # a timestamp rather than incr() so an evicted version can never come back as an old value
+    cache.set(_version_key(scope), time.time_ns(), None)
+
+
+def event_scope(event_id):
+    return f'event:{event_id}'
+
+
+def invalidate_event(event_id):
+    """Drop the cached card and detail page of one event, and every feed page"""
+    bump_version(event_scope(event_id))
+    bump_version(FEED_SCOPE)
+
+
+def attach_card_versions(events):
+    """Set event.card_version on each event with one get_many, used as the card fragment key"""
+    keys = {event.pk: _version_key(event_scope(event.pk)) for event in events}
+    versions = cache.get_many(keys.values())
+    for event in events:
+        key = keys[event.pk]
+        if key not in versions:
+            versions[key] = _seed_version(key)
+        event.card_version = versions[key]
+    return events
+
+
+# --- anonymous page cache ---
+
+def is_cacheable(request):
+    # pending flash messages live in the 'messages' cookie and are rendered into the page
+    return (request.method == 'GET'
+            and not request.user.is_authenticated
+            and 'messages' not in request.COOKIES)
+
+
+class AnonymousPageCacheMixin:
+    """Serve whole rendered pages to anonymous visitors until the scope's version changes"""
+    page_cache_timeout = PAGE_TIMEOUT
+
+    def get_page_cache_scope(self):
+        return FEED_SCOPE
+
+    def get_page_cache_key(self):
+        scope = self.get_page_cache_scope()
+        path = hashlib.md5(self.request.get_full_path().encode()).hexdigest()
+        return f'blog:page:{scope}:{get_version(scope)}:{path}'
+
+    def dispatch(self, request, *args, **kwargs):
+        if not is_cacheable(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        key = self.get_page_cache_key()
+        response = cache.get(key)
+        if response is not None:
+            response['X-Cache'] = 'HIT'
+            return response
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            def store(rendered):
+                cache.set(key, rendered, self.page_cache_timeout)
+            if hasattr(response, 'add_post_render_callback'):
+                response.add_post_render_callback(store)
+            else:
+                store(response)
+        response['X-Cache'] = 'MISS'
+        return response
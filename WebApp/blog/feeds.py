@@ -0,0 +1,162 @@
+"""
+Streaming iCalendar and CSV exports.
+
+The feeds are written a row at a time from a database iterator, so a
+calendar with 100k events goes out in constant memory. Calendar apps poll
+the .ics URLs, so those carry an ETag and Last-Modified computed by one
+aggregate query, and a poll with nothing new gets a 304 without reading a
+single event. The RSVP CSV is always sent in full, it holds the attendees'
+current names and emails and nothing in the aggregate tracks those.
+"""
+import csv
+import hashlib
+from datetime import timezone as dt_timezone
+
+from django.core import signing
+from django.db.models import Count, Max
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .models import Event, RSVP
+
+CHUNK_SIZE = 2000  # rows fetched per round trip by the iterators below
+PRODID = '-//UTRGV Spotlight//Events//EN'
+FEED_SALT = 'blog.my-events-feed'
+
+
+# --- conditional GET ---
+
+def _validators(*values):
+    """(ETag, Last-Modified timestamp) from an aggregate, the last value is the newest change."""
+    etag = hashlib.md5(repr(values).encode()).hexdigest()
+    newest = values[-1]
+    return quote_etag(etag), int(newest.timestamp()) if newest else None
+
+
+def conditional_stream(request, validators, make_response, cache_control='no-cache'):
+    """The 304 (or 412) for a request that already has this version, otherwise make_response() with the validators set.
+    The ETag is what counts, Last-Modified alone can't see a deleted row."""
+    etag, last_modified = validators
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = make_response()
+    response.headers['ETag'] = etag
+    if last_modified is not None:
+        response.headers['Last-Modified'] = http_date(last_modified)
+    response.headers['Cache-Control'] = cache_control  # clients keep the copy but revalidate every time
+    return response
+
+
+def events_validators(events):
+    # count and max id change on deletes and inserts, max last_modified on edits
+    totals = events.order_by().aggregate(count=Count('id'), max_id=Max('id'), newest=Max('last_modified'))
+    return _validators(totals['count'], totals['max_id'], totals['newest'])
+
+
+def rsvps_validators(rsvps):
+    totals = rsvps.order_by().aggregate(count=Count('id'), max_id=Max('id'),
+                                        events_newest=Max('event__last_modified'), newest=Max('date_rsvpd'))
+    newest = max(filter(None, [totals['events_newest'], totals['newest']]), default=None)
+    return _validators(totals['count'], totals['max_id'], newest)
+
+
+# --- iCalendar ---
+
+def _escape(text):
+    return (text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+                .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def _fold(line):
+    """RFC 5545 content line: at most 75 octets, continued on lines starting with a space."""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1  # don't split a multi-byte character
+        parts.append(encoded[start:end].decode('utf-8'))
+        start, limit = end, 74  # the leading space counts towards the 75
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def _utc_stamp(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def ics_lines(events, calendar_name, host):
+    """The text of a VCALENDAR, one chunk per event, from (id, title, description, location,
+    event_date, event_time, last_modified) rows."""
+    yield ('BEGIN:VCALENDAR\r\nVERSION:2.0\r\n'
+           f'PRODID:{PRODID}\r\nCALSCALE:GREGORIAN\r\n' + _fold(f'X-WR-CALNAME:{_escape(calendar_name)}'))
+    for pk, title, description, location, event_date, event_time, last_modified in events:
+        start = f"{event_date.strftime('%Y%m%d')}T{event_time.strftime('%H%M%S')}"  # floating local time, like the site
+        yield ('BEGIN:VEVENT\r\n'
+               f'UID:event-{pk}@{host}\r\n'
+               f'DTSTAMP:{_utc_stamp(last_modified)}\r\n'
+               f'DTSTART:{start}\r\n'
+               + _fold(f'SUMMARY:{_escape(title)}')
+               + _fold(f'LOCATION:{_escape(location)}')
+               + _fold(f'DESCRIPTION:{_escape(description)}')
+               + 'END:VEVENT\r\n')
+    yield 'END:VCALENDAR\r\n'
+
+
+ICS_FIELDS = ['id', 'title', 'description', 'location', 'event_date', 'event_time', 'last_modified']
+
+
+def ics_response(events, calendar_name, host, filename):
+    rows = events.order_by('event_date', 'event_time', 'id').values_list(*ICS_FIELDS).iterator(chunk_size=CHUNK_SIZE)
+    response = StreamingHttpResponse(ics_lines(rows, calendar_name, host), content_type='text/calendar; charset=utf-8')
+    response.headers['Content-Disposition'] = f'inline; filename="{filename}"'
+    return response
+
+
+# --- CSV ---
+
+class _Echo:
+    """File-like object whose write() hands the line straight back, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+RSVP_CSV_HEADER = ['username', 'first_name', 'last_name', 'email', 'date_rsvpd']
+
+
+def rsvp_csv_response(event):
+    rows = (RSVP.objects.filter(event=event).order_by('id')
+            .values_list('user__username', 'user__first_name', 'user__last_name', 'user__email', 'date_rsvpd')
+            .iterator(chunk_size=CHUNK_SIZE))
+    writer = csv.writer(_Echo())
+
+    def lines():
+        yield writer.writerow(RSVP_CSV_HEADER)
+        for username, first_name, last_name, email, rsvpd in rows:
+            yield writer.writerow([username, first_name, last_name, email, rsvpd.isoformat()])
+
+    response = StreamingHttpResponse(lines(), content_type='text/csv; charset=utf-8')
+    response.headers['Content-Disposition'] = f'attachment; filename="event-{event.pk}-rsvps.csv"'
+    return response
+
+
+# --- personal feed links ---
+
+def feed_token(user):
+    """The secret part of a user's my-events feed URL. Calendar apps can't log in, the signature stands in for that."""
+    return signing.Signer(salt=FEED_SALT).sign(str(user.pk))
+
+
+def user_id_from_token(token):
+    """The user id a feed token was made for, or None if it has been tampered with."""
+    try:
+        return int(signing.Signer(salt=FEED_SALT).unsign(token))
+    except (signing.BadSignature, ValueError):
+        return None
+
+
+def events_for_user(user_id):
+    return Event.objects.filter(rsvp__user_id=user_id)
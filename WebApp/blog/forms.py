@@ -1,4 +1,5 @@
 from django import forms
+from django.core.validators import FileExtensionValidator
 from .models import Event
 
 class EventForm(forms.ModelForm):
@@ -24,3 +25,11 @@ class EventForm(forms.ModelForm):
             'event_time': 'Select the time when your event will start',
             'location': 'Where will your event be held?',
         }
+
+
+class EventImportForm(forms.Form):
+    file = forms.FileField(
+        label='Events file*',
+        validators=[FileExtensionValidator(['csv', 'ics', 'ical'])],
+        help_text='A CSV file with the columns title, description, event_date (YYYY-MM-DD), event_time (HH:MM) and location, or an iCalendar (.ics) file',
+    )
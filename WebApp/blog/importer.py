@@ -0,0 +1,237 @@
+"""
+Bulk event import from CSV or iCalendar files.
+
+Rows are read one at a time, validated and inserted with multi-row
+INSERTs in chunks, each chunk in its own transaction, so memory stays flat however
+big the file is. A bad row is reported with its line number and skipped,
+it doesn't stop the rest of the file.
+
+The readers (read_csv, read_ics and their helpers) mirror the ones in
+DesktopApp/importer.py, the desktop app ships on its own and can't import
+this module. A fix to one belongs in the other.
+"""
+import csv
+import io
+from collections import namedtuple
+from datetime import date, datetime, time, timezone as dt_timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .cache import FEED_SCOPE, bump_version
+from .models import ChangeLog, Event
+
+CSV_COLUMNS = ['title', 'description', 'event_date', 'event_time', 'location']
+BATCH_SIZE = 1000
+MAX_LENGTH = {'title': 200, 'location': 200}  # the CharFields on Event
+
+RowError = namedtuple('RowError', ['line', 'message'])
+
+
+class ImportReport:
+    """What an import did: how many events were created and which rows were skipped."""
+
+    def __init__(self, max_errors=1000):
+        self.created = 0
+        self.failed = 0
+        self.errors = []  # the first max_errors RowErrors, failed counts all of them
+        self.max_errors = max_errors
+
+    def add_error(self, line, message):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append(RowError(line, message))
+
+
+# --- readers: yield (line number, {field: text}) ---
+
+def read_csv(lines):
+    """Rows of a CSV file with a header row naming the CSV_COLUMNS."""
+    reader = csv.DictReader(lines)
+    missing = [c for c in CSV_COLUMNS if c not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV header is missing: {', '.join(missing)}")
+    for row in reader:
+        yield reader.line_num, row
+
+
+def _unescape(value):
+    return (value.replace('\\n', '\n').replace('\\N', '\n')
+                 .replace('\\,', ',').replace('\\;', ';').replace('\\\\', '\\'))
+
+
+def _unfold(lines):
+    """(line number, logical line) with RFC 5545 folded continuation lines joined back on."""
+    current, start = None, 0
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield start, current
+        current, start = line, number
+    if current is not None:
+        yield start, current
+
+
+def _start(params, value, tz):
+    """(date, time) text of a DTSTART, moved into tz when it is in UTC (...Z) or has a TZID."""
+    day = f'{value[0:4]}-{value[4:6]}-{value[6:8]}'
+    if 'T' not in value:
+        return day, '00:00'
+    clock = f'{value[9:11]}:{value[11:13]}'
+    source = None
+    if value.endswith('Z'):
+        source = dt_timezone.utc
+    elif params.get('TZID'):
+        try:
+            source = ZoneInfo(params['TZID'])
+        except (ZoneInfoNotFoundError, ValueError):
+            pass  # not an IANA name (Outlook writes "Central Standard Time"), kept as written
+    if source is None:
+        return day, clock  # floating time, already local
+    try:
+        start = datetime.strptime(value[:15], '%Y%m%dT%H%M%S').replace(tzinfo=source).astimezone(tz)
+    except ValueError:
+        return day, clock  # build_row reports what is wrong with it
+    return start.strftime('%Y-%m-%d'), start.strftime('%H:%M')
+
+
+def read_ics(lines, tz=None):
+    """One row per VEVENT: SUMMARY, DESCRIPTION, LOCATION and DTSTART (date or date-time, in tz, TIME_ZONE by default)."""
+    tz = tz or timezone.get_default_timezone()
+    event, event_line = None, 0
+    for number, line in _unfold(lines):
+        name, _, value = line.partition(':')
+        name, *params = name.split(';')
+        name = name.upper()
+        params = {key.upper(): param.strip('"') for key, _, param in (p.partition('=') for p in params)}
+        if name == 'BEGIN' and value.upper() == 'VEVENT':
+            event, event_line = {}, number
+        elif name == 'END' and value.upper() == 'VEVENT' and event is not None:
+            yield event_line, event
+            event = None
+        elif event is not None:
+            if name == 'SUMMARY':
+                event['title'] = _unescape(value)
+            elif name == 'DESCRIPTION':
+                event['description'] = _unescape(value)
+            elif name == 'LOCATION':
+                event['location'] = _unescape(value)
+            elif name == 'DTSTART':
+                event['event_date'], event['event_time'] = _start(params, value, tz)
+
+
+def reader_for(filename):
+    """read_ics for .ics/.ical files, read_csv for anything else."""
+    return read_ics if filename.lower().endswith(('.ics', '.ical')) else read_csv
+
+
+# --- validation and insert ---
+
+# the columns written for each imported row, in order
+INSERT_FIELDS = CSV_COLUMNS + ['date_posted', 'last_modified', 'author', 'attendee_count']
+
+
+def _column(model, name):
+    return connection.ops.quote_name(model._meta.get_field(name).column)
+
+
+def _insert_sql(rows=1):
+    """INSERT of rows events, returning their ids where the database can"""
+    columns = ', '.join(_column(Event, name) for name in INSERT_FIELDS)
+    placeholders = ', '.join(['(' + ', '.join(['%s'] * len(INSERT_FIELDS)) + ')'] * rows)
+    sql = f'INSERT INTO {connection.ops.quote_name(Event._meta.db_table)} ({columns}) VALUES {placeholders}'
+    if connection.features.can_return_rows_from_bulk_insert:
+        sql += f" RETURNING {_column(Event, 'id')}"
+    return sql
+
+
+def build_row(row, author_id, posted):
+    """The INSERT_FIELDS values for a row, raises ValueError with a readable message if the row is bad."""
+    values = {}
+    for field in CSV_COLUMNS:
+        value = (row.get(field) or '').strip()
+        if not value:
+            raise ValueError(f'{field} is required')
+        if len(value) > MAX_LENGTH.get(field, len(value)):
+            raise ValueError(f'{field} is longer than {MAX_LENGTH[field]} characters')
+        values[field] = value
+    try:
+        values['event_date'] = date.fromisoformat(values['event_date'])
+    except ValueError:
+        raise ValueError(f"event_date {values['event_date']!r} is not YYYY-MM-DD")
+    try:
+        values['event_time'] = time.fromisoformat(values['event_time'])
+    except ValueError:
+        raise ValueError(f"event_time {values['event_time']!r} is not HH:MM")
+    ops = connection.ops
+    return (values['title'], values['description'], ops.adapt_datefield_value(values['event_date']),
+            ops.adapt_timefield_value(values['event_time']), values['location'], posted, posted, author_id, 0)
+
+
+def _insert(cursor, rows):
+    """Inserts the rows and returns the ids they were given"""
+    if not connection.features.can_return_rows_from_bulk_insert:  # SQLite before 3.35
+        # the transaction holds the write lock (transaction_mode IMMEDIATE), no one else can insert meanwhile
+        newest = Event.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+        cursor.executemany(_insert_sql(), rows)
+        return list(Event.objects.filter(pk__gt=newest).order_by('pk').values_list('pk', flat=True))
+
+    # multi-row INSERTs as big as the database takes, as quick as executemany and they say which ids they made
+    per_statement = (connection.features.max_query_params or len(rows) * len(INSERT_FIELDS)) // len(INSERT_FIELDS)
+    ids = []
+    for offset in range(0, len(rows), per_statement):
+        part = rows[offset:offset + per_statement]
+        cursor.execute(_insert_sql(len(part)), [value for row in part for value in row])
+        ids.extend(row[0] for row in cursor.fetchall())
+    return ids
+
+
+def _log_sql():
+    """Adds one imported event to the sync ChangeLog"""
+    columns = ', '.join(_column(ChangeLog, name) for name in ('kind', 'event_id', 'changed_at'))
+    return f'INSERT INTO {connection.ops.quote_name(ChangeLog._meta.db_table)} ({columns}) VALUES (%s, %s, %s)'
+
+
+def _save_chunk(rows, report, changed_at):
+    # raw SQL, bulk_create spends most of its time preparing each field of each model instance
+    with transaction.atomic(), connection.cursor() as cursor:
+        ids = _insert(cursor, rows)
+        # no signals fire for these rows, log them for the desktop sync here
+        cursor.executemany(_log_sql(), [(ChangeLog.EVENT, pk, changed_at) for pk in ids])
+    report.created += len(rows)
+
+
+def import_events(rows, author, batch_size=BATCH_SIZE):
+    """Creates events from (line number, row) pairs and returns an ImportReport."""
+    report = ImportReport()
+    posted = connection.ops.adapt_datetimefield_value(timezone.now())
+    chunk = []
+    for line, row in rows:
+        try:
+            chunk.append(build_row(row, author.pk, posted))
+        except ValueError as e:
+            report.add_error(line, str(e))
+            continue
+        if len(chunk) >= batch_size:
+            _save_chunk(chunk, report, posted)
+            chunk = []
+    if chunk:
+        _save_chunk(chunk, report, posted)
+
+    if report.created:
+        # no post_save signals fire for these rows, so invalidate the cached feed here
+        bump_version(FEED_SCOPE)
+    return report
+
+
+def import_file(binary_file, filename, author, batch_size=BATCH_SIZE):
+    """Imports an uploaded or opened binary file, picking the reader from the file name."""
+    lines = io.TextIOWrapper(binary_file, encoding='utf-8-sig', newline='')
+    try:
+        return import_events(reader_for(filename)(lines), author, batch_size)
+    finally:
+        lines.detach()  # leave the underlying file open for its owner to close
@@ -0,0 +1,192 @@
+"""
+Per-request performance instrumentation.
+
+InstrumentationMiddleware measures every request: wall time, the number
+and total time of the database queries, the time spent rendering
+templates and the page/card cache hits and misses. It sends them back in a
+Server-Timing header (shown in the browser's network tab) and adds them to
+a histogram per URL name. Staff can read those at /stats/requests/.
+
+Everything is counted in memory with a few perf_counter() calls per
+request and one per query, so it can stay on in production. Like the
+cache stats, the histograms are per process.
+"""
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connection
+from django.template.backends.django import DjangoTemplates, Template
+
+# upper bounds of the latency buckets in ms, the last bucket has everything slower
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """What one request spent its time on"""
+
+    def __init__(self):
+        self.total_ms = 0.0
+        self.queries = 0
+        self.db_ms = 0.0
+        self.template_ms = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._rendering = 0  # nesting depth, so a template rendered inside another one isn't counted twice
+
+    def time_query(self, execute, sql, params, many, context):
+        """connection.execute_wrapper hook"""
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_ms += (perf_counter() - start) * 1000
+
+    def server_timing(self):
+        return (f'db;dur={self.db_ms:.1f};desc="{self.queries} queries", '
+                f'tpl;dur={self.template_ms:.1f};desc="templates", '
+                f'cache;desc="{self.cache_hits} hits {self.cache_misses} misses", '
+                f'total;dur={self.total_ms:.1f}')
+
+
+def record_cache(hit):
+    """Called by the stats cache backends (blog/cache.py) for every page and card lookup"""
+    metrics = _current.get()
+    if metrics is not None:
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+
+# --- template timing ---
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return super().render(context, request)
+        metrics._rendering += 1
+        start = perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics._rendering -= 1
+            if not metrics._rendering:
+                metrics.template_ms += (perf_counter() - start) * 1000
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, with the render time added to the current request's metrics"""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+# --- per URL name histograms ---
+
+class RequestStats:
+    """Thread safe latency histograms and totals per URL name for this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._views = {}
+
+    def record(self, name, metrics, status_code):
+        bucket = bisect_left(BUCKETS_MS, metrics.total_ms)
+        with self._lock:
+            view = self._views.get(name)
+            if view is None:
+                view = self._views[name] = {
+                    'requests': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'queries': 0, 'db_ms': 0.0,
+                    'template_ms': 0.0, 'cache_hits': 0, 'cache_misses': 0, 'buckets': [0] * (len(BUCKETS_MS) + 1),
+                }
+            view['requests'] += 1
+            view['errors'] += status_code >= 500
+            view['total_ms'] += metrics.total_ms
+            view['max_ms'] = max(view['max_ms'], metrics.total_ms)
+            view['queries'] += metrics.queries
+            view['db_ms'] += metrics.db_ms
+            view['template_ms'] += metrics.template_ms
+            view['cache_hits'] += metrics.cache_hits
+            view['cache_misses'] += metrics.cache_misses
+            view['buckets'][bucket] += 1
+
+    def snapshot(self):
+        with self._lock:
+            views = {name: dict(view, buckets=list(view['buckets'])) for name, view in self._views.items()}
+        result = {}
+        for name, view in sorted(views.items()):
+            n = view['requests']
+            result[name] = {
+                'requests': n,
+                'errors': view['errors'],
+                'mean_ms': round(view['total_ms'] / n, 2),
+                # bucket upper bounds, so a p95 of 50 means 95% of the requests took 50 ms or less
+                'p50_ms': _percentile(view, 50),
+                'p95_ms': _percentile(view, 95),
+                'p99_ms': _percentile(view, 99),
+                'max_ms': round(view['max_ms'], 2),
+                'queries_per_request': round(view['queries'] / n, 2),
+                'db_ms_per_request': round(view['db_ms'] / n, 2),
+                'template_ms_per_request': round(view['template_ms'] / n, 2),
+                'cache_hits': view['cache_hits'],
+                'cache_misses': view['cache_misses'],
+                'histogram': dict(zip([f'le_{bound}ms' for bound in BUCKETS_MS] + ['le_inf'], view['buckets'])),
+            }
+        return result
+
+
+def _percentile(view, pct):
+    needed = pct / 100 * view['requests']
+    seen = 0
+    for bound, count in zip(BUCKETS_MS, view['buckets']):
+        seen += count
+        if seen >= needed:
+            return min(bound, round(view['max_ms'], 2))
+    return round(view['max_ms'], 2)
+
+
+stats = RequestStats()
+
+
+def url_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else '<unresolved>'
+
+
+class InstrumentationMiddleware:
+    """Times every request, see the module docstring. Goes first in MIDDLEWARE so the others are included."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.header = getattr(settings, 'SERVER_TIMING_HEADER', True)
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = perf_counter()
+        try:
+            # queries run while a streaming response is sent happen after this and aren't counted
+            with connection.execute_wrapper(metrics.time_query):
+                response = self.get_response(request)
+        finally:
+            metrics.total_ms = (perf_counter() - start) * 1000
+            _current.reset(token)
+
+        stats.record(url_name(request), metrics, response.status_code)
+        if self.header:
+            response['Server-Timing'] = metrics.server_timing()
+        return response
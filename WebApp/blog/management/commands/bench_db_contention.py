@@ -0,0 +1,112 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from django.core.management.base import BaseCommand
+from django_project.db_profiles import BUSY_TIMEOUT_SECONDS, SQLITE_PRAGMAS
+from blog.bench import summarize
+
+# a cut down copy of blog_event/blog_rsvp, enough to reproduce the RSVP write pattern
+SCHEMA = """
+    CREATE TABLE event (id INTEGER PRIMARY KEY, title TEXT, date_posted TEXT, attendee_count INTEGER NOT NULL DEFAULT 0);
+    CREATE TABLE rsvp (id INTEGER PRIMARY KEY, user_id INTEGER, event_id INTEGER, UNIQUE(user_id, event_id));
+    CREATE INDEX event_feed ON event (date_posted DESC, id DESC);
+"""
+
+
+class Command(BaseCommand):
+    # SQLite only: it opens its own scratch files with the sqlite3 module, the postgres profile isn't covered
+    help = 'Compare concurrent RSVP writes and feed reads under the SQLite database profiles (dev and sqlite)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', nargs='+', default=list(SQLITE_PRAGMAS), choices=list(SQLITE_PRAGMAS))
+        parser.add_argument('--writers', type=int, default=8)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=5.0, help='How long each profile runs')
+        parser.add_argument('--events', type=int, default=200)
+        parser.add_argument('--json', dest='json_path', help='Also write the results to this file')
+
+    def connect(self, path, profile):
+        conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None, check_same_thread=False)
+        for pragma in SQLITE_PRAGMAS[profile]:
+            conn.execute(pragma)
+        return conn
+
+    def run_profile(self, profile, options):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'bench.sqlite3')
+            setup = self.connect(path, profile)
+            setup.executescript(SCHEMA)
+            setup.executemany('INSERT INTO event (title, date_posted) VALUES (?, ?)',
+                              [(f'Event {i}', f'2025-01-01T00:00:{i:06d}') for i in range(options['events'])])
+            setup.close()
+
+            deadline = time.perf_counter() + options['seconds']
+            writes, reads, errors = [], [], []
+            lock = threading.Lock()
+
+            def writer(worker):
+                conn = self.connect(path, profile)
+                user_id, mine, failed = worker * 1_000_000, [], []
+                while time.perf_counter() < deadline:
+                    user_id += 1
+                    event_id = user_id % options['events'] + 1
+                    start = time.perf_counter()
+                    try:
+                        conn.execute('BEGIN IMMEDIATE') # what Django does with transaction_mode=IMMEDIATE
+                        conn.execute('INSERT OR IGNORE INTO rsvp (user_id, event_id) VALUES (?, ?)', (user_id, event_id))
+                        conn.execute('UPDATE event SET attendee_count = attendee_count + 1 WHERE id = ?', (event_id,))
+                        conn.execute('COMMIT')
+                        mine.append((time.perf_counter() - start) * 1000)
+                    except sqlite3.OperationalError as exc:
+                        failed.append(str(exc))
+                        if conn.in_transaction:
+                            conn.execute('ROLLBACK')
+                conn.close()
+                with lock:
+                    writes.extend(mine)
+                    errors.extend(failed)
+
+            def reader():
+                conn = self.connect(path, profile)
+                mine = []
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    conn.execute('SELECT id, title, attendee_count FROM event ORDER BY date_posted DESC, id DESC LIMIT 6').fetchall()
+                    mine.append((time.perf_counter() - start) * 1000)
+                conn.close()
+                with lock:
+                    reads.extend(mine)
+
+            threads = [threading.Thread(target=writer, args=(i,)) for i in range(options['writers'])]
+            threads += [threading.Thread(target=reader) for _ in range(options['readers'])]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        return {
+            'profile': profile,
+            'writes_per_second': round(len(writes) / options['seconds'], 1),
+            'reads_per_second': round(len(reads) / options['seconds'], 1),
+            'write_latency': summarize(writes),
+            'read_latency': summarize(reads),
+            'errors': len(errors),
+        }
+
+    def handle(self, *args, **options):
+        results = [self.run_profile(profile, options) for profile in options['profiles']]
+
+        for result in results:
+            self.stdout.write(
+                f"{result['profile']:>8}: {result['writes_per_second']:>9} writes/s "
+                f"(p95 {result['write_latency']['p95_ms']} ms), "
+                f"{result['reads_per_second']:>9} reads/s (p95 {result['read_latency']['p95_ms']} ms), "
+                f"{result['errors']} errors"
+            )
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as f:
+                json.dump(results, f, indent=2)
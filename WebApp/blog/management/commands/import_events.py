@@ -0,0 +1,33 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from blog.importer import BATCH_SIZE, import_file
+
+
+class Command(BaseCommand):
+    help = 'Bulk import events from a CSV or iCalendar (.ics) file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV (title,description,event_date,event_time,location) or .ics file')
+        parser.add_argument('--author', required=True, help='Username the events are posted as')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Events inserted per transaction')
+
+    def handle(self, *args, **options):
+        try:
+            author = User.objects.get(username=options['author'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['author']!r}")
+
+        start = time.perf_counter()
+        with open(options['path'], 'rb') as f:
+            try:
+                report = import_file(f, options['path'], author, options['batch_size'])
+            except ValueError as e:
+                raise CommandError(str(e))
+        elapsed = time.perf_counter() - start
+
+        for error in report.errors:
+            self.stderr.write(f'Line {error.line}: {error.message}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {report.created} event(s), skipped {report.failed} row(s) in {elapsed:.1f}s'))
@@ -0,0 +1,193 @@
+import json
+import random
+import threading
+from collections import defaultdict
+from time import perf_counter
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from blog import instrumentation
+from blog.bench import regressions, summarize
+from blog.models import Event, RSVP
+
+# url name: share of the requests
+MIX = {
+    'blog-home': 30,
+    'event-detail': 30,
+    'user-events': 15,
+    'my-events': 15,
+    'toggle-rsvp': 10,
+}
+OK_STATUS = {'toggle-rsvp': 302}  # redirects back to the event, everything else renders a page
+TARGET_SAMPLE = 10000  # events, authors and users picked at random as targets
+
+
+class QueryCounter:
+    """Execute wrapper counting the queries run on one thread's connection"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = 'Drive the main pages from concurrent clients and report throughput, latency percentiles and queries per request'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=10.0, help='How long requests are measured')
+        parser.add_argument('--warmup', type=float, default=2.0, help='Seconds of requests before measuring starts')
+        parser.add_argument('--logins', type=int, default=10, help='Logged in users per thread')
+        parser.add_argument('--anonymous', type=float, default=0.5,
+                            help='Share of the home, event and user page requests made logged out')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--json', dest='json_path', help='Write the results to this file')
+        parser.add_argument('--baseline', help='Results of an earlier run, fail if this run is worse')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='How much worse latency and throughput may get against the baseline (0.2 = 20%%)')
+
+    def targets(self, rng):
+        """Random events, authors and users to send the requests to"""
+        def sample(values):
+            values = list(values)
+            return rng.sample(values, min(len(values), TARGET_SAMPLE))
+
+        events = sample(Event.objects.values_list('pk', flat=True).iterator())
+        authors = sample(Event.objects.order_by().values_list('author__username', flat=True).distinct().iterator())
+        users = sample(User.objects.filter(is_active=True).values_list('pk', flat=True).iterator())
+        if not events or not users:
+            raise CommandError('Nothing to load test, add data with "manage.py seed_data" first')
+        return events, authors, users
+
+    def request(self, name, client, rng, events, authors):
+        if name == 'blog-home':
+            return client.get(reverse('blog-home'))
+        if name == 'event-detail':
+            return client.get(reverse('event-detail', args=[rng.choice(events)]))
+        if name == 'user-events':
+            return client.get(reverse('user-events', args=[rng.choice(authors)]))
+        if name == 'my-events':
+            return client.get(reverse('my-events'))
+        return client.post(reverse('toggle-rsvp', args=[rng.choice(events)]))
+
+    def run(self, options, events, authors, users):
+        names, weights = list(MIX), list(MIX.values())
+        samples = defaultdict(list)  # url name: [(ms, queries, ok)]
+        failures = []
+        lock = threading.Lock()
+        measure_from = perf_counter() + options['warmup']
+        deadline = measure_from + options['seconds']
+
+        def worker(n):
+            rng = random.Random(options['seed'] * 1000 + n)
+            mine, failed = defaultdict(list), []
+            anonymous = Client(raise_request_exception=False)
+            logged_in = []
+            for user in User.objects.filter(pk__in=rng.sample(users, min(options['logins'], len(users)))):
+                client = Client(raise_request_exception=False)
+                client.force_login(user)
+                logged_in.append(client)
+            counter = QueryCounter()
+            try:
+                with connection.execute_wrapper(counter):
+                    while True:
+                        start = perf_counter()
+                        if start >= deadline:
+                            break
+                        name = rng.choices(names, weights)[0]
+                        anonymous_page = name in ('blog-home', 'event-detail', 'user-events') and rng.random() < options['anonymous']
+                        client = anonymous if anonymous_page else rng.choice(logged_in)
+                        counter.count = 0
+                        try:
+                            status = self.request(name, client, rng, events, authors).status_code
+                        except Exception as exc:  # the driver keeps going, the error is counted
+                            status = f'{type(exc).__name__}: {exc}'
+                        elapsed = (perf_counter() - start) * 1000
+                        ok = status == OK_STATUS.get(name, 200)
+                        if start >= measure_from:
+                            mine[name].append((elapsed, counter.count, ok))
+                            if not ok:
+                                failed.append(f'{name}: {status}')
+            finally:
+                connection.close()
+            with lock:
+                for name, rows in mine.items():
+                    samples[name].extend(rows)
+                failures.extend(failed)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(options['threads'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return samples, failures
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        events, authors, users = self.targets(rng)
+        instrumentation.stats.reset()
+        samples, failures = self.run(options, events, authors, users)
+
+        seconds = options['seconds']
+        endpoints = {}
+        for name in MIX:
+            rows = samples.get(name, [])
+            queries = [count for _, count, _ in rows]
+            endpoints[name] = {
+                'requests': len(rows),
+                'throughput_rps': round(len(rows) / seconds, 1),
+                'errors': sum(1 for _, _, ok in rows if not ok),
+                'latency': summarize([ms for ms, _, _ in rows]),
+                'queries': {'mean': round(sum(queries) / len(queries), 2) if queries else None, 'max': max(queries, default=0)},
+            }
+        total = sum(endpoint['requests'] for endpoint in endpoints.values())
+        result = {
+            'config': {key: options[key] for key in ('threads', 'seconds', 'warmup', 'logins', 'anonymous', 'seed')},
+            'database': {
+                'vendor': connection.vendor,
+                'events': Event.objects.count(),
+                'users': User.objects.count(),
+                'rsvps': RSVP.objects.count(),
+            },
+            'finished': timezone.now().isoformat(),
+            'total': {
+                'requests': total,
+                'throughput_rps': round(total / seconds, 1),
+                'errors': len(failures),
+                'latency': summarize([ms for rows in samples.values() for ms, _, _ in rows]),
+            },
+            'endpoints': endpoints,
+            # where the time went inside the views, from the instrumentation middleware, warmup included
+            'server': instrumentation.stats.snapshot(),
+        }
+
+        for name, endpoint in endpoints.items():
+            latency = endpoint['latency']
+            self.stdout.write(
+                f"{name:>13}: {endpoint['throughput_rps']:>8} req/s, "
+                f"p50 {latency['p50_ms']} ms, p95 {latency['p95_ms']} ms, p99 {latency['p99_ms']} ms, "
+                f"{endpoint['queries']['mean']} queries (max {endpoint['queries']['max']}), {endpoint['errors']} errors")
+        self.stdout.write(f"{'total':>13}: {result['total']['throughput_rps']:>8} req/s over {options['threads']} threads")
+        for failure in sorted(set(failures))[:10]:
+            self.stderr.write(failure)
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as f:
+                json.dump(result, f, indent=2)
+
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+            if baseline.get('config') != result['config']:
+                self.stderr.write('The baseline ran with different options, the comparison may not mean much')
+            problems = regressions(baseline, result, options['tolerance'])
+            if problems:
+                raise CommandError('Slower than the baseline:\n' + '\n'.join(problems))
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
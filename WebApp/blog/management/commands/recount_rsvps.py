@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from blog.models import Event, actual_rsvp_count
+
+
+class Command(BaseCommand):
+    help = 'Recompute Event.attendee_count from the RSVP table and repair any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report the events that have drifted')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Number of events updated per statement')
+
+    def handle(self, *args, **options):
+        drifted = (Event.objects.with_actual_rsvp_count()
+                   .exclude(attendee_count=F('actual_rsvps'))
+                   .values_list('pk', 'attendee_count', 'actual_rsvps'))
+        rows = list(drifted.iterator())
+
+        for pk, stored, actual in rows:
+            self.stdout.write(f'Event {pk}: stored {stored}, actual {actual}')
+
+        if options['dry_run'] or not rows:
+            self.stdout.write(self.style.SUCCESS(f'{len(rows)} event(s) drifted'))
+            return
+
+        batch_size = options['batch_size']
+        with transaction.atomic():
+            for start in range(0, len(rows), batch_size):
+                pks = [pk for pk, _, _ in rows[start:start + batch_size]]
+                Event.objects.filter(pk__in=pks).update(attendee_count=actual_rsvp_count())
+        self.stdout.write(self.style.SUCCESS(f'Repaired {len(rows)} event(s)'))
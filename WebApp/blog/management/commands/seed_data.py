@@ -0,0 +1,105 @@
+import random
+from datetime import time, timedelta
+from time import perf_counter
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from blog.cache import FEED_SCOPE, bump_version
+from blog.models import ChangeLog, Event, RSVP, actual_rsvp_count
+from users.models import Profile
+
+WORDS = ['Vaquero', 'Career', 'Coding', 'Chess', 'Robotics', 'Study', 'Art', 'Film', 'Soccer', 'Dance',
+         'Volunteer', 'Research', 'Music', 'Garden', 'Startup', 'Poetry', 'Gaming', 'Cooking', 'Yoga', 'Math']
+KINDS = ['Meetup', 'Workshop', 'Night', 'Fair', 'Social', 'Club', 'Talk', 'Hackathon', 'Showcase', 'Session']
+PLACES = ['Student Union', 'Library', 'EIEAB', 'Lamar Hall', 'Ballroom', 'Rec Center', 'Science Building', 'Quad']
+
+
+class Command(BaseCommand):
+    help = 'Add synthetic users, events and RSVPs for benchmarking (see loadtest)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--events', type=int, default=5000)
+        parser.add_argument('--rsvps', type=int, default=20000)
+        parser.add_argument('--organizers', type=float, default=0.1, help='Share of the users that post events')
+        parser.add_argument('--prefix', default='load', help='Username prefix, a second run continues the numbering')
+        parser.add_argument('--password', default='loadtest', help='Password of every seeded user')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, the same seed gives the same data')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        start = perf_counter()
+
+        with transaction.atomic():
+            user_ids = self.seed_users(options, batch_size)
+            organizers = user_ids[:max(1, int(len(user_ids) * options['organizers']))] if user_ids else []
+            event_ids = self.seed_events(rng, organizers, options['events'], batch_size)
+            rsvps = self.seed_rsvps(rng, user_ids, event_ids, options['rsvps'], batch_size)
+
+        if event_ids:
+            # no post_save signals fired for the seeded rows, so invalidate the cached feed here
+            bump_version(FEED_SCOPE)
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {len(user_ids)} users, {len(event_ids)} events and {rsvps} RSVPs in {perf_counter() - start:.1f}s'))
+
+    def seed_users(self, options, batch_size):
+        prefix = options['prefix']
+        first = User.objects.filter(username__startswith=prefix).count()
+        password = make_password(options['password'])  # hashing once, not per user, is most of the speed up
+        ids = []
+        for offset in range(0, options['users'], batch_size):
+            users = [User(username=f'{prefix}{n}', email=f'{prefix}{n}@utrgv.edu', first_name='Load', last_name=str(n), password=password)
+                     for n in range(first + offset, first + min(offset + batch_size, options['users']))]
+            # bulk_create skips the signal that makes the profiles, the cards need them
+            User.objects.bulk_create(users)
+            Profile.objects.bulk_create([Profile(user=user) for user in users])
+            ids.extend(user.pk for user in users)
+        return ids
+
+    def seed_events(self, rng, organizers, count, batch_size):
+        if not organizers:
+            return []
+        now = timezone.now()
+        ids = []
+        for offset in range(0, count, batch_size):
+            events = []
+            for _ in range(min(batch_size, count - offset)):
+                posted = now - timedelta(minutes=rng.randrange(60 * 24 * 365))
+                events.append(Event(
+                    title=f'{rng.choice(WORDS)} {rng.choice(KINDS)}',
+                    description=' '.join(rng.choices(WORDS, k=rng.randint(10, 40))).lower(),
+                    event_date=(posted + timedelta(days=rng.randint(1, 60))).date(),
+                    event_time=time(rng.randint(8, 21), rng.choice([0, 30])),
+                    location=rng.choice(PLACES),
+                    date_posted=posted,
+                    author_id=rng.choice(organizers),
+                ))
+            Event.objects.bulk_create(events)
+            # the change log entries the signals would have written, so the desktop sync sees the events
+            ChangeLog.objects.bulk_create([ChangeLog(kind=ChangeLog.EVENT, event_id=event.pk, changed_at=now) for event in events])
+            ids.extend(event.pk for event in events)
+        return ids
+
+    def seed_rsvps(self, rng, user_ids, event_ids, count, batch_size):
+        if not user_ids or not event_ids:
+            return 0
+        count = min(count, len(user_ids) * len(event_ids))
+        pairs = set()  # the users are new, so only pairs drawn twice in this run can clash
+        while len(pairs) < count:
+            batch = []
+            while len(batch) < batch_size and len(pairs) < count:
+                pair = (rng.choice(user_ids), rng.choice(event_ids))
+                if pair not in pairs:
+                    pairs.add(pair)
+                    batch.append(RSVP(user_id=pair[0], event_id=pair[1]))
+            RSVP.objects.bulk_create(batch)
+            ChangeLog.objects.bulk_create([ChangeLog(kind=ChangeLog.RSVP, event_id=rsvp.event_id, user_id=rsvp.user_id) for rsvp in batch])
+        # bulk_create skipped the counter signals too
+        for offset in range(0, len(event_ids), batch_size):
+            Event.objects.filter(pk__in=event_ids[offset:offset + batch_size]).update(attendee_count=actual_rsvp_count())
+        return len(pairs)
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from blog.sync import BATCH_SIZE, SyncError, sync
+
+
+class Command(BaseCommand):
+    help = "Two-way sync of events and RSVPs with the desktop app's Spotlight.db"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path to the desktop Spotlight.db')
+        parser.add_argument('--peer', help='Name this desktop database is tracked under (defaults to the path)')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Changes applied per transaction')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            report = sync(options['path'], options['peer'], options['batch_size'])
+        except SyncError as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - start
+
+        for problem in report.problems:
+            self.stderr.write(problem)
+        self.stdout.write(report.summary())
+        self.stdout.write(self.style.SUCCESS(f'Synced in {elapsed:.1f}s'))
@@ -0,0 +1,68 @@
+from django.db import migrations
+
+# blog_event_fts is an FTS5 index over the searchable Event fields. It is
+# an external content table, so it stores only the terms and reads the
+# text from blog_event, and triggers keep it in step with every insert,
+# update and delete, including the raw inserts of the bulk importer.
+# Only SQLite has FTS5, on other databases search falls back to icontains.
+# Django rebuilds a table to alter it on SQLite, which drops its triggers: a
+# later migration that alters blog_event has to run FORWARD_SQL[1:4] again.
+
+FORWARD_SQL = [
+    """
+    CREATE VIRTUAL TABLE blog_event_fts USING fts5(
+        title, description, location,
+        content='blog_event', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER blog_event_fts_insert AFTER INSERT ON blog_event BEGIN
+        INSERT INTO blog_event_fts (rowid, title, description, location)
+        VALUES (new.id, new.title, new.description, new.location);
+    END
+    """,
+    """
+    CREATE TRIGGER blog_event_fts_delete AFTER DELETE ON blog_event BEGIN
+        INSERT INTO blog_event_fts (blog_event_fts, rowid, title, description, location)
+        VALUES ('delete', old.id, old.title, old.description, old.location);
+    END
+    """,
+    # only when a searched column changes, the RSVP counter updates leave the index alone
+    """
+    CREATE TRIGGER blog_event_fts_update AFTER UPDATE OF title, description, location ON blog_event BEGIN
+        INSERT INTO blog_event_fts (blog_event_fts, rowid, title, description, location)
+        VALUES ('delete', old.id, old.title, old.description, old.location);
+        INSERT INTO blog_event_fts (rowid, title, description, location)
+        VALUES (new.id, new.title, new.description, new.location);
+    END
+    """,
+    "INSERT INTO blog_event_fts (blog_event_fts) VALUES ('rebuild')",
+]
+
+REVERSE_SQL = [
+    "DROP TRIGGER IF EXISTS blog_event_fts_insert",
+    "DROP TRIGGER IF EXISTS blog_event_fts_delete",
+    "DROP TRIGGER IF EXISTS blog_event_fts_update",
+    "DROP TABLE IF EXISTS blog_event_fts",
+]
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_event_last_modified'),
+    ]
+
+    operations = [
+        migrations.RunPython(run(FORWARD_SQL), run(REVERSE_SQL)),
+    ]
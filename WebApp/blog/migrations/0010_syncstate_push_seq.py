@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_sync_change_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='syncstate',
+            name='push_seq',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
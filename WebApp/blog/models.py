@@ -2,6 +2,47 @@ from django.db import models
 from django.utils import timezone #for our date_posted field
 from django.contrib.auth.models import User # for our author field
 from django.urls import reverse
+from django.db.models import Count, Exists, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def actual_rsvp_count():
+    """Expression counting an event's rows in the RSVP table"""
+    counts = (RSVP.objects.filter(event=OuterRef('pk'))
+              .order_by().values('event').annotate(total=Count('pk')).values('total'))
+    return Coalesce(Subquery(counts), 0)
+
+
+class EventQuerySet(models.QuerySet):
+    """Shared queryset layer for the event feeds (home, user events, my events)"""
+
+    def with_author(self):
+        """Join the author and their profile so the cards don't do a lazy query per row"""
+        return self.select_related('author__profile')
+
+    def with_rsvp_count(self):
+        """Expose the stored attendee counter as num_rsvps for the cards"""
+        return self.annotate(num_rsvps=F('attendee_count'))
+
+    def with_actual_rsvp_count(self):
+        """Annotate actual_rsvps by counting the RSVP table, used to find counter drift"""
+        return self.annotate(actual_rsvps=actual_rsvp_count())
+
+    def with_user_rsvp(self, user):
+        """Annotate user_rsvpd, True if the given user has RSVP'd to the event"""
+        if user is not None and user.is_authenticated:
+            return self.annotate(user_rsvpd=Exists(RSVP.objects.filter(event=OuterRef('pk'), user=user)))
+        return self.annotate(user_rsvpd=Value(False))
+
+    def for_feed(self, user=None):
+        """Everything an event card needs, fetched in a single query"""
+        return self.with_author().with_rsvp_count().with_user_rsvp(user)
+
+    def rsvpd_by(self, user):
+        """Feed of the events the given user has RSVP'd to"""
+        # join from the RSVP (user, event) index instead of an EXISTS per event, which scans blog_event
+        return self.with_author().with_rsvp_count().filter(rsvp__user=user).annotate(user_rsvpd=Value(True))
+
 
 class Event(models.Model): # inheriting from the models.Model class
     title = models.CharField(max_length=200)
@@ -10,8 +51,24 @@ class Event(models.Model): # inheriting from the models.Model class
     event_time = models.TimeField()  # the time when the event will start
     location = models.CharField(max_length=200)  # where the event will be held
     date_posted = models.DateTimeField(default=timezone.now)  # this is the date and time the event was created
-    author = models.ForeignKey(User, on_delete=models.CASCADE) #cascading means that if the user is deleted then all the events will be deleted
-    
+    author = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False) #cascading means that if the user is deleted then all the events will be deleted, indexed by event_author_feed_idx
+    attendee_count = models.PositiveIntegerField(default=0, editable=False)  # kept in sync by the RSVP signals in blog/signals.py
+    last_modified = models.DateTimeField(auto_now=True, db_index=True)  # Last-Modified of the calendar feeds
+    desktop_id = models.BigIntegerField(null=True, blank=True, editable=False)  # id of the same event in the desktop app's Spotlight.db, see blog/sync.py
+
+    objects = EventQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # back the (date_posted, id) keyset pagination of the home feed and the user feeds
+            models.Index(fields=['-date_posted', '-id'], name='event_feed_idx'),
+            models.Index(fields=['author', '-date_posted', '-id'], name='event_author_feed_idx'),
+        ]
+        constraints = [
+            # partial, so most events can have no desktop_id
+            models.UniqueConstraint(fields=['desktop_id'], condition=Q(desktop_id__isnull=False), name='event_desktop_id_unique'),
+        ]
+
     def __str__(self):
         return self.title
     
@@ -19,8 +76,8 @@ class Event(models.Model): # inheriting from the models.Model class
         return reverse('event-detail', kwargs={'pk': self.pk}) #full path as a string
     
     def rsvp_count(self):
-        """Return the number of RSVPs for this event"""
-        return self.rsvp_set.count()
+        """Return the number of RSVPs for this event (stored counter, no COUNT query)"""
+        return self.attendee_count
     
     def is_user_rsvpd(self, user):
         """Check if a user has RSVP'd to this event"""
@@ -29,16 +86,50 @@ class Event(models.Model): # inheriting from the models.Model class
         return False
 
 class RSVP(models.Model): 
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
-    event = models.ForeignKey(Event, on_delete=models.CASCADE)
+    # no single column indexes, the two composite indexes below start with each of these
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, db_index=False)
     date_rsvpd = models.DateTimeField(auto_now_add=True)
     
     class Meta:
-        unique_together = ['user', 'event']  # Prevent duplicate RSVPs for the same user and event
+        unique_together = ['user', 'event']  # Prevent duplicate RSVPs for the same user and event, also serves my_events
+        indexes = [
+            # covers Event.is_user_rsvpd and the per-event lookups (counts, attendee lists, cascades)
+            models.Index(fields=['event', 'user'], name='rsvp_event_user_idx'),
+        ]
     
     def __str__(self):
         return f'{self.user.username} RSVP\'d to {self.event.title}'
 
 
+class ChangeLog(models.Model):
+    """Every change to an event or RSVP in order, the desktop sync reads the ones after its last position"""
+    EVENT = 'event'
+    RSVP = 'rsvp'
+    KIND_CHOICES = [(EVENT, 'Event'), (RSVP, 'RSVP')]
+
+    kind = models.CharField(max_length=5, choices=KIND_CHOICES)
+    event_id = models.BigIntegerField()  # not a foreign key, the log outlives deleted events
+    user_id = models.BigIntegerField(null=True, blank=True)  # RSVP changes only
+    changed_at = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            # the latest change to one event or RSVP, for conflict checks
+            models.Index(fields=['kind', 'event_id', 'user_id'], name='changelog_object_idx'),
+        ]
 
+    def __str__(self):
+        return f'{self.kind} {self.event_id} changed at {self.changed_at}'
+
+
+class SyncState(models.Model):
+    """How far into a desktop database's change logs the sync has pulled, and how far into ours it has pushed"""
+    peer = models.CharField(max_length=200, unique=True)
+    event_seq = models.BigIntegerField(null=True, blank=True)  # None until the first full pass
+    rsvp_seq = models.BigIntegerField(null=True, blank=True)
+    push_seq = models.BigIntegerField(null=True, blank=True)  # last ChangeLog id the desktop has, None until the first push
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'sync with {self.peer}'
@@ -0,0 +1,93 @@
+from datetime import datetime
+from django.db.models import Q
+from django.http import Http404
+from django.utils.encoding import force_str
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(direction, event):
+    """Opaque token pointing just past the given event in the given direction ('next' or 'prev')"""
+    raw = f'{direction}|{event.date_posted.isoformat()}|{event.pk}'
+    return urlsafe_base64_encode(raw.encode())
+
+
+def decode_cursor(token):
+    """Turn a token back into (direction, date_posted, pk)"""
+    try:
+        direction, posted, pk = force_str(urlsafe_base64_decode(token)).split('|')
+        if direction not in ('next', 'prev'):
+            raise ValueError(direction)
+        return direction, datetime.fromisoformat(posted), int(pk)
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise InvalidCursor(token)
+
+
+class CursorPage:
+    """Stands in for django's Page in the templates, without a paginator or a COUNT(*)"""
+
+    def __init__(self, object_list, has_next, has_previous):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.next_cursor = encode_cursor('next', object_list[-1]) if has_next and object_list else None
+        self.previous_cursor = encode_cursor('prev', object_list[0]) if has_previous and object_list else None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+
+def paginate_by_cursor(queryset, page_size, token=None):
+    """Return one CursorPage of the queryset, newest first, keyed on (date_posted, id)"""
+    if not token:
+        rows = list(queryset.order_by('-date_posted', '-id')[:page_size + 1])
+        return CursorPage(rows[:page_size], has_next=len(rows) > page_size, has_previous=False)
+
+    direction, posted, pk = decode_cursor(token)
+    if direction == 'next': # older events, continue walking the index downwards
+        older = Q(date_posted__lt=posted) | Q(date_posted=posted, id__lt=pk)
+        rows = list(queryset.filter(older).order_by('-date_posted', '-id')[:page_size + 1])
+        return CursorPage(rows[:page_size], has_next=len(rows) > page_size, has_previous=True)
+
+    # newer events, walk the index upwards then flip back to newest first
+    newer = Q(date_posted__gt=posted) | Q(date_posted=posted, id__gt=pk)
+    rows = list(queryset.filter(newer).order_by('date_posted', 'id')[:page_size + 1])
+    page = rows[:page_size][::-1]
+    return CursorPage(page, has_next=True, has_previous=len(rows) > page_size)
+
+
+class CursorPaginationMixin:
+    """ListView mixin that pages with cursor tokens instead of OFFSET, old ?page= links still work"""
+    pagination_mode = 'cursor'
+
+    def use_cursor(self):
+        return self.pagination_mode == 'cursor' and 'page' not in self.request.GET
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_cursor():
+            return super().paginate_queryset(queryset, page_size)
+        try:
+            page = paginate_by_cursor(queryset, page_size, self.request.GET.get('cursor'))
+        except InvalidCursor:
+            raise Http404('Invalid page cursor')
+        return (None, page, page.object_list, page.has_other_pages())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['cursor_mode'] = self.use_cursor()
+        return context
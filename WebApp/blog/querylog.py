@@ -0,0 +1,140 @@
+"""
+Slow-query log and N+1 detector for development and staging.
+
+QueryAnalysisMiddleware watches every query of a request through
+connection.execute_wrapper. It logs (logger 'blog.querylog'):
+
+  - queries slower than SLOW_QUERY_MS (None turns this off, as it is under
+    `manage.py test`)
+  - the same SQL shape run more than REPEATED_QUERY_LIMIT times in one
+    request, the usual sign of a per-row query in a loop or a template,
+    e.g. {{ event.author.profile }} without select_related
+
+with the template line or the view code that ran them. With
+QUERY_ANALYSIS_RAISE the repeated queries raise RepeatedQueriesError
+instead, so `SPOTLIGHT_QUERY_STRICT=1 python manage.py test` fails the
+tests that reintroduce one. It is on when QUERY_ANALYSIS is set (DEBUG by
+default) and removes itself otherwise.
+
+Tests can check a block of code without a request:
+
+    with querylog.analyze(limit=3, raise_errors=True):
+        ...
+"""
+import logging
+import os
+import re
+import sys
+from contextlib import contextmanager
+from functools import lru_cache
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from . import instrumentation
+
+logger = logging.getLogger(__name__)
+
+SQL_LENGTH = 300  # how much of a query goes into the log
+
+_IN_LIST = re.compile(r'\((?:%s|\?)(?:, (?:%s|\?))*\)')
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_APP_DIR = os.path.join(str(settings.BASE_DIR), '')
+_TOOLING = {__file__, instrumentation.__file__}  # never the origin of a query
+
+
+class RepeatedQueriesError(Exception):
+    pass
+
+
+@lru_cache(maxsize=2048)
+def shape(sql):
+    """The query with its literals and the length of its IN (...) lists taken out"""
+    return _IN_LIST.sub('(...)', _LITERAL.sub('?', sql))
+
+
+def origin():
+    """Where the running query comes from: the innermost template line, else the innermost line of our own code."""
+    template, code = None, None
+    frame = sys._getframe(1)
+    while frame is not None and not (template and code):
+        node = frame.f_locals.get('self') if frame.f_code.co_name == 'render_annotated' else None
+        if template is None and node is not None and getattr(node, 'token', None) is not None:
+            template = f'{node.origin.template_name or node.origin.name}:{node.token.lineno}'
+        filename = frame.f_code.co_filename
+        if (code is None and filename.startswith(_APP_DIR) and 'site-packages' not in filename
+                and filename not in _TOOLING):
+            code = f'{os.path.relpath(filename, _APP_DIR)}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    if template and code:
+        return f'{template} (rendered from {code})'
+    return template or code or 'unknown'
+
+
+class QueryLog:
+    """The execute wrapper, collects what one request or analyze() block ran"""
+
+    def __init__(self, slow_ms, limit):
+        self.slow_ms = slow_ms
+        self.limit = limit
+        self.shapes = {}  # shape: [count, origin of the first one, sql of the first one]
+        self.slow = []  # (ms, origin, sql)
+
+    def __call__(self, execute, sql, params, many, context):
+        key = shape(sql)
+        seen = self.shapes.get(key)
+        if seen is None:
+            self.shapes[key] = [1, None, sql]
+        else:
+            seen[0] += 1
+            if seen[0] == 2:
+                seen[1] = origin()  # only queries that repeat pay for the stack walk
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (perf_counter() - start) * 1000
+            if self.slow_ms is not None and elapsed > self.slow_ms:
+                self.slow.append((elapsed, origin(), sql))
+
+    def repeated(self):
+        """[(count, origin, sql)] of the shapes run more than limit times, most first"""
+        return sorted(((count, where, sql) for count, where, sql in self.shapes.values() if count > self.limit),
+                      key=lambda row: -row[0])
+
+    def report(self, label, raise_errors=False):
+        for elapsed, where, sql in self.slow:
+            logger.warning('%s: slow query (%.1f ms) at %s: %s', label, elapsed, where, sql[:SQL_LENGTH])
+        repeated = self.repeated()
+        if not repeated:
+            return
+        lines = [f'{count} x at {where}: {sql[:SQL_LENGTH]}' for count, where, sql in repeated]
+        message = f'{label}: the same query ran more than {self.limit} times, likely an N+1\n' + '\n'.join(lines)
+        if raise_errors:
+            raise RepeatedQueriesError(message)
+        logger.warning(message)
+
+
+@contextmanager
+def analyze(label='queries', slow_ms=None, limit=None, raise_errors=None):
+    """Runs the block under a QueryLog and reports it at the end, the settings fill in what isn't given"""
+    log = QueryLog(settings.SLOW_QUERY_MS if slow_ms is None else slow_ms,
+                   settings.REPEATED_QUERY_LIMIT if limit is None else limit)
+    with connection.execute_wrapper(log):
+        yield log
+    log.report(label, settings.QUERY_ANALYSIS_RAISE if raise_errors is None else raise_errors)
+
+
+class QueryAnalysisMiddleware:
+    """Reports the slow and repeated queries of each request, see the module docstring"""
+
+    def __init__(self, get_response):
+        if not settings.QUERY_ANALYSIS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with analyze(f'{request.method} {request.path}'):
+            return self.get_response(request)
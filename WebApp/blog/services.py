@@ -0,0 +1,49 @@
+from collections import namedtuple
+from django.db import IntegrityError, transaction
+from .models import Event, RSVP
+
+# what the RSVP endpoints send back: the user's new state and the event's attendee count
+RSVPState = namedtuple('RSVPState', ['is_rsvpd', 'rsvp_count'])
+
+
+def _attend(user, event_id):
+    """Create the RSVP, treating a duplicate (e.g. from a concurrent request) as success"""
+    try:
+        with transaction.atomic(): # savepoint so a duplicate doesn't break the outer transaction
+            RSVP.objects.create(user=user, event_id=event_id)
+    except IntegrityError:
+        if not RSVP.objects.filter(user=user, event_id=event_id).exists():
+            raise # not a duplicate, something else went wrong
+        return False
+    return True
+
+
+def _cancel(user, event_id):
+    """Delete the RSVP if there is one, returns True if a row was removed"""
+    deleted, _ = RSVP.objects.filter(user=user, event_id=event_id).delete()
+    return deleted > 0
+
+
+def _current_count(event_id):
+    return Event.objects.filter(pk=event_id).values_list('attendee_count', flat=True).get()
+
+
+def set_rsvp(user, event_id, attending):
+    """Idempotently make the user attend (or not attend) the event"""
+    with transaction.atomic():
+        if attending:
+            _attend(user, event_id)
+        else:
+            _cancel(user, event_id)
+        return RSVPState(attending, _current_count(event_id))
+
+
+def toggle_rsvp(user, event_id):
+    """Flip the user's RSVP for the event in a single transaction"""
+    with transaction.atomic():
+        if _cancel(user, event_id):
+            is_rsvpd = False
+        else:
+            _attend(user, event_id)
+            is_rsvpd = True
+        return RSVPState(is_rsvpd, _current_count(event_id))
@@ -0,0 +1,53 @@
+from django.contrib.auth.models import User
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import ChangeLog, Event, RSVP
+from .cache import FEED_SCOPE, bump_version, invalidate_event
+
+
+@receiver(post_save, sender=RSVP) # runs for the RSVP view, the admin and anything else that creates an RSVP
+def increment_attendee_count(sender, instance, created, **kwargs):
+    if created:
+        Event.objects.filter(pk=instance.event_id).update(attendee_count=F('attendee_count') + 1)
+
+
+@receiver(post_delete, sender=RSVP) # also runs for RSVPs removed by a cascade (user or event deleted)
+def decrement_attendee_count(sender, instance, **kwargs):
+    Event.objects.filter(pk=instance.event_id).update(attendee_count=Greatest(F('attendee_count') - 1, 0))
+
+
+# --- cache invalidation, see blog/cache.py ---
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_event_cache(sender, instance, **kwargs):
+    invalidate_event(instance.pk)
+
+
+@receiver(post_save, sender=RSVP)
+@receiver(post_delete, sender=RSVP)
+def invalidate_rsvp_cache(sender, instance, **kwargs): # the attendee count shows on the card and detail page
+    invalidate_event(instance.event_id)
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_pages(sender, instance, update_fields=None, **kwargs): # author names show on every feed page
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return  # a login, nothing on the pages changed
+    bump_version(FEED_SCOPE)
+
+
+# --- change log for the desktop sync, see blog/sync.py ---
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def log_event_change(sender, instance, **kwargs):
+    ChangeLog.objects.create(kind=ChangeLog.EVENT, event_id=instance.pk)
+
+
+@receiver(post_save, sender=RSVP)
+@receiver(post_delete, sender=RSVP)
+def log_rsvp_change(sender, instance, **kwargs):
+    ChangeLog.objects.create(kind=ChangeLog.RSVP, event_id=instance.event_id, user_id=instance.user_id)
@@ -0,0 +1,602 @@
+"""
+Two-way sync between the desktop app's Spotlight.db and this database.
+
+Nothing is copied in full. Each side keeps a change log (event_changes and
+rsvp_changes in Spotlight.db, ChangeLog here) and a sync only reads the
+entries after the position the destination recorded last time. Changes are
+applied in batches, and each batch is committed together with that position
+and the id links (Event.desktop_id here, events.web_id on the desktop), all
+in the destination database. A sync that is interrupted picks up where it
+stopped without applying anything twice.
+
+How the schemas map:
+    events.name, date, location, description  <->  Event.title, event_date, location, description
+    events.organization_email                  <->  Event.author (matched by email)
+    rsvps (event_id, user_email)               <->  RSVP (event, user)
+Desktop events have no start time, new ones get DEFAULT_TIME and an update
+keeps the time already set here.
+
+When both sides changed the same event or RSVP, the newer change wins (the
+change logs are stamped in UTC) and the losing side is queued to be
+overwritten on the next pass. A change that leaves both sides equal is
+skipped, and the desktop log entries for what the push itself wrote are
+not read back at all.
+
+ChangeLog entries every known desktop has received are deleted after a
+push, so the log only holds what some desktop still has to read.
+"""
+import sqlite3
+from collections import defaultdict
+from datetime import datetime, time, timezone as dt_timezone
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from .cache import FEED_SCOPE, bump_version, invalidate_event
+from .models import ChangeLog, Event, RSVP, SyncState, actual_rsvp_count
+
+BATCH_SIZE = 500  # changes per batch, also keeps the IN (...) lists under SQLite's parameter limit
+DEFAULT_TIME = time(12, 0)
+DESKTOP_SCHEMA_VERSION = 6  # the desktop migration that added rsvp_changes, web_id and sync_state
+DESKTOP_PEER = 'web'  # how this database is named in the desktop's sync_state
+OLDEST = datetime.min.replace(tzinfo=dt_timezone.utc)  # changes logged before they were timestamped
+
+TITLE_LENGTH = Event._meta.get_field('title').max_length
+LOCATION_LENGTH = Event._meta.get_field('location').max_length
+
+
+class SyncError(Exception):
+    pass
+
+
+class SyncReport:
+    """Counts of what a sync did, per destination ('web' or 'desktop')."""
+
+    ACTIONS = ['created', 'updated', 'deleted', 'linked', 'rsvps_added', 'rsvps_removed', 'conflicts_lost', 'skipped']
+
+    def __init__(self):
+        self.counts = {side: dict.fromkeys(self.ACTIONS, 0) for side in ('web', 'desktop')}
+        self.problems = []  # readable reasons for the skipped rows, the first 100
+
+    def add(self, side, action, n=1):
+        self.counts[side][action] += n
+
+    def skip(self, side, message):
+        self.add(side, 'skipped')
+        if len(self.problems) < 100:
+            self.problems.append(message)
+
+    def summary(self):
+        lines = []
+        for side, counts in self.counts.items():
+            parts = [f'{n} {action.replace("_", " ")}' for action, n in counts.items() if n]
+            lines.append(f'{side}: {", ".join(parts) or "up to date"}')
+        return '\n'.join(lines)
+
+
+# --- desktop database ---
+
+def open_desktop(path):
+    """A connection to Spotlight.db, SyncError if it is missing or its schema predates the sync tables."""
+    try:
+        conn = sqlite3.connect(f'file:{path}?mode=rw', uri=True)
+    except sqlite3.OperationalError as e:
+        raise SyncError(f'Cannot open {path}: {e}')
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA busy_timeout=5000')  # the desktop app may be running
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if version < DESKTOP_SCHEMA_VERSION:
+        conn.close()
+        raise SyncError(f'{path} is at schema version {version}, start the desktop app once to upgrade it to {DESKTOP_SCHEMA_VERSION}')
+    return conn
+
+
+def _placeholders(values):
+    return ','.join('?' * len(values))
+
+
+def _desktop_time(text):
+    if not text:
+        return OLDEST
+    return datetime.fromisoformat(text).replace(tzinfo=dt_timezone.utc)
+
+
+def _desktop_stamp():
+    return datetime.now(dt_timezone.utc).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+
+
+def _chunks(items, size):
+    items = iter(items)
+    while chunk := list(islice(items, size)):
+        yield chunk
+
+
+# --- comparing the two sides ---
+
+def desktop_fields(row):
+    """(title, date, location, description, author email) of a desktop events row."""
+    return (row['name'] or '', row['date'] or '', row['location'] or '', row['description'] or '',
+            (row['organization_email'] or '').lower())
+
+
+def web_fields(event):
+    """The same tuple for an Event, its author must be loaded."""
+    return (event.title, event.event_date.isoformat(), event.location, event.description, event.author.email.lower())
+
+
+def _latest(pairs):
+    """{key: newest time} from (key, time) pairs."""
+    latest = {}
+    for key, when in pairs:
+        if key not in latest or when > latest[key]:
+            latest[key] = when
+    return latest
+
+
+# --- users ---
+
+def _web_users(desktop, emails, known):
+    """{email: User} for the emails, creating accounts (without a usable password) for desktop-only students.
+    known caches the lookups for the rest of the sync."""
+    emails = {email.lower() for email in emails if email}
+    missing = [email for email in emails if email not in known]
+    for chunk in _chunks(missing, BATCH_SIZE):
+        for user in User.objects.annotate(email_lower=Lower('email')).filter(email_lower__in=chunk).order_by('pk'):
+            known.setdefault(user.email_lower, user)
+        new = [email for email in chunk if email not in known and len(email) <= 150]
+        if not new:
+            continue
+        names = {row['email'].lower(): row for row in desktop.execute(
+            f'SELECT email, first_name, last_name FROM studentuser WHERE lower(email) IN ({_placeholders(new)})', new)}
+        accounts = []
+        for email in new:
+            row = names.get(email)
+            user = User(username=email, email=email,
+                        first_name=(row['first_name'] or '')[:150] if row else '',
+                        last_name=(row['last_name'] or '')[:150] if row else '')
+            user.set_unusable_password()  # they get a password through a reset
+            accounts.append(user)
+        User.objects.bulk_create(accounts, ignore_conflicts=True)
+        # ignore_conflicts leaves the pks unset, read them back
+        for user in User.objects.filter(username__in=new):
+            known.setdefault(user.email.lower(), user)
+    return {email: known[email] for email in emails if email in known}
+
+
+# --- desktop -> web ---
+
+def _desktop_event_changes(desktop, after_seq, initial, batch_size):
+    """(newest seq, {event id: change time}) batches of the desktop's event_changes after after_seq."""
+    if initial:
+        # first sync: every event is new to us, changes made while we read are picked up next time
+        newest = desktop.execute('SELECT COALESCE(MAX(seq), 0) FROM event_changes').fetchone()[0]
+        ids = [row[0] for row in desktop.execute('SELECT id FROM events ORDER BY id')]
+        for chunk in _chunks(ids, batch_size):
+            yield newest, dict.fromkeys(chunk, OLDEST)
+        if not ids:
+            yield newest, {}
+        return
+    while True:
+        rows = desktop.execute('SELECT seq, event_id, changed_at FROM event_changes WHERE seq > ? ORDER BY seq LIMIT ?',
+                               (after_seq, batch_size)).fetchall()
+        if not rows:
+            return
+        after_seq = rows[-1]['seq']
+        yield after_seq, _latest((row['event_id'], _desktop_time(row['changed_at'])) for row in rows)
+
+
+def _web_twins():
+    """{fields: Event pk} of the events with no desktop link yet. Only the first sync looks for twins, later
+    the links exist and a new desktop event is new here too."""
+    twins = {}
+    events = Event.objects.filter(desktop_id__isnull=True).order_by('pk').values_list(
+        'pk', 'title', 'event_date', 'location', 'description', 'author__email')
+    for pk, title, event_date, location, description, email in events.iterator():
+        twins.setdefault((title, event_date.isoformat(), location, description, email.lower()), pk)
+    return twins
+
+
+def _raw_delete(queryset):
+    """A DELETE without the collector: no post_delete signals, which would log each row for the push
+    to echo back and update its counter and cache one at a time, and no cascade."""
+    return queryset._raw_delete(queryset.db)
+
+
+def _pull_events(desktop, changes, report, known_users, twins):
+    """Applies one batch of desktop event changes here. Returns the ids of the Events touched."""
+    ids = list(changes)
+    rows = {row['id']: row for row in desktop.execute(
+        f'SELECT id, name, date, location, description, organization_email, web_id FROM events WHERE id IN ({_placeholders(ids)})', ids)}
+    web_ids = [row['web_id'] for row in rows.values() if row['web_id']]
+    linked = Event.objects.select_related('author').filter(Q(desktop_id__in=ids) | Q(pk__in=web_ids))
+    by_desktop_id = {event.desktop_id: event for event in linked if event.desktop_id}
+    by_pk = {event.pk: event for event in linked}
+    authors = _web_users(desktop, [row['organization_email'] for row in rows.values()], known_users)
+
+    now = timezone.now()
+    created, updated, deleted, touched, links = [], [], [], [], []
+    for desktop_id, changed_at in changes.items():
+        row = rows.get(desktop_id)
+        event = by_desktop_id.get(desktop_id) or (by_pk.get(row['web_id']) if row else None)
+        if row is None:
+            if event is None:
+                continue
+            if event.last_modified > changed_at:
+                # edited here after the desktop deleted it: keep it and send it back as a new desktop event
+                report.add('web', 'conflicts_lost')
+                touched.append(event.pk)
+                links.append((event.pk, None))
+            else:
+                deleted.append(event.pk)
+            continue
+
+        fields = desktop_fields(row)
+        if event is None:
+            # an event both sides already had before the first sync, e.g. from copying the database by hand
+            twin = twins.pop(fields, None)
+            if twin is not None:
+                links.append((twin, desktop_id))
+                report.add('web', 'linked')
+                continue
+        elif web_fields(event) == fields:
+            if event.desktop_id != desktop_id:
+                links.append((event.pk, desktop_id))
+                report.add('web', 'linked')
+            continue
+        elif event.last_modified > changed_at:
+            report.add('web', 'conflicts_lost')
+            touched.append(event.pk)  # ours is newer, make sure the push overwrites the desktop copy
+            continue
+
+        title, day, location, description, email = fields
+        author = authors.get(email)
+        try:
+            event_date = datetime.strptime(day, '%Y-%m-%d').date()
+        except ValueError:
+            report.skip('web', f'Desktop event {desktop_id}: date {day!r} is not YYYY-MM-DD')
+            continue
+        if not title or author is None:
+            report.skip('web', f'Desktop event {desktop_id}: needs a name and an organization email')
+            continue
+        if event is None:
+            event = Event(event_time=DEFAULT_TIME, date_posted=now)
+            created.append(event)
+        else:
+            updated.append(event)
+        event.title, event.event_date = title[:TITLE_LENGTH], event_date
+        event.location, event.description = location[:LOCATION_LENGTH], description
+        event.author, event.desktop_id, event.last_modified = author, desktop_id, now
+
+    # bulk writes and raw deletes send no signals, so nothing here is logged for the push to echo back
+    Event.objects.bulk_create(created)
+    Event.objects.bulk_update(updated, ['title', 'event_date', 'location', 'description', 'author', 'desktop_id', 'last_modified'])
+    # only desktop_id, bulk_update leaves last_modified alone
+    Event.objects.bulk_update([Event(pk=pk, desktop_id=desktop_id) for pk, desktop_id in links], ['desktop_id'])
+    if deleted:
+        # the cascade by hand, the desktop deleted the event's RSVPs along with it
+        _raw_delete(RSVP.objects.filter(event_id__in=deleted))
+        _raw_delete(Event.objects.filter(pk__in=deleted))
+    ChangeLog.objects.bulk_create([ChangeLog(kind=ChangeLog.EVENT, event_id=pk) for pk in touched])
+    report.add('web', 'created', len(created))
+    report.add('web', 'updated', len(updated))
+    report.add('web', 'deleted', len(deleted))
+    return [event.pk for event in created + updated] + deleted
+
+
+def _desktop_rsvp_changes(desktop, after_seq, initial, batch_size):
+    """(newest seq, {(event id, email): change time}) batches, like _desktop_event_changes."""
+    if initial:
+        newest = desktop.execute('SELECT COALESCE(MAX(seq), 0) FROM rsvp_changes').fetchone()[0]
+        pairs = [(row[0], row[1].lower()) for row in desktop.execute('SELECT event_id, user_email FROM rsvps ORDER BY id')]
+        for chunk in _chunks(pairs, batch_size):
+            yield newest, dict.fromkeys(chunk, OLDEST)
+        if not pairs:
+            yield newest, {}
+        return
+    while True:
+        rows = desktop.execute('SELECT seq, event_id, user_email, changed_at FROM rsvp_changes WHERE seq > ? ORDER BY seq LIMIT ?',
+                               (after_seq, batch_size)).fetchall()
+        if not rows:
+            return
+        after_seq = rows[-1]['seq']
+        yield after_seq, _latest(((row['event_id'], row['user_email'].lower()), _desktop_time(row['changed_at'])) for row in rows)
+
+
+def _pull_rsvps(desktop, changes, report, known_users):
+    """Applies one batch of desktop RSVP changes here. Returns the ids of the Events whose RSVPs changed."""
+    desktop_ids = list({event_id for event_id, _ in changes})
+    web_ids = {row['id']: row['web_id'] for row in desktop.execute(
+        f'SELECT id, web_id FROM events WHERE id IN ({_placeholders(desktop_ids)})', desktop_ids)}
+    event_map = {desktop_id: pk for desktop_id, pk in web_ids.items() if pk}
+    event_map.update(Event.objects.filter(desktop_id__in=desktop_ids).values_list('desktop_id', 'pk'))
+    users = _web_users(desktop, [email for _, email in changes], known_users)
+
+    wanted = {(row[0], row[1].lower()) for row in desktop.execute(
+        f'SELECT event_id, user_email FROM rsvps WHERE event_id IN ({_placeholders(desktop_ids)})', desktop_ids)}
+    pairs = {}  # (web event, web user) -> (desktop pair, change time)
+    for (desktop_id, email), changed_at in changes.items():
+        if desktop_id not in event_map or email not in users:
+            if (desktop_id, email) in wanted:
+                report.skip('web', f'RSVP of {email} to desktop event {desktop_id}: the event or user is not synced')
+            continue
+        pairs[(event_map[desktop_id], users[email].pk)] = ((desktop_id, email), changed_at)
+    if not pairs:
+        return []
+
+    event_pks = {event_pk for event_pk, _ in pairs}
+    user_pks = {user_pk for _, user_pk in pairs}
+    have = set(RSVP.objects.filter(event_id__in=event_pks, user_id__in=user_pks).values_list('event_id', 'user_id'))
+    web_changes = {(row['event_id'], row['user_id']): row['newest'] for row in ChangeLog.objects
+                   .filter(kind=ChangeLog.RSVP, event_id__in=event_pks, user_id__in=user_pks)
+                   .values('event_id', 'user_id').annotate(newest=Max('changed_at'))}
+
+    add, remove, touched = [], defaultdict(list), []
+    for pair, (desktop_pair, changed_at) in pairs.items():
+        attending = desktop_pair in wanted
+        if attending == (pair in have):
+            continue
+        if web_changes.get(pair, OLDEST) > changed_at:
+            report.add('web', 'conflicts_lost')
+            touched.append(pair)
+            continue
+        if attending:
+            add.append(RSVP(event_id=pair[0], user_id=pair[1]))
+        else:
+            remove[pair[0]].append(pair[1])
+
+    # no signals here either, see _pull_events
+    RSVP.objects.bulk_create(add, ignore_conflicts=True)
+    for event_pk, user_pks in remove.items():
+        _raw_delete(RSVP.objects.filter(event_id=event_pk, user_id__in=user_pks))
+    ChangeLog.objects.bulk_create([ChangeLog(kind=ChangeLog.RSVP, event_id=e, user_id=u) for e, u in touched])
+    changed = {rsvp.event_id for rsvp in add} | set(remove)
+    # the counter signals didn't run
+    Event.objects.filter(pk__in=changed).update(attendee_count=actual_rsvp_count())
+    report.add('web', 'rsvps_added', len(add))
+    report.add('web', 'rsvps_removed', sum(len(user_pks) for user_pks in remove.values()))
+    return list(changed)
+
+
+def pull(desktop, peer, report, batch_size=BATCH_SIZE):
+    """Applies the desktop's changes since the last pull, events first so the RSVPs find them."""
+    state, _ = SyncState.objects.get_or_create(peer=peer)
+    known_users, touched = {}, set()
+    twins = _web_twins() if state.event_seq is None else {}
+    for newest, changes in _desktop_event_changes(desktop, state.event_seq or 0, state.event_seq is None, batch_size):
+        with transaction.atomic():
+            if changes:
+                touched.update(_pull_events(desktop, changes, report, known_users, twins))
+            state.event_seq = newest
+            state.save(update_fields=['event_seq', 'updated_at'])
+    for newest, changes in _desktop_rsvp_changes(desktop, state.rsvp_seq or 0, state.rsvp_seq is None, batch_size):
+        with transaction.atomic():
+            if changes:
+                touched.update(_pull_rsvps(desktop, changes, report, known_users))
+            state.rsvp_seq = newest
+            state.save(update_fields=['rsvp_seq', 'updated_at'])
+    # the bulk writes skipped the signals that drop cached pages
+    for pk in touched:
+        invalidate_event(pk)
+    if touched:
+        bump_version(FEED_SCOPE)
+
+
+# --- web -> desktop ---
+
+def _web_changes(after_seq, initial, batch_size):
+    """(newest seq, {event pk: change time}, {(event pk, user pk): change time}) batches of the ChangeLog after after_seq."""
+    if initial:
+        newest = ChangeLog.objects.aggregate(newest=Max('pk'))['newest'] or 0
+        events = Event.objects.order_by('pk').values_list('pk', 'last_modified')
+        for chunk in _chunks(events.iterator(), batch_size):
+            yield newest, dict(chunk), {}
+        rsvps = RSVP.objects.order_by('pk').values_list('event_id', 'user_id', 'date_rsvpd')
+        for chunk in _chunks(rsvps.iterator(), batch_size):
+            yield newest, {}, {(event_pk, user_pk): when for event_pk, user_pk, when in chunk}
+        yield newest, {}, {}  # records the position even when there was nothing to send
+        return
+    while True:
+        rows = list(ChangeLog.objects.filter(pk__gt=after_seq).order_by('pk')
+                    .values_list('pk', 'kind', 'event_id', 'user_id', 'changed_at')[:batch_size])
+        if not rows:
+            return
+        after_seq = rows[-1][0]
+        yield (after_seq,
+               _latest((event_pk, when) for _, kind, event_pk, _, when in rows if kind == ChangeLog.EVENT),
+               _latest(((event_pk, user_pk), when) for _, kind, event_pk, user_pk, when in rows if kind == ChangeLog.RSVP))
+
+
+def _delete_desktop_event(desktop, event_id):
+    # the desktop schema has no ON DELETE CASCADE
+    for table in ('rsvps', 'vaquero_waiting', 'vaquero_match_members', 'vaquero_matches', 'comments'):
+        desktop.execute(f'DELETE FROM {table} WHERE event_id = ?', (event_id,))
+    desktop.execute('DELETE FROM events WHERE id = ?', (event_id,))
+
+
+def _desktop_twins(desktop):
+    """{fields: desktop id} of the desktop events with no web link yet, like _web_twins."""
+    twins = {}
+    for row in desktop.execute('SELECT id, name, date, location, description, organization_email FROM events WHERE web_id IS NULL ORDER BY id'):
+        twins.setdefault(desktop_fields(row), row['id'])
+    return twins
+
+
+def _push_events(desktop, changes, report, twins, links):
+    """Applies one batch of web event changes to the desktop, inside the caller's transaction. Adds (pk, desktop id)
+    to links for the events it created or linked there. Returns True if it logged a change for the next pull."""
+    resent = False
+    pks = list(changes)
+    events = {event.pk: event for event in Event.objects.select_related('author').filter(pk__in=pks)}
+    desktop_ids = [event.desktop_id for event in events.values() if event.desktop_id]
+    rows = desktop.execute(
+        f'SELECT id, name, date, location, description, organization_email, web_id FROM events '
+        f'WHERE web_id IN ({_placeholders(pks)}) OR id IN ({_placeholders(desktop_ids)})', pks + desktop_ids).fetchall()
+    by_web_id = {row['web_id']: row for row in rows if row['web_id']}
+    by_id = {row['id']: row for row in rows}
+    row_ids = list(by_id)
+    desktop_times = {row[0]: _desktop_time(row[1]) for row in desktop.execute(
+        f'SELECT event_id, MAX(changed_at) FROM event_changes WHERE event_id IN ({_placeholders(row_ids)}) GROUP BY event_id', row_ids)}
+
+    for pk, changed_at in changes.items():
+        event = events.get(pk)
+        row = by_web_id.get(pk) or (by_id.get(event.desktop_id) if event and event.desktop_id else None)
+        if event is None:
+            if row is None:
+                continue
+            if desktop_times.get(row['id'], OLDEST) > changed_at:
+                # edited on the desktop after it was deleted here: unlinking it logs a change, the pull re-creates it
+                report.add('desktop', 'conflicts_lost')
+                desktop.execute('UPDATE events SET web_id = NULL WHERE id = ?', (row['id'],))
+                resent = True
+            else:
+                _delete_desktop_event(desktop, row['id'])
+                report.add('desktop', 'deleted')
+            continue
+
+        changed_at = max(changed_at, event.last_modified)
+        fields = web_fields(event)
+        if row is None:
+            twin = twins.pop(fields, None)
+            if twin is not None:
+                desktop.execute('UPDATE events SET web_id = ? WHERE id = ?', (pk, twin))
+                links.append((pk, twin))
+                report.add('desktop', 'linked')
+            else:
+                cursor = desktop.execute(
+                    'INSERT INTO events (name, date, location, description, organization_email, web_id) VALUES (?, ?, ?, ?, ?, ?)',
+                    (event.title, fields[1], event.location, event.description, event.author.email or None, pk))
+                links.append((pk, cursor.lastrowid))
+                report.add('desktop', 'created')
+            continue
+        if desktop_fields(row) == fields:
+            if row['web_id'] != pk:
+                desktop.execute('UPDATE events SET web_id = ? WHERE id = ?', (pk, row['id']))
+                report.add('desktop', 'linked')
+            continue
+        if desktop_times.get(row['id'], OLDEST) > changed_at:
+            report.add('desktop', 'conflicts_lost')
+            # the desktop copy is newer, log it again so the next pull overwrites ours
+            desktop.execute('INSERT INTO event_changes (event_id, changed_at) VALUES (?, ?)', (row['id'], _desktop_stamp()))
+            resent = True
+            continue
+        desktop.execute(
+            'UPDATE events SET name = ?, date = ?, location = ?, description = ?, organization_email = ?, web_id = ? WHERE id = ?',
+            (event.title, fields[1], event.location, event.description, event.author.email or None, pk, row['id']))
+        report.add('desktop', 'updated')
+    return resent
+
+
+def _push_rsvps(desktop, changes, report):
+    """Applies one batch of web RSVP changes to the desktop, like _push_events."""
+    resent = False
+    event_pks = list({event_pk for event_pk, _ in changes})
+    linked = dict(Event.objects.filter(pk__in=event_pks, desktop_id__isnull=False).values_list('pk', 'desktop_id'))
+    desktop_ids = list(linked.values())
+    rows = desktop.execute(f'SELECT id, web_id FROM events WHERE web_id IN ({_placeholders(event_pks)}) '
+                           f'OR id IN ({_placeholders(desktop_ids)})', event_pks + desktop_ids).fetchall()
+    existing = {row['id'] for row in rows}
+    event_map = {pk: desktop_id for pk, desktop_id in linked.items() if desktop_id in existing}
+    event_map.update((row['web_id'], row['id']) for row in rows if row['web_id'])
+    users = {user.pk: user for user in User.objects.filter(pk__in={user_pk for _, user_pk in changes}).exclude(email='')}
+    have = set(RSVP.objects.filter(event_id__in=event_pks, user_id__in=users).values_list('event_id', 'user_id'))
+
+    mapped = list(set(event_map.values()))
+    present = {(row[0], row[1].lower()): row[1] for row in desktop.execute(
+        f'SELECT event_id, user_email FROM rsvps WHERE event_id IN ({_placeholders(mapped)})', mapped)}
+    desktop_times = {(row[0], row[1]): _desktop_time(row[2]) for row in desktop.execute(
+        f'SELECT event_id, lower(user_email), MAX(changed_at) FROM rsvp_changes '
+        f'WHERE event_id IN ({_placeholders(mapped)}) GROUP BY event_id, lower(user_email)', mapped)}
+    emails = list({user.email.lower() for user in users.values()})
+    students = {row[0].lower(): row[0] for row in desktop.execute(
+        f'SELECT email FROM studentuser WHERE lower(email) IN ({_placeholders(emails)})', emails)}
+
+    for (event_pk, user_pk), changed_at in changes.items():
+        if event_pk not in event_map or user_pk not in users:
+            if (event_pk, user_pk) in have:
+                report.skip('desktop', f'RSVP of user {user_pk} to event {event_pk}: the event is not synced or the user has no email')
+            continue
+        user = users[user_pk]
+        pair = (event_map[event_pk], user.email.lower())
+        attending = (event_pk, user_pk) in have
+        if attending == (pair in present):
+            continue
+        if desktop_times.get(pair, OLDEST) > changed_at:
+            report.add('desktop', 'conflicts_lost')
+            desktop.execute('INSERT INTO rsvp_changes (event_id, user_email, changed_at) VALUES (?, ?, ?)',
+                            (pair[0], present.get(pair, pair[1]), _desktop_stamp()))
+            resent = True
+            continue
+        if attending:
+            email = students.get(pair[1])
+            if email is None:
+                # shows up in the desktop's RSVP lists, can't log in there until they register a password
+                email = students[pair[1]] = user.email
+                desktop.execute('INSERT OR IGNORE INTO studentuser (first_name, last_name, email) VALUES (?, ?, ?)',
+                                (user.first_name, user.last_name, email))
+            desktop.execute('INSERT OR IGNORE INTO rsvps (event_id, user_email, find_vaquero) VALUES (?, ?, 0)', (pair[0], email))
+            report.add('desktop', 'rsvps_added')
+        else:
+            desktop.execute('DELETE FROM rsvps WHERE event_id = ? AND user_email = ?', (pair[0], present[pair]))
+            desktop.execute('DELETE FROM vaquero_waiting WHERE event_id = ? AND user_email = ?', (pair[0], present[pair]))
+            report.add('desktop', 'rsvps_removed')
+    return resent
+
+
+def _desktop_seqs(desktop):
+    """The newest (event_changes, rsvp_changes) seqs."""
+    return tuple(desktop.execute('SELECT (SELECT COALESCE(MAX(seq), 0) FROM event_changes), '
+                                 '(SELECT COALESCE(MAX(seq), 0) FROM rsvp_changes)').fetchone())
+
+
+def push(desktop, peer, report, batch_size=BATCH_SIZE):
+    """Applies this database's changes since the last push to the desktop."""
+    state, _ = SyncState.objects.get_or_create(peer=peer)
+    row = desktop.execute('SELECT change_seq FROM sync_state WHERE peer = ?', (DESKTOP_PEER,)).fetchone()
+    twins = _desktop_twins(desktop) if row is None else {}
+    for newest, events, rsvps in _web_changes(row[0] if row else 0, row is None, batch_size):
+        links, resent = [], False
+        with desktop:  # commits the batch and its position together, rolls both back on an error
+            desktop.execute('BEGIN IMMEDIATE')
+            before = _desktop_seqs(desktop)
+            if events:
+                resent |= _push_events(desktop, events, report, twins, links)
+            if rsvps:
+                resent |= _push_rsvps(desktop, rsvps, report)
+            after = _desktop_seqs(desktop)
+            desktop.execute('INSERT INTO sync_state (peer, change_seq) VALUES (?, ?) '
+                            'ON CONFLICT (peer) DO UPDATE SET change_seq = excluded.change_seq', (DESKTOP_PEER, newest))
+        with transaction.atomic():  # the links and the positions here are written together too
+            Event.objects.bulk_update([Event(pk=pk, desktop_id=desktop_id) for pk, desktop_id in links], ['desktop_id'])
+            # the desktop logged our writes as its own changes. If the pull had read everything before them, and
+            # none is a conflict sent back on purpose, the next pull can start after them instead of reading them back
+            if not resent and before == (state.event_seq, state.rsvp_seq) and after != before:
+                state.event_seq, state.rsvp_seq = after
+            state.push_seq = newest
+            state.save(update_fields=['event_seq', 'rsvp_seq', 'push_seq', 'updated_at'])
+    prune_change_log()
+
+
+def prune_change_log():
+    """Deletes the ChangeLog entries every desktop has been sent. Returns how many went.
+    A desktop that hasn't finished a push since push_seq was added holds the pruning back."""
+    acked = SyncState.objects.aggregate(oldest=Min('push_seq'), unknown=Count('pk', filter=Q(push_seq__isnull=True)))
+    if acked['oldest'] is None or acked['unknown']:
+        return 0
+    return _raw_delete(ChangeLog.objects.filter(pk__lte=acked['oldest']))
+
+
+def sync(desktop_path, peer=None, batch_size=BATCH_SIZE):
+    """Pulls the desktop's changes, then pushes ours. Returns a SyncReport."""
+    report = SyncReport()
+    desktop = open_desktop(desktop_path)
+    try:
+        peer = peer or str(desktop_path)
+        pull(desktop, peer, report, batch_size)
+        push(desktop, peer, report, batch_size)
+    finally:
+        desktop.close()
+    return report
@@ -1,3 +1,917 @@
-from django.test import TestCase
+import importlib.util
+import json
+import os
+import re
+import sqlite3
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time, timedelta
+from io import StringIO
+from pathlib import Path
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.core.management import call_command
+from django.template import engines
+from django.db import connection
+from django.db.models import F
+from django.test import Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django_project.db_profiles import database_settings
+from unittest import mock, skipUnless
+
+from . import feeds, instrumentation, querylog, services, sync
+from .bench import regressions
+from .cache import FEED_SCOPE, get_version, stats
+from .importer import import_events, read_ics
+from .models import ChangeLog, Event, RSVP, SyncState
+
+
+def make_event(author, title='Event', **kwargs):
+    """Create an event with sensible defaults for the tests"""
+    fields = {
+        'title': title,
+        'description': 'Description',
+        'event_date': date(2025, 9, 1),
+        'event_time': time(18, 0),
+        'location': 'Student Union',
+        'author': author,
+    }
+    fields.update(kwargs)
+    return Event.objects.create(**fields)
+
+
+class FeedQueryBudgetTests(TestCase):
+    """Feed pages must run a fixed number of queries no matter how many events they show"""
+
+    # session + user + annotated events (cursor pagination, no COUNT)
+    HOME_BUDGET = 3
+    # session + user + author lookup + annotated events
+    USER_EVENTS_BUDGET = 4
+    # session + user + annotated events
+    MY_EVENTS_BUDGET = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.authors = [User.objects.create_user(f'author{i}', password='pass') for i in range(3)]
+        cls.attendees = [User.objects.create_user(f'attendee{i}', password='pass') for i in range(4)]
+        cls.user = User.objects.create_user('viewer', password='pass')
+        for i in range(30):
+            event = make_event(cls.authors[i % 3], title=f'Event {i}')
+            for attendee in cls.attendees[: i % 5]:
+                RSVP.objects.create(user=attendee, event=event)
+            RSVP.objects.create(user=cls.user, event=event)
+
+    def setUp(self):
+        cache.clear()
+        self.client.login(username='viewer', password='pass')
+
+    def test_home_feed_budget(self):
+        with self.assertNumQueries(self.HOME_BUDGET):
+            response = self.client.get(reverse('blog-home'))
+        self.assertEqual(len(response.context['events']), 5)
+
+    def test_home_feed_budget_anonymous(self):
+        self.client.logout()
+        with self.assertNumQueries(1):
+            self.client.get(reverse('blog-home'))
+
+    def test_user_events_budget(self):
+        with self.assertNumQueries(self.USER_EVENTS_BUDGET):
+            self.client.get(reverse('user-events', args=['author0']))
+
+    def test_my_events_budget(self):
+        with self.assertNumQueries(self.MY_EVENTS_BUDGET):
+            response = self.client.get(reverse('my-events'))
+        self.assertEqual(len(response.context['events']), 30)
+
+    def test_offset_pages_still_work(self):
+        response = self.client.get(reverse('blog-home'), {'page': 2})
+        self.assertEqual(response.context['page_obj'].number, 2)
+
+    def test_feed_annotations(self):
+        event = Event.objects.for_feed(self.user).get(title='Event 4')
+        self.assertEqual(event.num_rsvps, 5)
+        self.assertTrue(event.user_rsvpd)
+        other = User.objects.create_user('outsider', password='pass')
+        self.assertFalse(Event.objects.for_feed(other).get(title='Event 4').user_rsvpd)
+
+    def test_rsvpd_by_only_returns_users_events(self):
+        attendee = self.attendees[3]
+        titles = set(Event.objects.rsvpd_by(attendee).values_list('title', flat=True))
+        self.assertEqual(titles, {f'Event {i}' for i in range(30) if i % 5 == 4})
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN is SQLite specific')
+class QueryPlanTests(TestCase):
+    """Every query the event views run against blog tables must be served by an index"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author', password='pass')
+        cls.user = User.objects.create_user('viewer', password='pass')
+        cls.event = make_event(cls.author)
+        RSVP.objects.create(user=cls.user, event=cls.event)
+
+    def setUp(self):
+        cache.clear()
+        self.client.login(username='viewer', password='pass')
+
+    def query_plan(self, sql, params=()):
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assertNoTableScans(self, sql, params=()):
+        plan = self.query_plan(sql, params)
+        # "SCAN blog_event USING INDEX ..." walks an index in order, a bare "SCAN blog_event" reads the table
+        scans = [step for step in plan if re.match(r'SCAN (TABLE )?blog_\w+$', step.split(' USING')[0]) and 'INDEX' not in step]
+        self.assertEqual(scans, [], f'{sql}\n' + '\n'.join(plan))
+
+    def assertViewUsesIndexes(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        checked = 0
+        for query in queries.captured_queries:
+            if query['sql'].startswith('SELECT') and '"blog_' in query['sql']:
+                self.assertNoTableScans(query['sql'])
+                checked += 1
+        self.assertGreater(checked, 0)
+
+    def test_home_feed(self):
+        self.assertViewUsesIndexes(reverse('blog-home'))
+
+    def test_user_events(self):
+        self.assertViewUsesIndexes(reverse('user-events', args=['author']))
+
+    def test_my_events(self):
+        self.assertViewUsesIndexes(reverse('my-events'))
+
+    def test_event_detail(self):
+        self.assertViewUsesIndexes(reverse('event-detail', args=[self.event.pk]))
+
+    def test_rsvp_existence_check_is_covered(self):
+        sql, params = self.event.rsvp_set.filter(user=self.user).values('pk').query.sql_with_params()
+        plan = self.query_plan(sql, params)
+        self.assertTrue(any('COVERING INDEX' in step for step in plan), plan)
+
+    def test_per_event_rsvp_lookup(self):
+        sql, params = RSVP.objects.filter(event=self.event).values('user').query.sql_with_params()
+        plan = self.query_plan(sql, params)
+        self.assertTrue(any('rsvp_event_user_idx' in step for step in plan), plan)
+
+
+class CursorPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author', password='pass')
+        posted = timezone.now()
+        # pairs of events share a timestamp so the id tie-breaker matters
+        for i in range(12):
+            make_event(cls.author, title=f'Event {i}', date_posted=posted + timedelta(minutes=i // 2))
+
+    def titles(self, response):
+        return [event.title for event in response.context['events']]
+
+    def test_walk_forwards_and_back(self):
+        url = reverse('blog-home')
+        pages = [self.client.get(url)]
+        while pages[-1].context['page_obj'].has_next():
+            pages.append(self.client.get(url, {'cursor': pages[-1].context['page_obj'].next_cursor}))
+
+        seen = [title for page in pages for title in self.titles(page)]
+        self.assertEqual(seen, [f'Event {i}' for i in range(11, -1, -1)])
+        self.assertEqual(len(pages), 3)
+
+        back = self.client.get(url, {'cursor': pages[-1].context['page_obj'].previous_cursor})
+        self.assertEqual(self.titles(back), self.titles(pages[1]))
+
+    def test_invalid_cursor_is_404(self):
+        response = self.client.get(reverse('blog-home'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+
+class CacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        stats.reset()
+        self.author = User.objects.create_user('author', password='pass')
+        self.user = User.objects.create_user('attendee', password='pass')
+        self.event = make_event(self.author)
+
+    def test_anonymous_pages_are_cached_until_an_rsvp_changes(self):
+        detail = reverse('event-detail', args=[self.event.pk])
+        for url in (reverse('blog-home'), detail):
+            self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+            with self.assertNumQueries(0):
+                self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+
+        RSVP.objects.create(user=self.user, event=self.event)
+        for url in (reverse('blog-home'), detail):
+            response = self.client.get(url)
+            self.assertEqual(response['X-Cache'], 'MISS')
+            self.assertContains(response, '1 attending')
+        self.assertEqual(stats.snapshot()['page']['hits'], 2)
+
+    def test_an_evicted_version_does_not_bring_back_old_pages(self):
+        url = reverse('blog-home')
+        cache.clear()  # no version yet, like a fresh cache before the first write
+        self.client.get(url)
+        self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+        cache.delete('blog:version:feed')  # as if culled by MAX_ENTRIES
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+
+    def test_other_events_keep_their_detail_page(self):
+        other = make_event(self.author, title='Other')
+        url = reverse('event-detail', args=[other.pk])
+        self.client.get(url)
+        RSVP.objects.create(user=self.user, event=self.event)
+        self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+
+    def test_logged_in_users_skip_the_page_cache(self):
+        self.client.login(username='attendee', password='pass')
+        self.assertFalse(self.client.get(reverse('blog-home')).has_header('X-Cache'))
+
+    def test_cards_are_rerendered_only_when_their_event_changes(self):
+        self.client.login(username='attendee', password='pass')
+        make_event(self.author, title='Other')
+        self.client.get(reverse('blog-home'))
+        self.client.get(reverse('blog-home'))
+        self.assertEqual(stats.snapshot()['fragment'], {'hits': 2, 'misses': 2, 'hit_rate': 0.5})
+        self.event.title = 'Renamed'
+        self.event.save()
+        self.assertContains(self.client.get(reverse('blog-home')), 'Renamed')
+        self.assertEqual(stats.snapshot()['fragment']['hits'], 3)
+
+    def test_renaming_the_author_rerenders_their_cards_and_feed_pages(self):
+        self.client.get(reverse('blog-home'))
+        self.client.login(username='attendee', password='pass')
+        self.client.get(reverse('blog-home'))
+        self.author.username = 'robotics-club'
+        self.author.save()
+        self.assertContains(self.client.get(reverse('blog-home')), 'robotics-club')
+        self.client.logout()
+        response = self.client.get(reverse('blog-home'))
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertContains(response, 'robotics-club')
+
+
+class InstrumentationTests(TestCase):
+    """Server-Timing headers and the per url name histograms of blog/instrumentation.py"""
+
+    def setUp(self):
+        cache.clear()
+        instrumentation.stats.reset()
+        self.author = User.objects.create_user('author', password='pass')
+        self.event = make_event(self.author)
+
+    def timing(self, response):
+        return dict(re.findall(r'(\w+);(?:dur=([\d.]+))?', response['Server-Timing']))
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('blog-home'))
+        timing = self.timing(response)
+        self.assertGreater(float(timing['tpl']), 0)
+        self.assertGreaterEqual(float(timing['total']), float(timing['tpl']) + float(timing['db']))
+        self.assertIn('cache;desc="0 hits', response['Server-Timing'])
+        # served from the page cache: no queries, no templates
+        response = self.client.get(reverse('blog-home'))
+        self.assertIn('db;dur=0.0;desc="0 queries", tpl;dur=0.0', response['Server-Timing'])
+        self.assertIn('cache;desc="1 hits 0 misses"', response['Server-Timing'])
+
+    def test_histograms_per_url_name(self):
+        self.client.login(username='author', password='pass')
+        for _ in range(3):
+            self.client.get(reverse('event-detail', args=[self.event.pk]))
+        self.client.get('/no-such-page/')
+        snapshot = instrumentation.stats.snapshot()
+        detail = snapshot['event-detail']
+        self.assertEqual((detail['requests'], sum(detail['histogram'].values())), (3, 3))
+        self.assertGreater(detail['queries_per_request'], 0)
+        self.assertLessEqual(detail['p50_ms'], detail['max_ms'])
+        self.assertEqual(snapshot['<unresolved>']['requests'], 1)
+
+    def test_stats_endpoint_is_staff_only(self):
+        self.client.login(username='author', password='pass')
+        self.assertEqual(self.client.get(reverse('request-stats')).status_code, 302)
+        User.objects.filter(pk=self.author.pk).update(is_staff=True)
+        # the refused request above is in there too
+        self.assertEqual(self.client.get(reverse('request-stats')).json()['request-stats']['requests'], 1)
+
+
+class QueryAnalysisTests(TestCase):
+    """The slow-query log and N+1 detector of blog/querylog.py"""
+
+    def setUp(self):
+        for i in range(4):
+            make_event(User.objects.create_user(f'author{i}', password='pass'))
+
+    def test_repeated_query_in_a_template_names_the_line(self):
+        template = engines['django'].from_string('{% for event in events %}\n{{ event.author.username }}{% endfor %}')
+        with self.assertRaises(querylog.RepeatedQueriesError) as raised:
+            with querylog.analyze(limit=3, raise_errors=True):
+                template.render({'events': Event.objects.all()})  # no select_related('author')
+        self.assertIn('4 x at <unknown source>:2 (rendered from blog/tests.py:', str(raised.exception))
+        self.assertIn('FROM "auth_user"', str(raised.exception))
+
+    def test_repeated_query_in_python_names_the_frame(self):
+        with self.assertLogs('blog.querylog', 'WARNING') as logs:
+            with querylog.analyze(limit=3, raise_errors=False):
+                authors = []
+                for event in Event.objects.all():  # no select_related('author')
+                    authors.append(event.author)
+        self.assertEqual(len(authors), 4)
+        self.assertIn('4 x at blog/tests.py:', logs.output[0])
+        self.assertIn('in test_repeated_query_in_python_names_the_frame', logs.output[0])
+
+    def test_in_lists_of_any_length_are_one_shape(self):
+        self.assertEqual(querylog.shape('SELECT * FROM t WHERE id IN (%s, %s) AND n = 10'),
+                         querylog.shape("SELECT * FROM t WHERE id IN (%s) AND n = 'x'"))
+
+    @override_settings(SLOW_QUERY_MS=-1, QUERY_ANALYSIS_RAISE=False)
+    def test_middleware_logs_slow_queries(self):
+        with self.assertLogs('blog.querylog', 'WARNING') as logs:
+            self.client.get(reverse('blog-home'))
+        self.assertIn('GET /: slow query', logs.output[0])
+
+    @override_settings(REPEATED_QUERY_LIMIT=0, QUERY_ANALYSIS_RAISE=True)
+    def test_middleware_can_fail_the_request(self):
+        with self.assertRaises(querylog.RepeatedQueriesError):
+            self.client.get(reverse('blog-home'))
+
+
+class AttendeeCounterTests(TestCase):
+    """Event.attendee_count must match the RSVP table for every create/delete path"""
+
+    def setUp(self):
+        self.author = User.objects.create_user('author', password='pass')
+        self.user = User.objects.create_user('attendee', password='pass')
+        self.event = make_event(self.author)
+
+    def count(self):
+        self.event.refresh_from_db()
+        return self.event.attendee_count
+
+    def test_toggle_view_keeps_counter_exact(self):
+        self.client.login(username='attendee', password='pass')
+        url = reverse('toggle-rsvp', args=[self.event.pk])
+        response = self.client.post(url, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(response.json(), {'is_rsvpd': True, 'rsvp_count': 1})
+        self.client.post(url)
+        self.assertEqual(self.count(), 0)
+
+    def test_cascade_delete_decrements(self):
+        RSVP.objects.create(user=self.user, event=self.event)
+        RSVP.objects.create(user=self.author, event=self.event)
+        self.assertEqual(self.count(), 2)
+        self.user.delete()
+        self.assertEqual(self.count(), 1)
+
+    def test_recount_command_repairs_drift(self):
+        RSVP.objects.create(user=self.user, event=self.event)
+        Event.objects.filter(pk=self.event.pk).update(attendee_count=7)
+        out = StringIO()
+        call_command('recount_rsvps', stdout=out)
+        self.assertIn('Repaired 1 event(s)', out.getvalue())
+        self.assertEqual(self.count(), 1)
+
+
+class RSVPServiceTests(TestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user('author', password='pass')
+        self.user = User.objects.create_user('attendee', password='pass')
+        self.event = make_event(self.author)
+        self.url = reverse('rsvp-api', args=[self.event.pk])
+
+    def test_toggle_returns_state_and_count(self):
+        self.assertEqual(services.toggle_rsvp(self.user, self.event.pk), (True, 1))
+        self.assertEqual(services.toggle_rsvp(self.user, self.event.pk), (False, 0))
+
+    def test_put_and_delete_are_idempotent(self):
+        self.client.login(username='attendee', password='pass')
+        for _ in range(2):
+            response = self.client.put(self.url)
+            self.assertEqual(response.json(), {'is_rsvpd': True, 'rsvp_count': 1})
+        for _ in range(2):
+            response = self.client.delete(self.url)
+            self.assertEqual(response.json(), {'is_rsvpd': False, 'rsvp_count': 0})
+        self.assertEqual(self.client.get(self.url).json(), {'is_rsvpd': False, 'rsvp_count': 0})
+
+    def test_api_requires_login_and_existing_event(self):
+        self.assertEqual(self.client.put(self.url).status_code, 401)
+        self.client.login(username='attendee', password='pass')
+        self.assertEqual(self.client.put(reverse('rsvp-api', args=[9999])).status_code, 404)
+
+
+class DatabaseProfileTests(SimpleTestCase):
+    """The DATABASES setting each SPOTLIGHT_DB_PROFILE builds, see django_project/db_profiles.py"""
+
+    BASE_DIR = Path('/srv/spotlight')
+
+    def settings_for(self, profile, **env):
+        """database_settings() with only the given SPOTLIGHT_DB_* variables set"""
+        environ = {key: value for key, value in os.environ.items() if not key.startswith('SPOTLIGHT_DB_')}
+        environ.update({f'SPOTLIGHT_DB_{key}': value for key, value in env.items()})
+        with mock.patch.dict(os.environ, environ, clear=True):
+            return database_settings(self.BASE_DIR, profile)['default']
+
+    def test_dev_is_the_sqlite_file_without_pragmas(self):
+        database = self.settings_for('dev')
+        self.assertEqual(database['NAME'], self.BASE_DIR / 'db.sqlite3')
+        # no tuning pragmas, but writes still queue for the lock like the tuned profile's
+        self.assertEqual(database['OPTIONS'], {'transaction_mode': 'IMMEDIATE', 'timeout': 20})
+        self.assertEqual((database['CONN_MAX_AGE'], database['CONN_HEALTH_CHECKS']), (0, False))
+
+    def test_profile_comes_from_the_environment(self):
+        with mock.patch.dict(os.environ, {'SPOTLIGHT_DB_PROFILE': 'sqlite'}):
+            database = database_settings(self.BASE_DIR)['default']
+        self.assertIn('init_command', database['OPTIONS'])
+
+    def test_tuned_sqlite(self):
+        database = self.settings_for('sqlite', NAME='/tmp/other.sqlite3', CONN_MAX_AGE='30')
+        self.assertEqual(database['NAME'], '/tmp/other.sqlite3')
+        self.assertEqual(database['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+        pragmas = database['OPTIONS']['init_command'].split(';')
+        self.assertIn('PRAGMA journal_mode=WAL', pragmas)
+        self.assertIn('PRAGMA busy_timeout=20000', pragmas)
+        self.assertEqual((database['CONN_MAX_AGE'], database['CONN_HEALTH_CHECKS']), (30, True))
+
+    def test_postgres_defaults_to_a_pool(self):
+        database = self.settings_for('postgres', NAME='events', HOST='db', POOL_MAX='20')
+        self.assertEqual(database['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual((database['NAME'], database['USER'], database['HOST'], database['PORT']),
+                         ('events', 'spotlight', 'db', '5432'))
+        self.assertEqual(database['OPTIONS'], {'pool': {'min_size': 2, 'max_size': 20}})
+        self.assertEqual(database['CONN_MAX_AGE'], 0)  # Django refuses persistent connections with a pool
+
+    def test_postgres_without_a_pool(self):
+        database = self.settings_for('postgres', POOL='0', CONN_MAX_AGE='60')
+        self.assertEqual(database['OPTIONS'], {})
+        self.assertEqual(database['CONN_MAX_AGE'], 60)
+
+    def test_unknown_profile(self):
+        with self.assertRaisesMessage(ValueError, "Unknown SPOTLIGHT_DB_PROFILE 'mysql'"):
+            self.settings_for('mysql')
+
+
+class RSVPConcurrencyTests(TransactionTestCase):
+    """Hammer one event from many threads, no request may fail and the count must be exact"""
+
+    THREADS = 8
+    USERS = 16
+
+    def test_concurrent_puts_and_toggles(self):
+        author = User.objects.create_user('author', password='pass')
+        users = [User.objects.create_user(f'user{i}', password='pass') for i in range(self.USERS)]
+        event = make_event(author)
+        statuses = []
+
+        def hammer(user):
+            client = Client()
+            client.force_login(user)
+            try:
+                put_url = reverse('rsvp-api', args=[event.pk])
+                toggle_url = reverse('toggle-rsvp', args=[event.pk])
+                # two PUTs and an even number of toggles, every user ends up attending
+                statuses.append(client.put(put_url).status_code)
+                for _ in range(2):
+                    statuses.append(client.post(toggle_url, HTTP_X_REQUESTED_WITH='XMLHttpRequest').status_code)
+                statuses.append(client.put(put_url).status_code)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.THREADS) as pool:
+            list(pool.map(hammer, users))
+
+        self.assertEqual(set(statuses), {200})
+        event.refresh_from_db()
+        self.assertEqual(RSVP.objects.filter(event=event).count(), self.USERS)
+        self.assertEqual(event.attendee_count, self.USERS)
+
+
+class LoadTestTests(TransactionTestCase):
+    """seed_data and the loadtest driver, whose threads need the seeded rows committed"""
+
+    def test_seed_then_load_test_writes_json(self):
+        feed_version = get_version(FEED_SCOPE)
+        call_command('seed_data', users=20, events=30, rsvps=100, stdout=StringIO())
+        self.assertEqual((User.objects.count(), Event.objects.count(), RSVP.objects.count()), (20, 30, 100))
+        # what the skipped signals would have done
+        self.assertEqual(ChangeLog.objects.filter(kind=ChangeLog.EVENT).count(), 30)
+        self.assertEqual(ChangeLog.objects.filter(kind=ChangeLog.RSVP).count(), 100)
+        self.assertNotEqual(get_version(FEED_SCOPE), feed_version)
+        self.assertFalse(Event.objects.with_actual_rsvp_count().exclude(attendee_count=F('actual_rsvps')).exists())
+        self.assertEqual(User.objects.filter(profile__isnull=True).count(), 0)
+
+        path = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), 'results.json')
+        call_command('loadtest', threads=2, seconds=0.5, warmup=0, logins=2, json_path=path, stdout=StringIO())
+        with open(path) as f:
+            result = json.load(f)
+        self.assertEqual(set(result['endpoints']), {'blog-home', 'event-detail', 'user-events', 'my-events', 'toggle-rsvp'})
+        self.assertGreater(result['total']['requests'], 0)
+        self.assertEqual(result['total']['errors'], 0)
+        # a run is no regression against itself
+        self.assertEqual(regressions(result, result, 0), [])
+
+    def test_regressions_flag_slower_runs_and_new_queries(self):
+        def run(p95, rps, queries):
+            endpoint = {'requests': 10, 'errors': 0, 'throughput_rps': rps, 'latency': {'p95_ms': p95}, 'queries': {'max': queries}}
+            return {'endpoints': {'blog-home': endpoint}}
+
+        self.assertEqual(regressions(run(10, 100, 3), run(11, 90, 3), 0.2), [])
+        self.assertEqual(regressions(run(10, 100, 3), run(13, 100, 4), 0.2), [
+            'blog-home: p95 13 ms, was 10 ms', 'blog-home: up to 4 queries per request, was 3'])
+
+
+class EventImportTests(TestCase):
+
+    CSV = (
+        'title,description,event_date,event_time,location\r\n'
+        'Welcome Week,"Games, food and music",2025-08-25,18:00,Quad\r\n'
+        'Broken,No date,,18:00,Quad\r\n'
+        'Career Fair,Bring a resume,2025-09-10,10:30,Ballroom\r\n'
+    )
+    ICS = (
+        'BEGIN:VCALENDAR\r\nVERSION:2.0\r\n'
+        'BEGIN:VEVENT\r\nSUMMARY:Hackathon\\, day one\r\nDTSTART;TZID=America/Chicago:20251004T090000\r\n'
+        'LOCATION:Library\r\nDESCRIPTION:Teams of four\\nbring a\r\n  laptop\r\nEND:VEVENT\r\n'
+        'BEGIN:VEVENT\r\nSUMMARY:Homecoming\r\nDTSTART;VALUE=DATE:20251018\r\nLOCATION:Stadium\r\nDESCRIPTION:Parade\r\nEND:VEVENT\r\n'
+        'END:VCALENDAR\r\n'
+    )
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user('org', password='pass')
+        self.client.login(username='org', password='pass')
+
+    def upload(self, name, content):
+        return self.client.post(reverse('event-import'), {'file': SimpleUploadedFile(name, content.encode())})
+
+    def test_csv_rows_are_created_and_bad_rows_reported_by_line(self):
+        response = self.upload('fall.csv', self.CSV)
+        report = response.context['report']
+        self.assertEqual((report.created, report.failed), (2, 1))
+        self.assertEqual(report.errors[0].line, 3)
+        self.assertContains(response, 'Line 3: event_date is required')
+        career_fair = Event.objects.get(title='Career Fair')
+        self.assertEqual((career_fair.author, career_fair.event_time), (self.author, time(10, 30)))
+
+    def test_ics_events_are_unfolded_and_unescaped(self):
+        self.upload('fall.ics', self.ICS)
+        hackathon = Event.objects.get(title='Hackathon, day one')
+        self.assertEqual(hackathon.description, 'Teams of four\nbring a laptop')
+        # 9:00 in Chicago is 14:00 in TIME_ZONE (UTC)
+        self.assertEqual((hackathon.event_date, hackathon.event_time), (date(2025, 10, 4), time(14, 0)))
+        self.assertEqual(Event.objects.get(title='Homecoming').event_time, time(0, 0))
+
+    @override_settings(TIME_ZONE='America/Chicago')
+    def test_ics_start_times_are_moved_to_the_time_zone(self):
+        def start(line):
+            rows = read_ics(StringIO(f'BEGIN:VEVENT\r\n{line}\r\nEND:VEVENT\r\n'))
+            return [(row['event_date'], row['event_time']) for _, row in rows][0]
+
+        self.assertEqual(start('DTSTART:20251004T020000Z'), ('2025-10-03', '21:00'))
+        self.assertEqual(start('DTSTART;TZID="America/New_York":20251004T090000'), ('2025-10-04', '08:00'))
+        # floating times and zones that aren't IANA names are kept as written
+        self.assertEqual(start('DTSTART:20251004T090000'), ('2025-10-04', '09:00'))
+        self.assertEqual(start('DTSTART;TZID=Central Standard Time:20251004T090000'), ('2025-10-04', '09:00'))
+
+    def test_imported_events_are_in_the_sync_log(self):
+        other = make_event(User.objects.create_user('other', password='pass'))
+        ChangeLog.objects.all().delete()
+        self.upload('fall.csv', self.CSV)
+        imported = set(Event.objects.exclude(pk=other.pk).values_list('pk', flat=True))
+        self.assertEqual(len(imported), 2)
+        self.assertEqual(set(ChangeLog.objects.values_list('event_id', flat=True)), imported)
+
+    def test_import_invalidates_the_cached_feed(self):
+        self.client.logout()
+        self.client.get(reverse('blog-home'))
+        self.client.login(username='org', password='pass')
+        self.upload('fall.csv', self.CSV)
+        self.client.logout()
+        response = self.client.get(reverse('blog-home'))
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertContains(response, 'Career Fair')
+
+    def test_csv_without_the_expected_header_is_rejected(self):
+        response = self.upload('fall.csv', 'name,date\r\nParty,2025-09-01\r\n')
+        self.assertFormError(response.context['form'], 'file', 'CSV header is missing: title, description, event_date, event_time, location')
+        self.assertFalse(Event.objects.exists())
+
+
+class ExportFeedTests(TestCase):
+    """The .ics and .csv exports stream their rows and answer polls that have nothing new with a 304"""
+
+    def setUp(self):
+        self.author = User.objects.create_user('org', password='pass', email='org@utrgv.edu')
+        self.student = User.objects.create_user('student', password='pass', first_name='Ana', email='ana@utrgv.edu')
+        self.event = make_event(self.author, title='Movie Night, outdoors', description='Bring a blanket\nand snacks')
+        self.other = make_event(self.author, title='Career Fair', event_date=date(2025, 9, 10))
+
+    def body(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_site_feed_is_escaped_icalendar(self):
+        response = self.client.get(reverse('events-ics'))
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        text = self.body(response)
+        self.assertEqual(text.count('BEGIN:VEVENT'), 2)
+        self.assertIn('SUMMARY:Movie Night\\, outdoors\r\n', text)
+        self.assertIn('DESCRIPTION:Bring a blanket\\nand snacks\r\n', text)
+        self.assertIn('DTSTART:20250901T180000\r\n', text)
+        self.assertTrue(all(len(line.encode()) <= 75 for line in text.split('\r\n')))
+
+    def test_exported_calendar_imports_back(self):
+        make_event(self.author, title='Long ' * 40, description='ñ' * 100)
+        text = self.body(self.client.get(reverse('events-ics')))
+        rows = [row for _, row in read_ics(StringIO(text))]
+        self.assertEqual(rows[0]['title'], 'Movie Night, outdoors')
+        self.assertIn('ñ' * 100, [row['description'] for row in rows])
+        self.assertIn(('Long ' * 40), [row['title'] for row in rows])
+
+    def test_unchanged_feed_is_a_304_from_one_query(self):
+        response = self.client.get(reverse('events-ics'))
+        etag = response['ETag']
+        self.assertTrue(response.has_header('Last-Modified'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('events-ics'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(queries), 1)
+
+    def test_edits_and_deletes_change_the_etag(self):
+        etag = self.client.get(reverse('events-ics'))['ETag']
+        self.other.delete()
+        response = self.client.get(reverse('events-ics'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.event.location = 'Library'
+        self.event.save()
+        self.assertNotEqual(self.client.get(reverse('events-ics'))['ETag'], etag)
+
+    def test_personal_feed_uses_a_signed_token(self):
+        RSVP.objects.create(user=self.student, event=self.event)
+        self.client.login(username='student', password='pass')
+        feed_url = self.client.get(reverse('my-events')).context['feed_url']
+        self.client.logout()
+        response = self.client.get(feed_url)
+        text = self.body(response)
+        self.assertIn('Movie Night', text)
+        self.assertNotIn('Career Fair', text)
+        token = feed_url.rsplit('/', 1)[1][:-len('.ics')]
+        forged = reverse('my-events-ics', args=[str(self.author.pk) + token[token.index(':'):]])
+        self.assertEqual(self.client.get(forged).status_code, 404)
+
+    def test_personal_feed_etag_changes_when_an_rsvp_is_cancelled(self):
+        rsvp = RSVP.objects.create(user=self.student, event=self.event)
+        RSVP.objects.create(user=self.student, event=self.other)
+        url = reverse('my-events-ics', args=[feeds.feed_token(self.student)])
+        etag = self.client.get(url)['ETag']
+        rsvp.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_rsvp_csv_is_for_the_author_only(self):
+        RSVP.objects.create(user=self.student, event=self.event)
+        url = reverse('event-rsvps-csv', args=[self.event.pk])
+        self.client.login(username='student', password='pass')
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.login(username='org', password='pass')
+        response = self.client.get(url)
+        lines = self.body(response).splitlines()
+        self.assertEqual(lines[0], 'username,first_name,last_name,email,date_rsvpd')
+        self.assertTrue(lines[1].startswith('student,Ana,,ana@utrgv.edu,'))
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_rsvp_csv_has_the_attendees_current_details(self):
+        RSVP.objects.create(user=self.student, event=self.event)
+        url = reverse('event-rsvps-csv', args=[self.event.pk])
+        self.client.login(username='org', password='pass')
+        self.body(self.client.get(url))
+        self.student.email = 'ana.garza@utrgv.edu'
+        self.student.save()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ana.garza@utrgv.edu', self.body(response))
+
+
+class SearchTests(TestCase):
+    """Search goes through the FTS5 index, which triggers keep in step with blog_event"""
+
+    def setUp(self):
+        self.author = User.objects.create_user('org', password='pass')
+
+    def search(self, q, **params):
+        return self.client.get(reverse('event-search'), {'q': q, **params}).context['page_obj']
+
+    def titles(self, q):
+        return [event.title for event in self.search(q).events]
+
+    def test_title_matches_rank_above_description_matches(self):
+        make_event(self.author, title='Study Hall', description='Bring your robotics homework')
+        make_event(self.author, title='Robotics Club', description='Build night')
+        self.assertEqual(self.titles('robotics'), ['Robotics Club', 'Study Hall'])
+
+    def test_every_match_is_ranked_and_paged(self):
+        make_event(self.author, title='Robotics Club', description='Build night')
+        Event.objects.bulk_create([Event(title=f'Study Hall {i}', description='robotics homework', event_date=date(2025, 9, 1),
+                                         event_time=time(18, 0), location='Library', author=self.author) for i in range(25)])
+        # the oldest event is the best match, however many newer ones match too
+        self.assertEqual(self.titles('robotics')[0], 'Robotics Club')
+        pages = [self.search('robotics', page=n) for n in (1, 2, 3)]
+        self.assertEqual([len(page.events) for page in pages], [10, 10, 6])
+        self.assertEqual((pages[1].has_next, pages[2].has_next), (True, False))
+
+    def test_last_word_is_a_prefix_and_accents_are_ignored(self):
+        make_event(self.author, title='Find a Vaquero Mixer', location='Café Central')
+        self.assertEqual(self.titles('vaq'), ['Find a Vaquero Mixer'])
+        self.assertEqual(self.titles('cafe central'), ['Find a Vaquero Mixer'])
+        self.assertEqual(self.titles('mixer vaq'), ['Find a Vaquero Mixer'])
+        self.assertEqual(self.titles('mixer zzz'), [])
+
+    def test_index_follows_updates_deletes_and_imports(self):
+        event = make_event(self.author, title='Chess Night')
+        event.title = 'Checkers Night'
+        event.save()
+        self.assertEqual(self.titles('chess'), [])
+        self.assertEqual(self.titles('checkers'), ['Checkers Night'])
+        event.delete()
+        self.assertEqual(self.titles('checkers'), [])
+        import_events([(2, {'title': 'Imported Gala', 'description': 'd', 'event_date': '2025-10-01',
+                            'event_time': '19:00', 'location': 'Ballroom'})], self.author)
+        self.assertEqual(self.titles('gala'), ['Imported Gala'])
+
+    def test_matches_are_highlighted_and_escaped(self):
+        make_event(self.author, title='<b>Robotics</b> & more')
+        response = self.client.get(reverse('event-search'), {'q': 'robotics'})
+        self.assertContains(response, '&lt;b&gt;<mark>Robotics</mark>&lt;/b&gt; &amp; more')
+
+    def test_operators_and_quotes_are_searched_as_words(self):
+        make_event(self.author, title='Movie Night')
+        for q in ['movie AND', 'NEAR(movie', '"movie', 'movie*', '-movie', '']:
+            self.assertIsNotNone(self.search(q))
+        self.assertEqual(self.titles('"movie'), ['Movie Night'])
+
+    def test_results_are_paged(self):
+        for i in range(12):
+            make_event(self.author, title=f'Workshop {i}')
+        first = self.search('workshop')
+        self.assertEqual((len(first.events), first.has_next), (10, True))
+        second = self.search('workshop', page=2)
+        self.assertEqual((len(second.events), second.has_next, second.has_previous), (2, False, True))
+
+    def test_search_runs_a_fixed_number_of_queries(self):
+        for i in range(8):
+            make_event(self.author, title=f'Workshop {i}')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('event-search'), {'q': 'workshop'})
+        # index lookup + the events with their authors and profiles
+        self.assertEqual(len(queries), 2)
+
+
+DESKTOP_MIGRATIONS = settings.BASE_DIR.parent / 'DesktopApp' / 'migrations.py'
+
+
+@skipUnless(DESKTOP_MIGRATIONS.exists(), 'needs the desktop app next to the web app')
+class DesktopSyncTests(TestCase):
+    """blog/sync.py against a scratch Spotlight.db built by the desktop app's own migrations"""
+
+    def setUp(self):
+        spec = importlib.util.spec_from_file_location('desktop_migrations', DESKTOP_MIGRATIONS)
+        desktop_migrations = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(desktop_migrations)
+        self.path = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), 'Spotlight.db')
+        self.desktop = sqlite3.connect(self.path)
+        self.addCleanup(self.desktop.close)
+        for version, migration in enumerate(desktop_migrations.MIGRATIONS, 1):
+            migration(self.desktop)
+            self.desktop.execute(f'PRAGMA user_version = {version}')
+        self.desktop.execute("INSERT INTO studentuser (first_name, last_name, email, major) VALUES ('Ana', 'Flores', 'ana@utrgv.edu', 'CS')")
+        self.desktop_event = self.desktop.execute(
+            "INSERT INTO events (name, date, location, description, organization_email) "
+            "VALUES ('Desk Meetup', '2025-09-04', 'Union', 'From the desktop', 'club@utrgv.edu')").lastrowid
+        self.desktop.commit()
+        self.author = User.objects.create_user('org', 'org@utrgv.edu', 'pass')
+        self.web_event = make_event(self.author, title='Web Mixer')
+
+    def sync(self):
+        return sync.sync(self.path)
+
+    def desktop_row(self, sql, *params):
+        return self.desktop.execute(sql, params).fetchone()
+
+    def test_first_sync_copies_both_ways_and_the_next_is_a_no_op(self):
+        self.sync()
+        pulled = Event.objects.get(desktop_id=self.desktop_event)
+        self.assertEqual((pulled.title, pulled.event_date, pulled.event_time), ('Desk Meetup', date(2025, 9, 4), sync.DEFAULT_TIME))
+        self.assertEqual(pulled.author.email, 'club@utrgv.edu')
+        self.assertFalse(pulled.author.has_usable_password())
+        pushed = self.desktop_row('SELECT name, date, organization_email FROM events WHERE web_id = ?', self.web_event.pk)
+        self.assertEqual(pushed, ('Web Mixer', '2025-09-01', 'org@utrgv.edu'))
+        self.web_event.refresh_from_db()
+        self.assertIsNotNone(self.web_event.desktop_id)
+        # the push's own writes to the desktop are not read back as desktop changes
+        self.assertEqual(self.sync().summary(), 'web: up to date\ndesktop: up to date')
+
+    def test_later_changes_are_sent_as_deltas(self):
+        self.sync()
+        self.sync()
+        self.desktop.execute("UPDATE events SET location = 'Library' WHERE id = ?", (self.desktop_event,))
+        self.desktop.commit()
+        self.web_event.location = 'Ballroom'
+        self.web_event.save()
+        report = self.sync()
+        self.assertEqual((report.counts['web']['updated'], report.counts['desktop']['updated']), (1, 1))
+        self.assertEqual(Event.objects.get(desktop_id=self.desktop_event).location, 'Library')
+        self.assertEqual(self.desktop_row('SELECT location FROM events WHERE web_id = ?', self.web_event.pk), ('Ballroom',))
+
+    def test_the_newer_side_wins_a_conflict(self):
+        self.sync()
+        self.sync()
+        self.web_event.title = 'Edited on the web'
+        self.web_event.save()
+        self.desktop.execute("UPDATE events SET name = 'Edited on the desktop', "
+                             "description = description WHERE web_id = ?", (self.web_event.pk,))
+        # stamp the desktop edit a minute later so the order doesn't depend on the clock resolution
+        self.desktop.execute("UPDATE event_changes SET changed_at = strftime('%Y-%m-%d %H:%M:%f', 'now', '+60 seconds') "
+                             "WHERE seq = (SELECT MAX(seq) FROM event_changes)")
+        self.desktop.commit()
+        self.assertEqual(self.sync().counts['desktop']['conflicts_lost'], 0)
+        self.sync()
+        self.web_event.refresh_from_db()
+        self.assertEqual(self.web_event.title, 'Edited on the desktop')
+        self.assertEqual(self.desktop_row('SELECT name FROM events WHERE web_id = ?', self.web_event.pk), ('Edited on the desktop',))
+
+    def test_rsvps_and_deletes_follow(self):
+        self.desktop.execute("INSERT INTO rsvps (event_id, user_email, find_vaquero) VALUES (?, 'ana@utrgv.edu', 0)", (self.desktop_event,))
+        self.desktop.commit()
+        self.sync()
+        pulled = Event.objects.get(desktop_id=self.desktop_event)
+        self.assertEqual((pulled.attendee_count, RSVP.objects.get(event=pulled).user.first_name), (1, 'Ana'))
+
+        student = User.objects.create_user('student', 'student@utrgv.edu', 'pass')
+        RSVP.objects.create(user=student, event=pulled)
+        self.web_event.delete()
+        self.sync()
+        self.assertEqual(self.desktop_row('SELECT COUNT(*) FROM rsvps WHERE event_id = ?', self.desktop_event), (2,))
+        self.assertEqual(self.desktop_row('SELECT COUNT(*) FROM events WHERE name = ?', 'Web Mixer'), (0,))
+
+        self.desktop.execute("DELETE FROM rsvps WHERE user_email = 'ana@utrgv.edu'")
+        self.desktop.commit()
+        self.sync()
+        pulled.refresh_from_db()
+        self.assertEqual((pulled.attendee_count, list(pulled.rsvp_set.values_list('user__username', flat=True))), (1, ['student']))
+
+    def test_pulled_deletes_are_not_logged_or_echoed(self):
+        self.desktop.execute("INSERT INTO rsvps (event_id, user_email, find_vaquero) VALUES (?, 'ana@utrgv.edu', 0)", (self.desktop_event,))
+        self.desktop.commit()
+        self.sync()
+        pulled = Event.objects.get(desktop_id=self.desktop_event)
+        changelog = ChangeLog._meta.db_table
+
+        self.desktop.execute('DELETE FROM rsvps')
+        self.desktop.commit()
+        with CaptureQueriesContext(connection) as queries:  # counting rows won't do, the push prunes the log
+            self.assertEqual(self.sync().counts['web']['rsvps_removed'], 1)
+            RSVP.objects.bulk_create([RSVP(event=pulled, user=self.author)])  # not logged, stays on the web only
+            self.desktop.execute('DELETE FROM events WHERE id = ?', (self.desktop_event,))
+            self.desktop.commit()
+            self.assertEqual(self.sync().counts['web']['deleted'], 1)
+        self.assertFalse(Event.objects.filter(pk=pulled.pk).exists())
+        self.assertFalse(RSVP.objects.filter(event_id=pulled.pk).exists())
+        self.assertFalse([q['sql'] for q in queries if q['sql'].startswith(f'INSERT INTO "{changelog}"')])
+        self.assertEqual(self.sync().summary(), 'web: up to date\ndesktop: up to date')
+
+    def test_the_change_log_is_pruned_once_every_desktop_has_it(self):
+        self.sync()
+        self.assertFalse(ChangeLog.objects.exists())
+        # a second desktop that hasn't been sent anything yet holds the pruning back
+        other = SyncState.objects.create(peer='other.db', push_seq=None)
+        self.web_event.location = 'Ballroom'
+        self.web_event.save()
+        self.sync()
+        self.assertEqual(ChangeLog.objects.count(), 1)
+        other.push_seq = ChangeLog.objects.get().pk - 1
+        other.save()
+        self.assertEqual(sync.prune_change_log(), 0)
+        other.push_seq += 1
+        other.save()
+        self.assertEqual(sync.prune_change_log(), 1)
+
+    def test_desktop_database_needs_the_sync_tables(self):
+        self.desktop.execute('PRAGMA user_version = 5')
+        self.desktop.commit()
+        with self.assertRaisesMessage(sync.SyncError, 'schema version 5'):
+            self.sync()
+
+    def test_command_prints_the_report(self):
+        out = StringIO()
+        call_command('sync_desktop', self.path, stdout=out)
+        self.assertIn('web: 1 created', out.getvalue())
@@ -8,10 +8,18 @@ urlpatterns = [
     path('user/<str:username>/', UserEventListView.as_view(), name='user-events'),
     path('event/<int:pk>/', EventDetailView.as_view(), name='event-detail'),
     path('event/new/', EventCreateView.as_view(), name='event-create'),
+    path('event/import/', views.EventImportView.as_view(), name='event-import'),
     path('event/<int:pk>/update/', EventUpdateView.as_view(), name='event-update'),
     path('event/<int:pk>/delete/', EventDeleteView.as_view(), name='event-delete'),
+    path('event/<int:pk>/rsvps.csv', views.event_rsvps_csv, name='event-rsvps-csv'),
     path('event/<int:event_id>/rsvp/', toggle_rsvp, name='toggle-rsvp'),
+    path('api/event/<int:event_id>/rsvp/', views.rsvp_api, name='rsvp-api'),
+    path('search/', views.event_search, name='event-search'),
     path('my-events/', my_events, name='my-events'),
+    path('my-events/<str:token>.ics', views.my_events_ics, name='my-events-ics'),
+    path('events.ics', views.events_ics, name='events-ics'),
+    path('stats/cache/', views.cache_stats, name='cache-stats'),
+    path('stats/requests/', views.request_stats, name='request-stats'),
     path('Events/', views.about, name='blog-Events'),
 ]
 
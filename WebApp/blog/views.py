@@ -2,17 +2,29 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, JsonResponse
+from django.urls import reverse
+from django.views.decorators.http import require_GET, require_http_methods
 from django.views.generic import (
     ListView, 
     DetailView, 
     CreateView,
     UpdateView,
-    DeleteView
+    DeleteView,
+    FormView
 )
 from .models import Event, RSVP
-from .forms import EventForm
+from .forms import EventForm, EventImportForm
+from .pagination import CursorPaginationMixin
+from .cache import AnonymousPageCacheMixin, attach_card_versions, event_scope, stats
+from . import instrumentation
+from . import services
+from .importer import import_file
+from . import feeds
+from .search import search_events
 
 
 ''' 
@@ -40,14 +52,22 @@ def home(request):
     }
     return render(request, 'blog/home.html', context)
 
-class EventListView(ListView):
+class EventListView(AnonymousPageCacheMixin, CursorPaginationMixin, ListView):
     model = Event
     template_name = 'blog/home.html'
     context_object_name = 'events'
-    ordering = ['-date_posted']
+    ordering = ['-date_posted', '-id']
     paginate_by = 5
 
-class UserEventListView(ListView):
+    def get_queryset(self): # annotated feed so the cards don't query per event
+        return Event.objects.for_feed(self.request.user).order_by(*self.ordering)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        attach_card_versions(context['events']) # keys the cached event cards
+        return context
+
+class UserEventListView(AnonymousPageCacheMixin, CursorPaginationMixin, ListView):
     model = Event
     template_name = 'blog/user_post.html'
     context_object_name = 'events'
@@ -55,11 +75,19 @@ class UserEventListView(ListView):
 
     def get_queryset(self): # this is the query set for the user event list view
         user = get_object_or_404(User, username=self.kwargs.get('username'))
-        return Event.objects.filter(author=user).order_by('-date_posted')
+        return Event.objects.for_feed(self.request.user).filter(author=user).order_by('-date_posted', '-id')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        attach_card_versions(context['events'])
+        return context
 
-class EventDetailView(DetailView):
+class EventDetailView(AnonymousPageCacheMixin, DetailView):
     model = Event
     template_name = 'blog/post_detail.html'
+
+    def get_page_cache_scope(self): # only this event's changes invalidate its page
+        return event_scope(self.kwargs['pk'])
     
     def get_context_data(self, **kwargs): # this is the context data for the event detail view
         context = super().get_context_data(**kwargs)
@@ -76,6 +104,23 @@ class EventCreateView(LoginRequiredMixin, CreateView): # this is the view for th
         form.instance.author = self.request.user
         return super().form_valid(form) #running the form on our parent class
     
+class EventImportView(LoginRequiredMixin, FormView): # bulk create events from a CSV or iCalendar file
+    form_class = EventImportForm
+    template_name = 'blog/event_import.html'
+
+    def form_valid(self, form):
+        upload = form.cleaned_data['file']
+        try:
+            report = import_file(upload.file, upload.name, self.request.user)
+        except ValueError as e: # unreadable file or a CSV without the right header
+            form.add_error('file', str(e))
+            return self.form_invalid(form)
+        if report.created:
+            messages.success(self.request, f'{report.created} event(s) imported.')
+        # show the report with a fresh form, errors are listed with their line numbers
+        return self.render_to_response(self.get_context_data(form=EventImportForm(), report=report))
+
+
 class EventUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView): # this is the view for the event update view
     model = Event
     form_class = EventForm
@@ -106,42 +151,97 @@ class EventDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView): # th
 def toggle_rsvp(request, event_id): # this is the view for the  rsvp view
     """Toggle RSVP status for an event"""
     event = get_object_or_404(Event, id=event_id)
-    user = request.user
-    
-    # Check if user already RSVP'd
-    rsvp, created = RSVP.objects.get_or_create(user=user, event=event)
-    
-    if not created:
-        # User already RSVP'd, so remove it
-        rsvp.delete()
-        messages.success(request, f'You have cancelled your RSVP to {event.title}')
-        is_rsvpd = False
-    else:
-        # User just RSVP'd
+    state = services.toggle_rsvp(request.user, event.id)
+
+    if state.is_rsvpd:
         messages.success(request, f'You have RSVP\'d to {event.title}!')
-        is_rsvpd = True
+    else:
+        messages.success(request, f'You have cancelled your RSVP to {event.title}')
     
     # Return JSON response for AJAX requests
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-        return JsonResponse({
-            'is_rsvpd': is_rsvpd,
-            'rsvp_count': event.rsvp_count()
-        })
+        return JsonResponse(state._asdict())
     
     return redirect('event-detail', pk=event_id)
 
+@require_http_methods(['GET', 'PUT', 'DELETE'])
+def rsvp_api(request, event_id): # this is the json api for rsvps, PUT attends and DELETE cancels
+    """Idempotent RSVP endpoint: repeating a PUT or DELETE doesn't change the result"""
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+    event = Event.objects.for_feed(request.user).filter(pk=event_id).first()
+    if event is None:
+        return JsonResponse({'error': 'Event not found'}, status=404)
+
+    if request.method == 'GET':
+        state = services.RSVPState(event.user_rsvpd, event.num_rsvps)
+    else:
+        state = services.set_rsvp(request.user, event_id, attending=request.method == 'PUT')
+    return JsonResponse(state._asdict())
+
 @login_required
 def my_events(request): # this is the view for the my events view
     """Show events that the current user has RSVP'd to"""
-    user_rsvps = RSVP.objects.filter(user=request.user).select_related('event').order_by('event__event_date')
-    events = [rsvp.event for rsvp in user_rsvps]
+    events = Event.objects.rsvpd_by(request.user).order_by('event_date')
     
     context = {
         'events': events,
-        'title': 'My Events'
+        'title': 'My Events',
+        'feed_url': request.build_absolute_uri(reverse('my-events-ics', args=[feeds.feed_token(request.user)])),
     }
     return render(request, 'blog/my_events.html', context)
 
+@require_GET
+def events_ics(request): # site wide calendar feed, streamed
+    events = Event.objects.all()
+    return feeds.conditional_stream(
+        request, feeds.events_validators(events),
+        lambda: feeds.ics_response(events, 'UTRGV Spotlight', request.get_host(), 'events.ics'),
+        cache_control='public, no-cache')
+
+@require_GET
+def my_events_ics(request, token): # the events a user RSVP'd to, the token in the url stands in for a login
+    user_id = feeds.user_id_from_token(token)
+    if user_id is None:
+        raise Http404('Unknown feed')
+    rsvps = RSVP.objects.filter(user_id=user_id)
+    return feeds.conditional_stream(
+        request, feeds.rsvps_validators(rsvps),
+        lambda: feeds.ics_response(feeds.events_for_user(user_id), 'My Spotlight Events', request.get_host(), 'my-events.ics'),
+        cache_control='private, no-cache')
+
+@login_required
+@require_GET
+def event_rsvps_csv(request, pk): # attendee list for the event's author
+    event = get_object_or_404(Event.objects.only('id', 'author_id'), pk=pk)
+    if event.author_id != request.user.id:
+        raise PermissionDenied
+    # no ETag here: the rows carry the attendees' names and emails, which the RSVP aggregate can't see change
+    response = feeds.rsvp_csv_response(event)
+    response.headers['Cache-Control'] = 'private, no-store'
+    return response
+
+def event_search(request): # full text search over title, description and location
+    query = request.GET.get('q', '').strip()
+    try:
+        page = int(request.GET.get('page', 1))
+    except ValueError:
+        page = 1
+    context = {
+        'query': query,
+        'page_obj': search_events(query, request.user, page),
+        'title': 'Search',
+    }
+    return render(request, 'blog/search.html', context)
+
+@staff_member_required
+def cache_stats(request): # hit/miss counters of the page and card caches in this process
+    return JsonResponse(stats.snapshot())
+
+@staff_member_required
+def request_stats(request): # latency histograms and db/template/cache totals per url name, see blog/instrumentation.py
+    return JsonResponse(instrumentation.stats.snapshot())
+
 def about(request): # this is the view for the about view
     return render(request, 'blog/Events.html', {'title': 'Events'})
 
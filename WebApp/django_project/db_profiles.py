@@ -0,0 +1,90 @@
+"""
+Database profiles picked with the SPOTLIGHT_DB_PROFILE environment variable.
+
+    dev       the SQLite file the project has always used, with the default
+              journal and one connection per request (default)
+    sqlite    SQLite tuned for concurrent use: WAL, synchronous=NORMAL, mmap
+              and persistent connections
+
+Both SQLite profiles begin transactions IMMEDIATE with a busy timeout, so
+concurrent writes queue instead of failing with "database is locked"; the
+test suite's concurrency tests run on dev and rely on it.
+    postgres  PostgreSQL, settings read from SPOTLIGHT_DB_* variables, with
+              psycopg's connection pool unless SPOTLIGHT_DB_POOL=0
+
+Switching profile only needs the environment, no code changes.
+"""
+import os
+
+BUSY_TIMEOUT_SECONDS = 20
+
+# run on every new SQLite connection, also used by the bench_db_contention command
+SQLITE_PRAGMAS = {
+    'dev': [],
+    'sqlite': [
+        'PRAGMA journal_mode=WAL',  # readers no longer block behind writers
+        'PRAGMA synchronous=NORMAL',  # safe with WAL, fsync on checkpoint instead of every commit
+        f'PRAGMA busy_timeout={BUSY_TIMEOUT_SECONDS * 1000}',
+        'PRAGMA mmap_size=268435456',  # 256MB
+        'PRAGMA temp_store=MEMORY',
+        'PRAGMA cache_size=-20000',  # 20MB page cache per connection
+    ],
+}
+
+
+def _env(name, default=None):
+    return os.environ.get(f'SPOTLIGHT_DB_{name}', default)
+
+
+def sqlite_database(base_dir, profile):
+    options = {
+        # every profile, dev included: take the write lock when a transaction starts so
+        # concurrent RSVPs wait for each other instead of failing with "database is locked"
+        'transaction_mode': 'IMMEDIATE',
+        'timeout': BUSY_TIMEOUT_SECONDS,
+    }
+    if SQLITE_PRAGMAS[profile]:
+        options['init_command'] = ';'.join(SQLITE_PRAGMAS[profile])
+    return {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': _env('NAME', base_dir / 'db.sqlite3'),
+        'OPTIONS': options,
+        'CONN_MAX_AGE': 0 if profile == 'dev' else int(_env('CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': profile != 'dev',
+        'TEST': {
+            'NAME': base_dir / 'test_db.sqlite3', # file based so the concurrency tests can share it across threads
+        },
+    }
+
+
+def postgres_database():
+    database = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': _env('NAME', 'spotlight'),
+        'USER': _env('USER', 'spotlight'),
+        'PASSWORD': _env('PASSWORD', ''),
+        'HOST': _env('HOST', 'localhost'),
+        'PORT': _env('PORT', '5432'),
+        'OPTIONS': {},
+        'CONN_HEALTH_CHECKS': True,
+    }
+    if _env('POOL', '1') == '1':
+        # psycopg[pool] keeps the connections open, CONN_MAX_AGE has to stay 0 with it
+        database['OPTIONS']['pool'] = {
+            'min_size': int(_env('POOL_MIN', 2)),
+            'max_size': int(_env('POOL_MAX', 10)),
+        }
+        database['CONN_MAX_AGE'] = 0
+    else:
+        database['CONN_MAX_AGE'] = int(_env('CONN_MAX_AGE', 600))
+    return database
+
+
+def database_settings(base_dir, profile=None):
+    """Build the DATABASES setting for the given (or configured) profile"""
+    profile = profile or os.environ.get('SPOTLIGHT_DB_PROFILE', 'dev')
+    if profile == 'postgres':
+        return {'default': postgres_database()}
+    if profile not in SQLITE_PRAGMAS:
+        raise ValueError(f'Unknown SPOTLIGHT_DB_PROFILE {profile!r}, expected dev, sqlite or postgres')
+    return {'default': sqlite_database(base_dir, profile)}
@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import sys
+from .db_profiles import database_settings
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -45,6 +47,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.instrumentation.InstrumentationMiddleware', # first, so it times everything below, see blog/instrumentation.py
+    'blog.querylog.QueryAnalysisMiddleware', # slow and repeated (N+1) queries, only when QUERY_ANALYSIS is on
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -58,7 +62,8 @@ ROOT_URLCONF = 'django_project.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'blog.instrumentation.TimedDjangoTemplates', # DjangoTemplates that reports its render time
+        'NAME': 'django', # the alias would otherwise come from the module name
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -77,12 +82,29 @@ WSGI_APPLICATION = 'django_project.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# the profile comes from SPOTLIGHT_DB_PROFILE (dev, sqlite or postgres), see db_profiles.py
+DATABASES = database_settings(BASE_DIR)
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# the backends count page/card cache hits and misses, see blog/cache.py
+
+if os.environ.get('SPOTLIGHT_CACHE') == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'blog.cache.StatsFileBasedCache',
+            'LOCATION': os.environ.get('SPOTLIGHT_CACHE_DIR', BASE_DIR / 'cache'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'blog.cache.StatsLocMemCache',
+            'LOCATION': 'spotlight',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
     }
-}
 
 
 # Password validation
@@ -123,6 +145,26 @@ STATIC_URL = 'static/'
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media') # this is the path to the media files 
 MEDIA_URL = '/media/' # this is the url to the media files
+PROFILE_IMAGES_ASYNC = True # resize uploaded profile pictures on a background thread, see users/images.py
+SERVER_TIMING_HEADER = True # send each request's db/template/cache timings back in a Server-Timing header
+
+# slow-query log and N+1 detector for development and staging, see blog/querylog.py
+TESTING = sys.argv[1:2] == ['test'] # DEBUG is still True here, the test runner turns it off later
+QUERY_ANALYSIS = DEBUG
+SLOW_QUERY_MS = None if TESTING else 100 # log queries slower than this, off in the tests where timings are noise
+REPEATED_QUERY_LIMIT = 5 # the same query more often than this in one request is reported as an N+1
+QUERY_ANALYSIS_RAISE = os.environ.get('SPOTLIGHT_QUERY_STRICT') == '1' # raise instead of logging, to fail the tests
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'stderr': {'class': 'logging.StreamHandler'}, # unlike Django's 'console' handler, also with DEBUG off
+    },
+    'loggers': {
+        'blog.querylog': {'handlers': ['stderr'], 'level': 'WARNING', 'propagate': False},
+    },
+}
 
 CRISPY_TEMPLATE_PACK = "bootstrap4"
 LOGIN_REDIRECT_URL = 'blog-home'
@@ -31,4 +31,6 @@ urlpatterns = [
 
 
 if settings.DEBUG:
+    # in production the web server serves /media/ itself, see users.views.profile_picture for its cache headers
+    urlpatterns += [path('media/profile_pics/<path:path>', user_views.profile_picture, name='profile-picture')]
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
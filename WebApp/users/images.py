@@ -0,0 +1,77 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# the sizes we generate for every uploaded profile picture, in pixels
+SIZES = {
+    'avatar': 40,
+    'card': 125,
+    'large': 300,
+}
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='profile-images')
+
+
+def variant_name(name, size):
+    """profile_pics/peony.jpg -> profile_pics/peony_125.jpg"""
+    root, ext = os.path.splitext(name)
+    return f'{root}_{SIZES[size]}{ext}'
+
+
+def resize(image_bytes, pixels, image_format):
+    img = Image.open(BytesIO(image_bytes))
+    img.thumbnail((pixels, pixels))
+    if image_format == 'JPEG' and img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+    out = BytesIO()
+    img.save(out, format=image_format)
+    return out.getvalue()
+
+
+def generate_variants(name, storage=default_storage):
+    """Write every size of the image next to it, returns {size: stored name}"""
+    with storage.open(name, 'rb') as f:
+        original = f.read()
+    image_format = Image.open(BytesIO(original)).format or 'PNG'
+
+    variants = {}
+    for size, pixels in SIZES.items():
+        target = variant_name(name, size)
+        if not getattr(storage, 'content_addressed', False) and storage.exists(target):
+            storage.delete(target) # regenerate in place rather than getting a _abc123 suffix
+        variants[size] = storage.save(target, ContentFile(resize(original, pixels, image_format)))
+    return variants
+
+
+def process_profile_image(profile_id, name):
+    """Generate the sizes for one profile and record them, unless the image changed again meanwhile"""
+    from .models import Profile # imported here, models imports this module
+    try:
+        variants = generate_variants(name, Profile._meta.get_field('image').storage)
+        Profile.objects.filter(pk=profile_id, image=name).update(image_sizes=variants)
+    except Exception:
+        # a broken upload shouldn't take the worker down, the profile keeps using the original
+        logger.exception('Could not process profile image %s', name)
+
+
+def _run_in_worker(profile_id, name):
+    close_old_connections() # worker threads get their own connection, don't keep stale ones around
+    try:
+        process_profile_image(profile_id, name)
+    finally:
+        close_old_connections()
+
+
+def schedule(profile_id, name):
+    """Queue the image for processing, or run it right away when PROFILE_IMAGES_ASYNC is off"""
+    if getattr(settings, 'PROFILE_IMAGES_ASYNC', True):
+        return _executor.submit(_run_in_worker, profile_id, name)
+    process_profile_image(profile_id, name)
@@ -0,0 +1,33 @@
+import os
+from django.core.management.base import BaseCommand
+from users.models import Profile
+from users.storage import digest_from_name
+
+
+class Command(BaseCommand):
+    help = 'Delete content addressed profile pictures that no profile points at any more'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only list the files that would be deleted')
+
+    def handle(self, *args, **options):
+        storage = Profile._meta.get_field('image').storage
+        referenced = set()
+        for image, sizes in Profile.objects.values_list('image', 'image_sizes').iterator():
+            referenced.add(image)
+            referenced.update((sizes or {}).values())
+
+        removed = 0
+        root = storage.path('profile_pics')
+        for directory, _, files in os.walk(root):
+            for filename in files:
+                name = os.path.relpath(os.path.join(directory, filename), storage.location).replace(os.sep, '/')
+                if digest_from_name(name) is None or name in referenced: # never touch legacy uploads
+                    continue
+                removed += 1
+                self.stdout.write(name)
+                if not options['dry_run']:
+                    os.remove(storage.path(name))
+
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {removed} file(s)'))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:09
+
+import users.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_profile_image_sizes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='profile',
+            name='image',
+            field=models.ImageField(default='profile_pics/default.jpg', storage=users.storage.profile_picture_storage, upload_to='profile_pics'),
+        ),
+    ]
@@ -1,29 +1,60 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
-from PIL import Image
-import os
+from . import images
+from .storage import profile_picture_storage
 
 # Create your models here.
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE) #cascade means that if the user is deleted then the profile will be deleted
-    image = models.ImageField(default='profile_pics/default.jpg', upload_to='profile_pics') # this is the image field for the profile
+    image = models.ImageField(default='profile_pics/default.jpg', upload_to='profile_pics', storage=profile_picture_storage) # this is the image field for the profile, stored once per unique picture
+    image_sizes = models.JSONField(default=dict, blank=True, editable=False) # resized copies of image, filled in by users/images.py
     
 
     def __str__(self):
         return f'{self.user.get_full_name()} Profile'
+
+    _saved_image_name = None # not known until the image is loaded
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # so save() can tell whether a new picture was uploaded. A profile loaded without
+        # its image (.only(), .defer()) isn't asked for it, that would be a query per row
+        if 'image' not in self.get_deferred_fields():
+            self._saved_image_name = self.image.name
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using, fields, **kwargs)
+        # also how a deferred image gets loaded
+        if (fields is None or 'image' in fields) and 'image' not in self.get_deferred_fields():
+            self._saved_image_name = self.image.name
+
+    def image_url(self, size):
+        """URL of the resized copy, falls back to the original until the pipeline has made it"""
+        name = self.image_sizes.get(size)
+        if name:
+            return self.image.storage.url(name)
+        return self.image.url
+
+    @property
+    def avatar_url(self):
+        return self.image_url('avatar')
+
+    @property
+    def card_url(self):
+        return self.image_url('card')
+
+    @property
+    def large_url(self):
+        return self.image_url('large')
     
     def save(self, *args, **kwargs):
+        image_changed = 'image' not in self.get_deferred_fields() and self.image.name != self._saved_image_name
+        if image_changed:
+            self.image_sizes = {} # the old sizes belong to the old picture
         super().save(*args, **kwargs)
+        self._saved_image_name = self.image.name
 
-        # Only process image if it exists and is not the default
-        if self.image and self.image.name != 'default.jpg' and os.path.exists(self.image.path):
-            try:
-                img = Image.open(self.image.path) #this will open the image of the current instance
-
-                if img.height > 300 or img.width > 300:
-                    output_size = (300, 300)
-                    img.thumbnail(output_size)
-                    img.save(self.image.path)
-            except Exception as e:
-                # If there's an error processing the image, just continue 
-                pass
\ No newline at end of file
+        # resizing happens in the background once the upload is committed, not inside the request
+        if image_changed and self.image:
+            profile_id, name = self.pk, self.image.name
+            transaction.on_commit(lambda: images.schedule(profile_id, name))
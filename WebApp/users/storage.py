@@ -0,0 +1,56 @@
+import hashlib
+import os
+import re
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+# profile_pics/3f/3fa2...e9.jpg, the name is the sha256 of the file's content
+HASHED_NAME = re.compile(r'^(?:.*/)?[0-9a-f]{2}/(?P<digest>[0-9a-f]{64})\.\w+$')
+
+
+def content_digest(content):
+    sha = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        sha.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return sha.hexdigest()
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Stores every file under the hash of its content, so the same picture is only stored once"""
+    content_addressed = True
+
+    def hashed_name(self, name, content):
+        directory = os.path.dirname(name)
+        ext = os.path.splitext(name)[1].lower()
+        digest = content_digest(content)
+        return os.path.join(directory, digest[:2], digest + ext)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        if self.exists(name): # same content, already stored, nothing to write
+            return name
+        return super().save(name, content, max_length)
+
+    def delete(self, name):
+        # other profiles may point at the same file, cleanup is left to prune_profile_pictures
+        pass
+
+
+def profile_picture_storage():
+    return ContentAddressedStorage()
+
+
+def digest_from_name(name):
+    """The content hash of a content addressed name, None for legacy names"""
+    match = HASHED_NAME.match(name)
+    return match.group('digest') if match else None
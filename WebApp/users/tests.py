@@ -1,3 +1,119 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from PIL import Image
+
+from . import images
+from .models import Profile
+from .storage import digest_from_name
+from .views import profile_picture
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def make_upload(name='peony.jpg', size=(800, 600)):
+    out = BytesIO()
+    Image.new('RGB', size, 'orange').save(out, format='JPEG')
+    return SimpleUploadedFile(name, out.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, PROFILE_IMAGES_ASYNC=False)
+class ProfileImagePipelineTests(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user('student', password='pass')
+
+    def test_upload_generates_every_size_after_commit(self):
+        profile = self.user.profile
+        profile.image = make_upload()
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+
+        profile.refresh_from_db()
+        self.assertEqual(set(profile.image_sizes), set(images.SIZES))
+        for size, pixels in images.SIZES.items():
+            with profile.image.storage.open(profile.image_sizes[size]) as f:
+                self.assertEqual(max(Image.open(f).size), pixels)
+        self.assertEqual(profile.card_url, profile.image.storage.url(profile.image_sizes['card']))
+
+    def test_user_saves_do_not_reprocess_the_image(self):
+        with mock.patch.object(images, 'schedule') as schedule:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.user.first_name = 'Vaquero'
+                self.user.save()
+        schedule.assert_not_called()
+
+    def test_profiles_load_without_their_image(self):
+        for i in range(3):
+            User.objects.create_user(f'student{i}', password='pass')
+        with self.assertNumQueries(1):
+            self.assertEqual(len(list(Profile.objects.defer('image'))), 4)
+
+        profile = Profile.objects.only('id', 'user').get(user=self.user)
+        with mock.patch.object(images, 'schedule') as schedule:
+            with self.captureOnCommitCallbacks(execute=True):
+                profile.save()
+                profile.image.name # loads the deferred image
+                profile.save()
+        schedule.assert_not_called()
+
+    def test_profile_page_falls_back_to_original_until_processed(self):
+        profile = self.user.profile
+        self.assertEqual(profile.avatar_url, profile.image.url)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, PROFILE_IMAGES_ASYNC=False)
+class ContentAddressedStorageTests(TestCase):
+
+    def setUp(self):
+        self.users = [User.objects.create_user(f'student{i}', password='pass') for i in range(2)]
+
+    def upload(self, user, name):
+        profile = user.profile
+        profile.image = make_upload(name)
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+        profile.refresh_from_db()
+        return profile
+
+    def test_same_picture_is_stored_once(self):
+        first = self.upload(self.users[0], 'IMG_1234.jpg')
+        second = self.upload(self.users[1], 'IMG_1234_1.JPG')
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertIsNotNone(digest_from_name(first.image.name))
+        self.assertEqual(first.image_sizes, second.image_sizes)
+
+    def test_served_with_immutable_cache_headers_and_etag(self):
+        profile = self.upload(self.users[0], 'peony.jpg')
+        # the development view, only routed with DEBUG on (the test runner turns it off)
+        path = profile.image.name.removeprefix('profile_pics/')
+        factory = RequestFactory()
+        response = profile_picture(factory.get(profile.image.url), path)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+
+        cached = profile_picture(factory.get(profile.image.url, HTTP_IF_NONE_MATCH=response['ETag']), path)
+        self.assertEqual(cached.status_code, 304)
+
+    def test_prune_keeps_referenced_pictures(self):
+        profile = self.upload(self.users[0], 'peony.jpg')
+        old_name = profile.image.name
+        profile.image = make_upload('new.jpg', size=(500, 500))
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+        call_command('prune_profile_pictures', stdout=StringIO())
+        storage = profile.image.storage
+        self.assertFalse(storage.exists(old_name))
+        self.assertTrue(storage.exists(profile.image.name))
@@ -1,6 +1,11 @@
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.conf import settings
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.views.static import serve
+from .storage import digest_from_name
 from .forms import UserRegisterForm, UserUpdateForm, ProfileUpdateForm
 
 # Create your views here.
@@ -38,6 +43,33 @@ def profile(request):
     return render(request, 'users/profile.html', context)
 
 
+def profile_picture(request, path):
+    r"""Serve a profile picture in development, content addressed ones are cached by browsers forever.
+
+    Only routed with DEBUG on. In production the web server serves MEDIA_ROOT and should send the same
+    headers for the hashed names (profile_pics/<2 hex>/<64 hex>.<ext>), e.g. with nginx:
+
+        location ~ ^/media/profile_pics/[0-9a-f]{2}/[0-9a-f]{64}\.\w+$ {
+            add_header Cache-Control "public, max-age=31536000, immutable";
+        }
+
+    and leave legacy names (profile_pics/default.jpg, ...) on its default revalidation.
+    """
+    name = f'profile_pics/{path}'
+    digest = digest_from_name(name)
+    if digest is None: # legacy file name, the content can change so let django.views.static handle it
+        return serve(request, name, document_root=settings.MEDIA_ROOT)
+
+    etag = f'"{digest}"'
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        response = serve(request, name, document_root=settings.MEDIA_ROOT)
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=365 * 24 * 60 * 60, immutable=True)
+    return response
+
+
 '''
 # this is the different types of messages that can be displayed
 messages.debug